@@ -0,0 +1,347 @@
+"""
+Benchmark de escala: datos sintéticos con la forma de sku_canal_zonas_usd.csv.
+
+Para saber si el dashboard aguanta el catálogo del próximo año no basta con
+replicar la muestra (escalar_csv repite las mismas filas y los mismos SKUs).
+generar_csv_sintetico remuestrea SKUs completos de la muestra, con sus filas
+canal × zona, su SABCT y sus meses en cero, les da códigos nuevos y aplica
+un ruido lognormal a cada venta no nula: se conservan la mezcla de canales
+(MINORISTA ~75%), las zonas, el sesgo de SABCT y la dispersión de meses sin
+venta, sin fijar esas distribuciones a mano.
+
+Para cada tamaño mide, en el proceso actual, cada etapa del motor (lectura
+del CSV, limpieza, caché, cada sección del modelo, filtros, índice de
+artículos, reclasificación, obsolescencia, pronóstico) y, en un proceso
+nuevo con AppTest, el arranque del dashboard y cada sección (cálculo,
+figuras y envío) más la serialización JSON de sus figuras. De cada etapa
+guarda el tiempo y la memoria residente pico (en Linux el pico se reinicia
+antes de cada etapa con /proc/self/clear_refs; en otros sistemas queda en
+null).
+
+Los resultados van a un JSON. Con --comparar se contrastan con una corrida
+anterior y el script termina con error si alguna etapa se volvió más lenta
+o usa más memoria que la tolerancia.
+
+Uso:
+    python benchmarks/bench_escala.py --filas 10000 100000 1000000 10000000 --salida escala.json
+    python benchmarks/bench_escala.py --filas 10000 100000 --comparar escala.json --tolerancia 0.25
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from bench_ingesta import cronometrar  # noqa: E402
+from inventario.articulos import IndiceArticulos  # noqa: E402
+from inventario.cache import calentar_cache, cargar_con_cache  # noqa: E402
+from inventario.clasificacion import clasificar_sabct  # noqa: E402
+from inventario.corte import construir_comparativas  # noqa: E402
+from inventario.cubo import Cubo, construir_hechos  # noqa: E402
+from inventario.filtros import Filtro, ModelosFiltrados  # noqa: E402
+from inventario.ingesta import (ANIO_ANALISIS, DIMENSIONES, RUTA_CSV, agregar_totales, detectar_meses,  # noqa: E402
+                                leer_csv)
+from inventario.memoria import compactar  # noqa: E402
+from inventario.modelo import (_sabct_por_canal, _zona_por_canal, calcular_modelo, composicion_portafolio,  # noqa: E402
+                               indicadores)
+from inventario.obsolescencia import analizar_obsolescencia, ranking_liquidacion  # noqa: E402
+from inventario.paralelo import contar_skus  # noqa: E402
+from inventario.pronostico import cargar_o_pronosticar, pronosticar_total  # noqa: E402
+
+FILTRO = Filtro(canal=('MINORISTA',), desde='Mar-25')
+
+# Por debajo de estos valores las diferencias entre corridas son ruido
+_MINIMO_SEGUNDOS = 0.05
+_MINIMO_MB = 16
+
+_SONDA = """
+import json, multiprocessing, os, sys
+sys.path.insert(0, {benchmarks!r})
+from bench_escala import medir_dashboard
+print(json.dumps(medir_dashboard({repeticiones})))
+sys.stdout.flush()
+# El pronóstico por serie que lanza la sección de evolución sigue en segundo plano: no se espera
+for proceso in multiprocessing.active_children():
+    proceso.terminate()
+os._exit(0)
+"""
+
+
+def con_separador_miles(enteros):
+    """Enteros como texto con coma de miles, como en el CSV de origen: [1005000, -42] -> ['1,005,000', '-42'].
+
+    Se arma un grupo de tres cifras por vuelta sobre el arreglo completo.
+    """
+    enteros = np.asarray(enteros, dtype=np.int64)
+    resto = np.abs(enteros)
+    texto = (resto % 1000).astype(str)
+    resto = resto // 1000
+    grupos = 1
+    while resto.any():
+        # El grupo anterior se completa con ceros solo donde queda un grupo más a la izquierda
+        texto = np.where(resto > 0, np.char.add(np.char.add((resto % 1000).astype(str), ','),
+                                                np.char.zfill(texto, 4 * grupos - 1)), texto)
+        resto = resto // 1000
+        grupos += 1
+    return np.where(enteros < 0, np.char.add('-', texto), texto)
+
+
+def generar_csv_sintetico(filas, destino, semilla=0, ruido=0.3, filas_por_bloque=500_000):
+    """CSV con el esquema de la muestra y ``filas`` filas de SKUs remuestreados; devuelve la cantidad de SKUs."""
+    muestra = leer_csv(RUTA_CSV)
+    meses = detectar_meses(muestra.columns)
+    orden = np.argsort(muestra['ARTICULO'].cat.codes.to_numpy(), kind='stable')
+    _, inicios, tamanos = np.unique(muestra['ARTICULO'].cat.codes.to_numpy()[orden], return_index=True,
+                                    return_counts=True)
+    dimensiones = {col: muestra[col].astype(str).to_numpy()[orden] for col in DIMENSIONES[1:]}
+    ventas = muestra[meses].to_numpy(dtype=np.float64)[orden]
+
+    rng = np.random.default_rng(semilla)
+    skus = 0
+    with open(destino, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write(';'.join(DIMENSIONES + meses) + '\n')
+        escritas = 0
+        while escritas < filas:
+            bloque = min(filas_por_bloque, filas - escritas)
+            # SKUs de sobra para cubrir el bloque; el último puede quedar con menos filas
+            plantillas = rng.integers(len(inicios), size=int(bloque / tamanos.mean() * 1.2) + 1)
+            fin = np.cumsum(tamanos[plantillas])
+            plantillas = plantillas[:np.searchsorted(fin, bloque) + 1]
+            por_sku = tamanos[plantillas]
+            desplazamiento = np.arange(por_sku.sum()) - np.repeat(np.cumsum(por_sku) - por_sku, por_sku)
+            origen = (np.repeat(inicios[plantillas], por_sku) + desplazamiento)[:bloque]
+            codigos = (skus + np.repeat(np.arange(len(plantillas)), por_sku))[:bloque]
+
+            base = ventas[origen]
+            # Las ventas no nulas siguen siendo no nulas: se conserva la dispersión de meses en cero
+            sinteticas = np.rint(base * rng.lognormal(0, ruido, size=base.shape))
+            sinteticas = np.where(base > 0, np.maximum(sinteticas, 1), np.where(base < 0, np.minimum(sinteticas, -1), 0))
+
+            columnas = {'ARTICULO': np.char.add('SKU-', np.char.zfill(codigos.astype(str), 8))}
+            columnas.update({col: valores[origen] for col, valores in dimensiones.items()})
+            columnas.update(zip(meses, con_separador_miles(sinteticas).T))
+            pd.DataFrame(columnas).to_csv(f, sep=';', header=False, index=False, lineterminator='\n')
+            escritas += len(origen)
+            skus = codigos[-1] + 1
+    return int(skus)
+
+
+def _memoria_mb(campo):
+    for linea in Path('/proc/self/status').read_text().splitlines():
+        if linea.startswith(campo + ':'):
+            return int(linea.split()[1]) / 1024
+    return None
+
+
+def reiniciar_pico():
+    """Reinicia el pico de memoria residente (Linux) y devuelve la residente actual en MB; None si no se puede."""
+    try:
+        Path('/proc/self/clear_refs').write_text('5')
+        return _memoria_mb('VmRSS')
+    except OSError:
+        return None
+
+
+def medir(resultados, etapa, funcion, repeticiones=1):
+    """Corre ``funcion``, agrega a ``resultados`` su tiempo (mínimo) y memoria pico y devuelve su resultado."""
+    base = reiniciar_pico()
+    tiempo, resultado = cronometrar(funcion, repeticiones)
+    pico = None if base is None else _memoria_mb('VmHWM')
+    resultados.append({
+        'etapa': etapa,
+        'segundos': round(tiempo, 4),
+        'memoria_pico_mb': None if pico is None else round(pico, 1),
+        'memoria_extra_mb': None if pico is None else round(pico - base, 1),
+    })
+    return resultado
+
+
+def medir_motor(ruta, directorio, repeticiones=1, pronostico=False):
+    """Etapas del motor sobre el CSV ``ruta``, en el orden en que las recorre el dashboard."""
+    resultados = []
+    df = medir(resultados, 'carga_csv', lambda: leer_csv(ruta), repeticiones)
+    medir(resultados, 'limpieza', lambda: agregar_totales(df), repeticiones)
+    del df
+    medir(resultados, 'cache_escritura', lambda: calentar_cache(ruta, directorio, forzar=True), 1)
+    df, huella = medir(resultados, 'cache_lectura', lambda: cargar_con_cache(ruta, directorio), repeticiones)
+    meses = detectar_meses(df.columns, ANIO_ANALISIS)
+    df = medir(resultados, 'compactar', lambda: compactar(df), repeticiones)
+
+    hechos = medir(resultados, 'hechos', lambda: construir_hechos(df), repeticiones)
+    cubo = medir(resultados, 'cubo', lambda: Cubo.desde_hechos(hechos), repeticiones)
+    comparativas = medir(resultados, 'comparativas', lambda: construir_comparativas(cubo, hechos, meses), repeticiones)
+    conteos = medir(resultados, 'conteos_skus', lambda: contar_skus(df), repeticiones)
+    medir(resultados, 'sabct_por_canal', lambda: _sabct_por_canal(conteos), repeticiones)
+    medir(resultados, 'zona_por_canal',
+          lambda: _zona_por_canal(conteos, cubo.tabla('zona', 'canal', periodo=meses)), repeticiones)
+    medir(resultados, 'composicion',
+          lambda: composicion_portafolio(df, cubo.serie('sabct', periodo=meses), conteos.serie('sabct')), repeticiones)
+    medir(resultados, 'indicadores', lambda: indicadores(cubo, comparativas['total'], meses, conteos.serie('canal'),
+                                                         conteos.serie('zona')), repeticiones)
+    medir(resultados, 'modelo_completo', lambda: calcular_modelo(df, meses, huella), repeticiones)
+    # Índice de filtros más el modelo de una combinación, como el primer filtro en el dashboard
+    medir(resultados, 'modelo_filtrado', lambda: ModelosFiltrados(df, meses, huella).modelo(FILTRO), repeticiones)
+
+    medir(resultados, 'indice_articulos', lambda: IndiceArticulos(df), repeticiones)
+    medir(resultados, 'reclasificacion', lambda: clasificar_sabct(df, meses=meses), repeticiones)
+    medir(resultados, 'obsolescencia', lambda: ranking_liquidacion(analizar_obsolescencia(df, meses)), repeticiones)
+    medir(resultados, 'pronostico_total', lambda: pronosticar_total(cubo.serie('periodo')), repeticiones)
+    if pronostico:
+        # Queda guardado en la caché: el dashboard lo lee en vez de calcularlo en segundo plano
+        medir(resultados, 'pronostico_series', lambda: cargar_o_pronosticar(df, huella, directorio=directorio), 1)
+    return resultados
+
+
+def _correr(app):
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+
+
+def medir_dashboard(repeticiones=1):
+    """Arranque y secciones del dashboard con AppTest; se corre en un proceso con INVENTARIO_CSV ya apuntado."""
+    import plotly.io as pio
+    from streamlit.testing.v1 import AppTest
+
+    resultados = []
+    app = AppTest.from_file(str(RAIZ / 'dashboard_ventas.py'), default_timeout=3600)
+    medir(resultados, 'dashboard:arranque', lambda: _correr(app))
+    resultados[-1]['primer_pintado_s'] = round(app.session_state['tiempo_primer_pintado'], 4)
+
+    # Evolución al final: lanza el pronóstico por serie en segundo plano, que compite por la CPU
+    secciones = sorted(app.radio(key='seccion').options, key=lambda seccion: 'Evolución' in seccion)
+    for seccion in secciones:
+        app.radio(key='seccion').set_value(seccion)
+        # Primera apertura: cálculo de la sección, figuras y su envío
+        medir(resultados, f'dashboard:{seccion}', lambda: _correr(app))
+        especificaciones = [figura.proto.spec for figura in app.get('plotly_chart')]
+        figuras = [pio.from_json(spec) for spec in especificaciones]
+        medir(resultados, f'json:{seccion}', lambda: [figura.to_json() for figura in figuras], repeticiones)
+        resultados[-1].update(figuras=len(figuras), bytes=sum(len(spec) for spec in especificaciones))
+    return resultados
+
+
+def medir_dashboard_aparte(ruta, directorio, repeticiones=1):
+    """medir_dashboard en un intérprete nuevo (la configuración se lee del entorno al importar)."""
+    entorno = dict(os.environ, INVENTARIO_CSV=str(ruta), INVENTARIO_CACHE_DIR=str(directorio))
+    salida = subprocess.run(
+        [sys.executable, '-c', _SONDA.format(benchmarks=str(Path(__file__).resolve().parent), repeticiones=repeticiones)],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True)
+    if salida.returncode:
+        raise RuntimeError(f"El dashboard falló:\n{salida.stderr[-2000:]}")
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def entorno():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=RAIZ, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versiones = {}
+    for modulo in ('numpy', 'pandas', 'pyarrow', 'plotly', 'streamlit', 'statsmodels'):
+        try:
+            versiones[modulo] = __import__(modulo).__version__
+        except ImportError:
+            versiones[modulo] = None
+    return {'commit': commit, 'python': platform.python_version(), 'plataforma': platform.platform(),
+            'nucleos': os.cpu_count(), 'versiones': versiones}
+
+
+def comparar(actual, anterior, tolerancia):
+    """Etapas de ``actual`` más lentas o con más memoria que en ``anterior`` por encima de ``tolerancia``."""
+    previas = {(conjunto['filas'], etapa['etapa']): etapa
+               for conjunto in anterior['conjuntos'] for etapa in conjunto['etapas']}
+    regresiones = []
+    for conjunto in actual['conjuntos']:
+        for etapa in conjunto['etapas']:
+            previa = previas.get((conjunto['filas'], etapa['etapa']))
+            if previa is None:
+                continue
+            for medida, minimo in (('segundos', _MINIMO_SEGUNDOS), ('memoria_extra_mb', _MINIMO_MB)):
+                antes, ahora = previa.get(medida), etapa.get(medida)
+                if antes is None or ahora is None or max(antes, ahora) < minimo:
+                    continue
+                if ahora > max(antes, minimo) * (1 + tolerancia):
+                    regresiones.append(f"{conjunto['filas']:,} filas, {etapa['etapa']}: {medida} {antes:g} -> {ahora:g}")
+    return regresiones
+
+
+def _imprimir(etapas):
+    print(f"  {'etapa':<36}{'segundos':>10}{'pico MB':>10}{'extra MB':>10}")
+    for etapa in etapas:
+        pico, extra = etapa['memoria_pico_mb'], etapa['memoria_extra_mb']
+        print(f"  {etapa['etapa']:<36}{etapa['segundos']:>10.3f}"
+              f"{'-' if pico is None else f'{pico:,.0f}':>10}{'-' if extra is None else f'{extra:,.0f}':>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, nargs='+', default=[10_000, 100_000, 1_000_000, 10_000_000],
+                        help='filas de cada conjunto sintético')
+    parser.add_argument('--repeticiones', type=int, default=1, help='se guarda el mínimo de las repeticiones')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--ruido', type=float, default=0.3, help='sigma del ruido lognormal sobre cada venta')
+    parser.add_argument('--dashboard-hasta', type=int, default=1_000_000,
+                        help='filas máximas para medir el dashboard con AppTest (0 = no medirlo)')
+    parser.add_argument('--pronostico', action='store_true', help='medir también el pronóstico por serie')
+    parser.add_argument('--datos', type=Path, help='directorio donde guardar y reutilizar los CSV generados')
+    parser.add_argument('--salida', type=Path, default=Path('bench_escala.json'))
+    parser.add_argument('--comparar', type=Path, help='JSON de una corrida anterior')
+    parser.add_argument('--tolerancia', type=float, default=0.25, help='aumento relativo permitido')
+    args = parser.parse_args()
+
+    resultado = {'fecha': datetime.now().isoformat(timespec='seconds'), 'entorno': entorno(),
+                 'semilla': args.semilla, 'ruido': args.ruido, 'repeticiones': args.repeticiones, 'conjuntos': []}
+    with tempfile.TemporaryDirectory() as tmp:
+        datos = args.datos or Path(tmp)
+        datos.mkdir(parents=True, exist_ok=True)
+        for filas in args.filas:
+            ruta = datos / f"sintetico-{filas}-{args.semilla}.csv"
+            inicio = time.perf_counter()
+            skus = generar_csv_sintetico(filas, ruta, args.semilla, args.ruido)
+            generacion = time.perf_counter() - inicio
+            print(f"{filas:,} filas, {skus:,} SKUs ({ruta.stat().st_size / 2**20:,.0f} MB de CSV, "
+                  f"generado en {generacion:.1f} s)")
+
+            directorio = Path(tmp) / f"cache-{filas}"
+            etapas = medir_motor(ruta, directorio, args.repeticiones, args.pronostico)
+            if filas <= args.dashboard_hasta:
+                if importlib.util.find_spec('streamlit') is None:
+                    print("  streamlit no disponible: se omite la medición del dashboard")
+                else:
+                    etapas += medir_dashboard_aparte(ruta, directorio, args.repeticiones)
+            _imprimir(etapas)
+            resultado['conjuntos'].append({'filas': filas, 'skus': skus, 'bytes_csv': ruta.stat().st_size,
+                                           'segundos_generacion': round(generacion, 2), 'etapas': etapas})
+            if not args.datos:
+                ruta.unlink()
+
+    args.salida.write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"Resultados en {args.salida}")
+
+    if args.comparar:
+        regresiones = comparar(resultado, json.loads(args.comparar.read_text(encoding='utf-8')), args.tolerancia)
+        if regresiones:
+            print(f"Regresiones respecto de {args.comparar} (tolerancia {args.tolerancia:.0%}):")
+            for regresion in regresiones:
+                print(f"  {regresion}")
+            raise SystemExit(1)
+        print(f"Sin regresiones respecto de {args.comparar} (tolerancia {args.tolerancia:.0%})")
+
+
+if __name__ == '__main__':
+    main()
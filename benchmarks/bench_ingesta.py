@@ -0,0 +1,82 @@
+"""
+Benchmark de ingesta: bucle original por mes vs lectura tipada.
+
+Replica el CSV de muestra N veces y compara los tiempos. La paridad de
+valores con la limpieza original está en tests/test_ingesta.py.
+
+Uso:
+    python benchmarks/bench_ingesta.py --factor 100
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from inventario.ingesta import RUTA_CSV, preparar_datos  # noqa: E402
+
+MESES = ['Ene-25', 'Feb-25', 'Mar-25', 'Abr-25', 'May-25', 'Jun-25',
+         'Jul-25', 'Ago-25', 'Set-25', 'Oct-25', 'Nov-25', 'Dic-25']
+MESES_ANTES = MESES[:7]
+MESES_DESPUES = MESES[7:]
+
+
+def cargar_datos_original(ruta):
+    """Limpieza original de dashboard_ventas.cargar_datos (referencia)."""
+    df = pd.read_csv(ruta, sep=';', encoding='utf-8-sig')
+    for mes in MESES:
+        df[mes] = df[mes].astype(str).str.replace(',', '').astype(float)
+    df['TOTAL_2025'] = df[MESES].sum(axis=1)
+    df['VENTA_ANTES_CAMBIO'] = df[MESES_ANTES].sum(axis=1)
+    df['VENTA_DESPUES_CAMBIO'] = df[MESES_DESPUES].sum(axis=1)
+    return df
+
+
+def escalar_csv(factor, destino):
+    with open(RUTA_CSV, encoding='utf-8-sig') as f:
+        encabezado, *filas = f.read().splitlines()
+    with open(destino, 'w', encoding='utf-8-sig') as f:
+        f.write(encabezado + '\n')
+        for _ in range(factor):
+            f.write('\n'.join(filas) + '\n')
+
+
+def cronometrar(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--factor', type=int, default=100, help='veces que se replica el CSV de muestra')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / 'ventas.csv'
+        escalar_csv(args.factor, ruta)
+
+        t_original, referencia = cronometrar(lambda: cargar_datos_original(ruta), args.repeticiones)
+        print(f"{len(referencia):,} filas")
+        print(f"  original (bucle por mes): {t_original:.3f} s")
+
+        for motor in ('c', 'pyarrow'):
+            try:
+                t_nuevo, _ = cronometrar(lambda: preparar_datos(ruta, motor=motor), args.repeticiones)
+            except ImportError:
+                print(f"  {motor}: no disponible")
+                continue
+            print(f"  tipado ({motor}): {t_nuevo:.3f} s  ({t_original / t_nuevo:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
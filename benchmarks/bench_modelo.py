@@ -0,0 +1,77 @@
+"""
+Benchmark de latencia por rerun del dashboard.
+
+Antes: cada rerun volvía a ejecutar todas las agregaciones (calcular_modelo)
+y a deserializar el DataFrame desde st.cache_data.
+Después: el rerun solo lee el ModeloMetricas cacheado y dibuja.
+
+Uso:
+    python benchmarks/bench_modelo.py --factor 10
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from bench_ingesta import cronometrar, escalar_csv  # noqa: E402
+from inventario.ingesta import preparar_datos  # noqa: E402
+from inventario.modelo import calcular_modelo  # noqa: E402
+
+
+def medir_reruns(ruta, reruns):
+    """Tiempos del primer run (en frío) y de los reruns del dashboard."""
+    from streamlit.testing.v1 import AppTest
+
+    os.environ['INVENTARIO_CSV'] = str(ruta)
+    os.environ['INVENTARIO_CACHE_DIR'] = str(Path(ruta).parent / 'cache')
+    app = AppTest.from_file(str(RAIZ / 'dashboard_ventas.py'), default_timeout=600)
+
+    inicio = time.perf_counter()
+    app.run()
+    frio = time.perf_counter() - inicio
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+
+    tiempos = []
+    for _ in range(reruns):
+        inicio = time.perf_counter()
+        app.run()
+        tiempos.append(time.perf_counter() - inicio)
+    return frio, min(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--factor', type=int, default=10, help='veces que se replica el CSV de muestra')
+    parser.add_argument('--reruns', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / 'ventas.csv'
+        escalar_csv(args.factor, ruta)
+        df = preparar_datos(ruta)
+        print(f"{len(df):,} filas")
+
+        t_modelo, _ = cronometrar(lambda: calcular_modelo(df), args.reruns)
+        t_copia, _ = cronometrar(lambda: pickle.loads(pickle.dumps(df)), args.reruns)
+        print(f"  antes, trabajo extra por rerun: {t_modelo + t_copia:.3f} s "
+              f"(agregaciones {t_modelo:.3f} s + copia de st.cache_data {t_copia:.3f} s)")
+
+        try:
+            frio, rerun = medir_reruns(ruta, args.reruns)
+        except ImportError:
+            print("  streamlit no disponible: se omite la medición del dashboard")
+            return
+        print(f"  dashboard, primer run: {frio:.3f} s")
+        print(f"  dashboard, rerun con modelo cacheado: {rerun:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark de los conteos de SKUs únicos: groupby nunique vs contar_skus por ejecutor.
+
+Antes: calcular_modelo hacía un groupby(...)['ARTICULO'].nunique() de pandas
+por sección (canal, zona, SABCT, canal × SABCT, zona × canal), todos en un
+solo hilo sobre el mismo frame.
+Después: paralelo.contar_skus resuelve todos los conteos sobre una matriz de
+códigos, repartida por hash de ARTICULO entre hilos o procesos (memoria
+compartida), y suma los parciales.
+
+Replica el catálogo de muestra N veces con códigos de SKU distintos,
+verifica que cada ejecutor y cantidad de trabajadores da los mismos conteos
+que los groupby y mide el escalamiento. Con más trabajadores que núcleos el
+tiempo no baja: la salida indica cuántos núcleos tiene la máquina.
+
+Uso:
+    python benchmarks/bench_paralelo.py --factor 50 --trabajadores 1 2 4 8 16
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_ingesta import cronometrar  # noqa: E402
+from inventario.ingesta import preparar_datos  # noqa: E402
+from inventario.paralelo import contar_skus  # noqa: E402
+
+
+def catalogo_escalado(factor):
+    """Catálogo de muestra replicado ``factor`` veces con códigos de SKU distintos en cada copia."""
+    df = preparar_datos()
+    copias = []
+    for k in range(factor):
+        copia = df.copy()
+        copia['ARTICULO'] = copia['ARTICULO'].astype(str) + (f"-R{k}" if k else "")
+        copias.append(copia)
+    escalado = pd.concat(copias, ignore_index=True)
+    escalado['ARTICULO'] = escalado['ARTICULO'].astype('category')
+    return escalado
+
+
+def conteos_groupby(df):
+    """Los nunique de calcular_modelo antes de paralelo.py (referencia)."""
+    return {
+        'canal': df.groupby('CANAL', observed=True)['ARTICULO'].nunique(),
+        'zona': df.groupby('ZONA_CONSOLIDADO', observed=True)['ARTICULO'].nunique(),
+        'sabct': df.groupby('SABCT', observed=True)['ARTICULO'].nunique(),
+        'canal_sabct': df.groupby(['CANAL', 'SABCT'], observed=True)['ARTICULO'].nunique().unstack(fill_value=0),
+        'zona_canal': df.groupby(['ZONA_CONSOLIDADO', 'CANAL'], observed=True)['ARTICULO'].nunique().unstack(fill_value=0),
+        'total': df['ARTICULO'].nunique(),
+        'con_venta': df.loc[df['TOTAL_2025'] > 0, 'ARTICULO'].nunique(),
+    }
+
+
+def verificar(referencia, conteos, descripcion):
+    for nombre in ('canal', 'zona', 'sabct'):
+        serie = referencia[nombre]
+        if not np.array_equal(serie.to_numpy(), conteos.serie(nombre).reindex(serie.index.astype(str)).to_numpy()):
+            raise AssertionError(f"{descripcion}: SKUs por {nombre} difieren")
+    for nombre in ('canal_sabct', 'zona_canal'):
+        tabla = referencia[nombre]
+        obtenido = conteos.tabla(nombre).reindex(index=tabla.index.astype(str), columns=tabla.columns.astype(str))
+        if not np.array_equal(tabla.to_numpy(), obtenido.to_numpy()):
+            raise AssertionError(f"{descripcion}: SKUs por {nombre} difieren")
+    if (referencia['total'], referencia['con_venta']) != (conteos.totales, conteos.con_venta):
+        raise AssertionError(f"{descripcion}: SKUs totales o con venta difieren")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--factor', type=int, default=50, help='copias del catálogo con códigos distintos')
+    parser.add_argument('--trabajadores', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    df = catalogo_escalado(args.factor)
+    print(f"{len(df):,} filas, {df['ARTICULO'].nunique():,} SKUs; {os.cpu_count()} núcleo(s) disponibles")
+
+    t_groupby, referencia = cronometrar(lambda: conteos_groupby(df), args.repeticiones)
+    t_serie, conteos = cronometrar(lambda: contar_skus(df, 'serie'), args.repeticiones)
+    verificar(referencia, conteos, 'serie')
+    print(f"  groupby nunique: {t_groupby:.3f} s")
+    print(f"  contar_skus en serie: {t_serie:.3f} s ({t_groupby / t_serie:.1f}x)")
+
+    for ejecutor in ('hilos', 'procesos'):
+        for trabajadores in args.trabajadores:
+            # La primera llamada crea el pool (y con procesos, importa el paquete en cada uno)
+            verificar(referencia, contar_skus(df, ejecutor, trabajadores), f"{ejecutor} x{trabajadores}")
+            tiempo, _ = cronometrar(lambda: contar_skus(df, ejecutor, trabajadores), args.repeticiones)
+            print(f"  {ejecutor} x{trabajadores}: {tiempo:.3f} s "
+                  f"({t_serie / tiempo:.2f}x sobre serie, {t_groupby / tiempo:.1f}x sobre groupby)")
+
+
+if __name__ == '__main__':
+    main()
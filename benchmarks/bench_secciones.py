@@ -0,0 +1,88 @@
+"""
+Benchmark de secciones del dashboard: tiempo hasta el primer pintado y costo por sección.
+
+Antes: cada rerun calculaba y enviaba todas las secciones (unas 10 figuras
+Plotly). Después: el encabezado y los KPIs se pintan primero y la
+navegación solo calcula y dibuja la sección abierta.
+
+Mide, con AppTest:
+  - primer pintado: tiempo desde el inicio del script hasta que el
+    encabezado y los KPIs quedan enviados (st.session_state), en frío y en
+    caliente;
+  - por sección: tiempo del rerun al abrirla (primera vez y de nuevo),
+    figuras Plotly enviadas y bytes de sus especificaciones.
+
+Uso:
+    python benchmarks/bench_secciones.py --factor 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from bench_ingesta import escalar_csv  # noqa: E402
+
+
+def _correr(app):
+    inicio = time.perf_counter()
+    app.run()
+    total = time.perf_counter() - inicio
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return total
+
+
+def _figuras(app):
+    figuras = app.get('plotly_chart')
+    return len(figuras), sum(len(f.proto.spec) for f in figuras)
+
+
+def medir_secciones(ruta):
+    from streamlit.testing.v1 import AppTest
+
+    os.environ['INVENTARIO_CSV'] = str(ruta)
+    os.environ['INVENTARIO_CACHE_DIR'] = str(Path(ruta).parent / 'cache')
+    app = AppTest.from_file(str(RAIZ / 'dashboard_ventas.py'), default_timeout=600)
+
+    frio = _correr(app)
+    pintado_frio = app.session_state['tiempo_primer_pintado']
+    caliente = _correr(app)
+    pintado_caliente = app.session_state['tiempo_primer_pintado']
+    print(f"  primer pintado en frío: {pintado_frio * 1000:.0f} ms (run completo {frio:.2f} s)")
+    print(f"  primer pintado en caliente: {pintado_caliente * 1000:.0f} ms (run completo {caliente:.2f} s)")
+
+    print(f"  {'sección':<24}{'abrir':>9}{'reabrir':>9}{'figuras':>9}{'KB':>8}")
+    total_figuras = total_bytes = 0
+    for seccion in app.radio(key='seccion').options:
+        app.radio(key='seccion').set_value(seccion)
+        abrir = _correr(app)
+        reabrir = _correr(app)
+        figuras, tamano = _figuras(app)
+        total_figuras += figuras
+        total_bytes += tamano
+        print(f"  {seccion:<24}{abrir:>8.2f}s{reabrir:>8.2f}s{figuras:>9}{tamano / 1024:>8.0f}")
+    print(f"  todas las secciones juntas (página anterior): {total_figuras} figuras, {total_bytes / 1024:,.0f} KB por rerun")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--factor', type=int, default=1, help='veces que se replica el CSV de muestra')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / 'ventas.csv'
+        escalar_csv(args.factor, ruta)
+        try:
+            medir_secciones(ruta)
+        except ImportError:
+            print("  streamlit no disponible: se omite la medición del dashboard")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,12 +4,38 @@ Análisis de ventas por zona, canal y clasificación
 Para: Gerencia General
 """
 
+import time
+inicio_script = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from inventario.articulos import IndiceArticulos
+from inventario.cache import cargar_con_cache, huella_csv
+from inventario.clasificacion import MESES_NUEVO, UMBRALES_PARETO, clasificar_sabct, matriz_confusion, participacion_clases
+from inventario.configuracion import MOTOR_CONSULTAS
+from inventario.consultas import Consulta, MotorPandas, abrir_motor, resumen_consultas
+from inventario.corte import ComparativaCorte
+from inventario.filtros import DIMENSIONES_FILTRO, MAX_MODELOS, SIN_FILTRO, Filtro, ModelosFiltrados
+from inventario.formato import ENTERO, FORMATO_COMPARATIVA, PORCENTAJE, PORCENTAJE_ENTERO, USD, estilo_usd
+from inventario.geografia import ALMACEN_ACTUAL, ALMACEN_ANTERIOR, ALMACENES, ZONAS, formatear_minutos
+from inventario.ingesta import ANIO_ANALISIS, MES_CAMBIO, detectar_meses
+from inventario.logistica import cargar_o_calcular_matriz
+from inventario.mapas import figura_rutas, figura_sitios
+from inventario.memoria import MAX_MODELOS_LIGERO, MEMORIA_LIGERA, compactar, formatear_bytes, reporte_memoria
+from inventario.modelo import CANALES, SABCT_PORTAFOLIO, ZONAS_LIMA, ZONAS_MAPA, composicion_portafolio
+from inventario.obsolescencia import (COLUMNAS_OBSOLESCENCIA, MESES_MUERTO, UMBRAL_DECLIVE, analizar_obsolescencia,
+                                      ranking_liquidacion, resumen_estados)
+from inventario.simulacion import ParametrosFlota, ciclos_maximos, simular_despacho
+from inventario.ubicacion import destinos_con_venta, grilla_candidatos, puntuar_sitios, ubicar_sitios
+from inventario.pronostico import (CLAVES_SERIE, NIVEL_INTERVALO, cargar_o_pronosticar, intervalo_total,
+                                   meses_pronostico, pronosticar_total)
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -20,7 +46,7 @@ st.set_page_config(
     page_title="Movimiento de Inventario 2025",
     page_icon="📊",
     layout="wide",
-    initial_sidebar_state="collapsed"
+    initial_sidebar_state="expanded"
 )
 
 # Paleta de colores profesional
@@ -152,29 +178,158 @@ st.markdown(f"""
 # ============================================================================
 # CARGA Y PROCESAMIENTO DE DATOS
 # ============================================================================
-@st.cache_data
-def cargar_datos():
-    df = pd.read_csv('sku_canal_zonas_usd.csv', sep=';', encoding='utf-8-sig')
-    
-    # Solo meses de 2025 (sin enero 2026)
-    meses = ['Ene-25', 'Feb-25', 'Mar-25', 'Abr-25', 'May-25', 'Jun-25', 
-             'Jul-25', 'Ago-25', 'Set-25', 'Oct-25', 'Nov-25', 'Dic-25']
-    
-    for mes in meses:
-        df[mes] = df[mes].astype(str).str.replace(',', '').astype(float)
-    
-    df['TOTAL_2025'] = df[meses].sum(axis=1)
-    
-    # Calcular meses antes y después del cambio de almacén (Agosto 2025)
-    meses_antes = ['Ene-25', 'Feb-25', 'Mar-25', 'Abr-25', 'May-25', 'Jun-25', 'Jul-25']
-    meses_despues = ['Ago-25', 'Set-25', 'Oct-25', 'Nov-25', 'Dic-25']
-    
-    df['VENTA_ANTES_CAMBIO'] = df[meses_antes].sum(axis=1)
-    df['VENTA_DESPUES_CAMBIO'] = df[meses_despues].sum(axis=1)
-    
-    return df, meses
+@st.cache_resource(max_entries=2)
+def cargar_datos(huella):
+    # La huella del CSV forma parte de la clave: si el archivo cambia se recarga.
+    # Un solo frame por proceso (meses en float32 de solo lectura) que leen todas las sesiones
+    df, _ = cargar_con_cache()
+    return compactar(df), detectar_meses(df.columns, ANIO_ANALISIS)
+
+@st.cache_resource(max_entries=2)
+def obtener_modelos(huella):
+    # Bitmaps por dimensión y modelos inmutables por combinación de filtros (LRU),
+    # compartidos entre reruns y sesiones
+    df, meses = cargar_datos(huella)
+    return ModelosFiltrados(df, meses, huella, MAX_MODELOS_LIGERO if MEMORIA_LIGERA else MAX_MODELOS)
+
+def obtener_modelo(huella, filtro=SIN_FILTRO):
+    return obtener_modelos(huella).modelo(filtro)
+
+@st.cache_resource(max_entries=2)
+def motor_consultas(huella):
+    # Un motor de consultas por dataset (INVENTARIO_MOTOR_CONSULTAS: pandas, polars o duckdb);
+    # pandas consulta el mismo frame compartido que usan los filtros
+    return abrir_motor(MOTOR_CONSULTAS, df=cargar_datos(huella)[0])
+
+@st.cache_resource(max_entries=MAX_MODELOS_LIGERO if MEMORIA_LIGERA else MAX_MODELOS)
+def resumen_filtrado(huella, filtro):
+    # Ventas por canal, zona, SABCT y mes, celdas del cubo y SKUs únicos de la selección, consultados al motor
+    return resumen_consultas(motor_consultas(huella), filtro)
+
+@st.cache_data(max_entries=8)
+def composicion_filtrada(huella, filtro):
+    resumen = resumen_filtrado(huella, filtro)
+    return composicion_portafolio(None, resumen.cubo.serie('sabct'), resumen.skus_por_dimension['sabct'])
+
+@st.cache_data(max_entries=8)
+def historia_mensual(huella, filtro):
+    # Venta de cada mes del CSV para los canales, zonas y clases elegidos, sin el rango de meses
+    consulta = Consulta(medidas=('meses',), filtro=replace(filtro, desde=None, hasta=None))
+    return motor_consultas(huella).consultar(consulta).iloc[0].rename(None)
+
+@st.cache_resource(max_entries=2)
+def indice_articulos(huella):
+    # Frame ordenado por artículo y rango de filas de cada código, uno por dataset
+    df, _ = cargar_datos(huella)
+    return IndiceArticulos(df, copia=not MEMORIA_LIGERA)
+
+@st.cache_resource
+def ejecutor_pronostico():
+    # Un solo hilo por proceso para los ajustes por serie de todos los datasets
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='pronostico')
+
+@st.cache_resource(max_entries=2)
+def pronostico_en_segundo_plano(huella):
+    # El ajuste por serie corre en un hilo (con su pool de procesos) sin bloquear la página;
+    # queda guardado en disco por huella, así que solo el primer arranque lo calcula
+    df, _ = cargar_datos(huella)
+    return ejecutor_pronostico().submit(cargar_o_pronosticar, df, huella)
+
+def pronostico_por_serie(huella):
+    # Un ajuste que falló no queda en caché: el próximo rerun lo vuelve a lanzar
+    futuro = pronostico_en_segundo_plano(huella)
+    if futuro.done() and futuro.exception() is not None:
+        pronostico_en_segundo_plano.clear()
+    return futuro
+
+@st.cache_data(max_entries=6)
+def reclasificar(huella, filtro, por):
+    # Reclasificación Pareto por nivel, calculada solo cuando se pide
+    modelos = obtener_modelos(huella)
+    return clasificar_sabct(modelos.filas(filtro), por, filtro.rango(modelos.meses))
+
+@st.cache_data(max_entries=8)
+def analizar_obsoletos(huella, filtro):
+    # Último mes con venta, racha sin venta y tendencia de cada fila, sobre la matriz de meses filtrada
+    modelos = obtener_modelos(huella)
+    return analizar_obsolescencia(modelos.filas(filtro), filtro.rango(modelos.meses))
+
+@st.cache_data(max_entries=8)
+def proyeccion_agregada(huella, filtro):
+    # Un solo modelo sobre el total mensual: disponible de inmediato
+    return pronosticar_total(historia_mensual(huella, filtro))
+
+@st.cache_data(max_entries=8)
+def intervalo_proyeccion(huella, filtro, proyeccion):
+    return intervalo_total(historia_mensual(huella, filtro), proyeccion)
+
+@st.cache_data(max_entries=8)
+def pronostico_filtrado(huella, filtro):
+    # Series SKU × canal × zona que tienen filas en la selección
+    pronostico = pronostico_en_segundo_plano(huella).result()
+    if not filtro.filtra_filas():
+        return pronostico
+    claves = obtener_modelos(huella).filas(filtro)[CLAVES_SERIE].drop_duplicates()
+    return pronostico.merge(claves.astype(pronostico[CLAVES_SERIE].dtypes.to_dict()), on=CLAVES_SERIE)
 
-df, meses = cargar_datos()
+# ============================================================================
+# FILTROS CRUZADOS (aplican a todas las secciones)
+# ============================================================================
+huella = huella_csv()
+modelos = obtener_modelos(huella)
+orden_filtros = {'canal': CANALES, 'sabct': SABCT_PORTAFOLIO, 'zona': list(ZONAS)}
+titulos_filtros = {'canal': "Canal", 'zona': "Zona", 'sabct': "Clase SABCT"}
+
+with st.sidebar:
+    st.markdown("### 🔎 Filtros")
+    seleccion = {}
+    for dimension in DIMENSIONES_FILTRO:
+        disponibles = modelos.indice.etiquetas[dimension]
+        opciones = [v for v in orden_filtros[dimension] if v in disponibles] + \
+                   sorted(v for v in disponibles if v not in orden_filtros[dimension])
+        seleccion[dimension] = tuple(st.multiselect(titulos_filtros[dimension], opciones,
+                                                    placeholder="Todos", key=f"filtro_{dimension}"))
+    desde, hasta = st.select_slider("Meses", options=modelos.meses,
+                                    value=(modelos.meses[0], modelos.meses[-1]), key="filtro_meses")
+    filtro = Filtro(**seleccion, desde=desde, hasta=hasta)
+    filas_filtro = modelos.indice.contar(filtro)
+    st.caption(f"{filas_filtro:,} de {modelos.indice.filas:,} filas SKU × canal × zona")
+
+if filas_filtro == 0:
+    st.warning("Ninguna fila cumple la combinación de filtros elegida.")
+    st.stop()
+if len(filtro.rango(modelos.meses)) < 2:
+    st.warning("Elige un rango de al menos dos meses.")
+    st.stop()
+
+# Las tablas de SKUs por par de dimensiones salen del modelo; el resto de las agregaciones, del motor de consultas
+modelo = obtener_modelo(huella, filtro)
+indicadores = resumen_filtrado(huella, filtro)
+meses = list(indicadores.meses)
+
+# ============================================================================
+# MEMORIA (compartida por el proceso y propia de cada sesión)
+# ============================================================================
+with st.sidebar:
+    if st.toggle("🧠 Reporte de memoria", key="reporte_memoria"):
+        # Los buffers compartidos se cuentan una vez, en el primer objeto que los contiene
+        modelos_en_cache = modelos.en_cache()
+        futuro_pronostico = pronostico_por_serie(huella)
+        objetos = [
+            ('Proceso', "Dataset (meses float32 de solo lectura)", cargar_datos(huella)[0]),
+            ('Proceso', "Bitmaps de filtros", modelos.indice),
+            ('Proceso', f"Modelos por filtro ({len(modelos_en_cache)} de {modelos.max_modelos})", modelos_en_cache),
+            ('Proceso', "Índice de artículos", indice_articulos(huella)),
+        ]
+        if futuro_pronostico.done() and futuro_pronostico.exception() is None:
+            objetos.append(('Proceso', "Pronóstico por serie", futuro_pronostico.result()))
+        objetos.append(('Sesión', "Estado de sesión", st.session_state.to_dict()))
+        reporte = reporte_memoria(objetos)
+        por_ambito = reporte.groupby('AMBITO', sort=False)['BYTES'].sum()
+        st.caption(f"Compartido por el proceso: **{formatear_bytes(por_ambito['Proceso'])}** · "
+                   f"por sesión: **{formatear_bytes(por_ambito['Sesión'])}**"
+                   + (" · modo de memoria ligera" if MEMORIA_LIGERA else ""))
+        st.dataframe(reporte.set_index('OBJETO').style.format({'BYTES': formatear_bytes}), use_container_width=True)
 
 # ============================================================================
 # HEADER CON CONTEXTO
@@ -191,329 +346,15 @@ Este cambio impacta directamente los tiempos de entrega y la capacidad operativa
 </div>
 """, unsafe_allow_html=True)
 
-# ============================================================================
-# COMPOSICIÓN DEL PORTAFOLIO
-# ============================================================================
-st.markdown('<p class="section-title">📦 Composición del Portafolio</p>', unsafe_allow_html=True)
-
-col1, col2 = st.columns([1, 2])
-
-with col1:
-    st.markdown("""
-    <div class="metric-box" style="background-color: #f8f9fa; padding: 1.5rem; border-radius: 10px;">
-    <table style="width: 100%; border-collapse: collapse; font-size: 0.9rem;">
-        <tr style="border-bottom: 2px solid #1a1a2e;">
-            <th style="text-align: left; padding: 8px 0; color: #1a1a2e;">Clasificación</th>
-            <th style="text-align: right; padding: 8px 0; color: #1a1a2e;">SKUs</th>
-        </tr>
-        <tr style="border-bottom: 1px solid #e9ecef;">
-            <td style="padding: 6px 0;"><span style="color: #e94560;">●</span> <b>S</b> — Alta contribución (50%)</td>
-            <td style="text-align: right; padding: 6px 0;">121</td>
-        </tr>
-        <tr style="border-bottom: 1px solid #e9ecef;">
-            <td style="padding: 6px 0;"><span style="color: #f72585;">●</span> <b>A</b> — Contribución significativa (30%)</td>
-            <td style="text-align: right; padding: 6px 0;">273</td>
-        </tr>
-        <tr style="border-bottom: 1px solid #e9ecef;">
-            <td style="padding: 6px 0;"><span style="color: #7209b7;">●</span> <b>B</b> — Contribución moderada (15%)</td>
-            <td style="text-align: right; padding: 6px 0;">430</td>
-        </tr>
-        <tr style="border-bottom: 1px solid #e9ecef;">
-            <td style="padding: 6px 0;"><span style="color: #4361ee;">●</span> <b>C</b> — Baja contribución (4%)</td>
-            <td style="text-align: right; padding: 6px 0;">334</td>
-        </tr>
-        <tr style="border-bottom: 1px solid #e9ecef;">
-            <td style="padding: 6px 0;"><span style="color: #4cc9f0;">●</span> <b>T</b> — Cola larga (1%)</td>
-            <td style="text-align: right; padding: 6px 0;">815</td>
-        </tr>
-        <tr style="border-bottom: 1px solid #e9ecef;">
-            <td style="padding: 6px 0;"><span style="color: #00bf63;">●</span> <b>Nuevo</b> — Menos de 6 meses</td>
-            <td style="text-align: right; padding: 6px 0;">305</td>
-        </tr>
-        <tr style="border-bottom: 1px solid #e9ecef;">
-            <td style="padding: 6px 0;"><span style="color: #ff6b35;">●</span> <b>Gestión</b> — Seguimiento especial</td>
-            <td style="text-align: right; padding: 6px 0;">271</td>
-        </tr>
-        <tr style="border-bottom: 1px solid #e9ecef;">
-            <td style="padding: 6px 0;"><span style="color: #6c757d;">●</span> <b>Obsoleto</b> — Baja rotación</td>
-            <td style="text-align: right; padding: 6px 0;">6,296</td>
-        </tr>
-        <tr style="background-color: #1a1a2e; color: white;">
-            <td style="padding: 8px 0; font-weight: 600;">Total Portafolio</td>
-            <td style="text-align: right; padding: 8px 0; font-weight: 600;">8,850</td>
-        </tr>
-    </table>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col2:
-    st.markdown("""
-    <div class="insight-box">
-    <strong>📐 Metodología de Clasificación SABCT</strong><br><br>
-    La clasificación SABCT segmenta el portafolio según su contribución al negocio:
-    <br><br>
-    <b>🎯 Productos Estratégicos (S+A+B):</b> Representan el 95% de la facturación con solo 824 SKUs (9.3% del portafolio). Son el foco principal de disponibilidad y servicio.
-    <br><br>
-    <b>📊 Cola Larga (C+T):</b> 1,149 SKUs que complementan la oferta y atienden necesidades específicas de nicho.
-    <br><br>
-    <b>⚙️ Gestión Especial:</b> Productos nuevos en evaluación, artículos en seguimiento comercial y obsoletos pendientes de liquidación.
-    </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown("""
-    <div class="insight-box-highlight">
-    <strong>⚠️ Oportunidad Identificada:</strong> El alto volumen de productos obsoletos (<b>6,296 SKUs</b> = 71% del portafolio) representa capital inmovilizado y espacio de almacenamiento que podría liberarse para productos de mayor rotación.
-    </div>
-    """, unsafe_allow_html=True)
-
-# ============================================================================
-# COBERTURA GEOGRÁFICA - COMPARATIVA SAN LUIS vs LURÍN
-# ============================================================================
-st.markdown('<p class="section-title">🗺️ Impacto del Cambio de Almacén en Tiempos de Entrega</p>', unsafe_allow_html=True)
-
-st.markdown("""
-<div class="insight-box">
-<strong>📍 Contexto del cambio:</strong> En Agosto 2025, el centro de distribución se trasladó de <b>San Luis</b> (centro-este de Lima) 
-a <b>Lurín</b> (extremo sur). Esta comparativa muestra el impacto en los tiempos de entrega hacia las principales zonas comerciales.
-</div>
-""", unsafe_allow_html=True)
-
-# Coordenadas de ambos almacenes
-san_luis = {"lat": -12.070136596787389, "lon": -76.99200082864617, "nombre": "CD San Luis"}
-lurin = {"lat": -12.269444, "lon": -76.890889, "nombre": "CD Lurín"}
-
-# Zonas de destino con tiempos desde ambos almacenes
-zonas = {
-    "Wilson": {"lat": -12.054828666634194, "lon": -77.03806428818251, 
-               "tiempo_sanluis": "20min", "km_sanluis": "5",
-               "tiempo_lurin": "1h 20min", "km_lurin": "32"},
-    "Paruro": {"lat": -12.05042038678001, "lon": -77.02406775564982, 
-               "tiempo_sanluis": "18min", "km_sanluis": "4",
-               "tiempo_lurin": "1h 25min", "km_lurin": "33"},
-    "Malvinas": {"lat": -12.043337534371508, "lon": -77.04817089428148, 
-                 "tiempo_sanluis": "25min", "km_sanluis": "6",
-                 "tiempo_lurin": "1h 30min", "km_lurin": "35"},
-    "Azángaro": {"lat": -12.051654779770855, "lon": -77.03062129243266, 
-                 "tiempo_sanluis": "18min", "km_sanluis": "4",
-                 "tiempo_lurin": "1h 25min", "km_lurin": "33"},
-    "CompuPalace": {"lat": -12.116443820363907, "lon": -77.02803893901076, 
-                    "tiempo_sanluis": "15min", "km_sanluis": "6",
-                    "tiempo_lurin": "50min", "km_lurin": "22"},
-    "Marsano": {"lat": -12.117517551566221, "lon": -77.00740718503695, 
-                "tiempo_sanluis": "12min", "km_sanluis": "5",
-                "tiempo_lurin": "45min", "km_lurin": "20"}
-}
-
-# Colores por zona
-colores_zona = {
-    "Wilson": "#e94560",
-    "Paruro": "#4361ee", 
-    "Malvinas": "#00bf63",
-    "Azángaro": "#7209b7",
-    "CompuPalace": "#ff6b35",
-    "Marsano": "#4cc9f0"
-}
-
-# Crear dos mapas lado a lado
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("""
-    <div style="text-align: center; padding: 0.5rem; background: linear-gradient(135deg, #00bf63 0%, #2ecc71 100%); color: white; border-radius: 8px 8px 0 0; font-weight: 600;">
-    ✅ ANTES: San Luis (Ene-Jul 2025)
-    </div>
-    """, unsafe_allow_html=True)
-    
-    fig_sanluis = go.Figure()
-    
-    # Rutas desde San Luis
-    for zona, coords in zonas.items():
-        fig_sanluis.add_trace(go.Scattermapbox(
-            lat=[san_luis["lat"], coords["lat"]],
-            lon=[san_luis["lon"], coords["lon"]],
-            mode='lines',
-            line=dict(width=3, color=colores_zona[zona]),
-            name=f'{zona} ({coords["tiempo_sanluis"]})',
-            hoverinfo='text',
-            hovertext=f'Ruta a {zona}<br>Distancia: {coords["km_sanluis"]} km<br>Tiempo: {coords["tiempo_sanluis"]}'
-        ))
-    
-    # Marcador San Luis
-    fig_sanluis.add_trace(go.Scattermapbox(
-        lat=[san_luis["lat"]],
-        lon=[san_luis["lon"]],
-        mode='markers',
-        marker=dict(size=20, color='#00bf63', symbol='circle'),
-        name='CD San Luis',
-        hoverinfo='text',
-        hovertext='<b>CD San Luis</b><br>Jr. Salaverry 161<br><i>Operó hasta Jul 2025</i>'
-    ))
-    
-    # Marcadores de zonas
-    for zona, coords in zonas.items():
-        fig_sanluis.add_trace(go.Scattermapbox(
-            lat=[coords["lat"]],
-            lon=[coords["lon"]],
-            mode='markers',
-            marker=dict(size=12, color=colores_zona[zona]),
-            hoverinfo='text',
-            hovertext=f'<b>{zona}</b><br>Tiempo: {coords["tiempo_sanluis"]}',
-            showlegend=False
-        ))
-    
-    fig_sanluis.update_layout(
-        mapbox=dict(style="carto-positron", center=dict(lat=-12.08, lon=-77.01), zoom=11.5),
-        margin=dict(l=0, r=0, t=0, b=0),
-        height=400,
-        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5, font=dict(size=9)),
-        showlegend=True
-    )
-    
-    st.plotly_chart(fig_sanluis, use_container_width=True)
-
-with col2:
-    st.markdown("""
-    <div style="text-align: center; padding: 0.5rem; background: linear-gradient(135deg, #e94560 0%, #ff6b6b 100%); color: white; border-radius: 8px 8px 0 0; font-weight: 600;">
-    ⚠️ AHORA: Lurín (Ago-Dic 2025)
-    </div>
-    """, unsafe_allow_html=True)
-    
-    fig_lurin = go.Figure()
-    
-    # Rutas desde Lurín
-    for zona, coords in zonas.items():
-        fig_lurin.add_trace(go.Scattermapbox(
-            lat=[lurin["lat"], coords["lat"]],
-            lon=[lurin["lon"], coords["lon"]],
-            mode='lines',
-            line=dict(width=3, color=colores_zona[zona]),
-            name=f'{zona} ({coords["tiempo_lurin"]})',
-            hoverinfo='text',
-            hovertext=f'Ruta a {zona}<br>Distancia: {coords["km_lurin"]} km<br>Tiempo: {coords["tiempo_lurin"]}'
-        ))
-    
-    # Marcador Lurín
-    fig_lurin.add_trace(go.Scattermapbox(
-        lat=[lurin["lat"]],
-        lon=[lurin["lon"]],
-        mode='markers',
-        marker=dict(size=20, color='#e94560', symbol='circle'),
-        name='CD Lurín',
-        hoverinfo='text',
-        hovertext='<b>CD Lurín</b><br>Km 29.5 Panamericana Sur<br><i>Opera desde Ago 2025</i>'
-    ))
-    
-    # Marcadores de zonas
-    for zona, coords in zonas.items():
-        fig_lurin.add_trace(go.Scattermapbox(
-            lat=[coords["lat"]],
-            lon=[coords["lon"]],
-            mode='markers',
-            marker=dict(size=12, color=colores_zona[zona]),
-            hoverinfo='text',
-            hovertext=f'<b>{zona}</b><br>Tiempo: {coords["tiempo_lurin"]}',
-            showlegend=False
-        ))
-    
-    fig_lurin.update_layout(
-        mapbox=dict(style="carto-positron", center=dict(lat=-12.15, lon=-76.97), zoom=10.2),
-        margin=dict(l=0, r=0, t=0, b=0),
-        height=400,
-        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5, font=dict(size=9)),
-        showlegend=True
-    )
-    
-    st.plotly_chart(fig_lurin, use_container_width=True)
-
-# Tabla comparativa de tiempos
-st.markdown("#### ⏱️ Comparativa de Tiempos de Entrega")
-
-col1, col2, col3 = st.columns([1.2, 1.2, 0.8])
-
-with col1:
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, {COLORS['success']} 0%, #2ecc71 100%); color: white; padding: 1.2rem; border-radius: 10px;">
-        <h4 style="margin: 0 0 0.8rem 0; font-size: 0.95rem; border-bottom: 1px solid rgba(255,255,255,0.3); padding-bottom: 0.5rem;">✅ Desde San Luis</h4>
-        <div style="font-size: 0.85rem; line-height: 2;">
-            <div style="display: flex; justify-content: space-between;"><span>🔴 Wilson</span><span><b>20 min</b></span></div>
-            <div style="display: flex; justify-content: space-between;"><span>🔵 Paruro</span><span><b>18 min</b></span></div>
-            <div style="display: flex; justify-content: space-between;"><span>🟢 Malvinas</span><span><b>25 min</b></span></div>
-            <div style="display: flex; justify-content: space-between;"><span>🟣 Azángaro</span><span><b>18 min</b></span></div>
-            <div style="display: flex; justify-content: space-between; border-top: 1px solid rgba(255,255,255,0.2); padding-top: 6px; margin-top: 6px;"><span>🟠 CompuPalace</span><span><b>15 min</b></span></div>
-            <div style="display: flex; justify-content: space-between;"><span>🔵 Marsano</span><span><b>12 min</b></span></div>
-        </div>
-        <div style="margin-top: 1rem; padding-top: 0.8rem; border-top: 1px solid rgba(255,255,255,0.3); font-size: 0.9rem;">
-            <b>Promedio: ~18 min</b>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col2:
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, {COLORS['highlight']} 0%, #ff6b6b 100%); color: white; padding: 1.2rem; border-radius: 10px;">
-        <h4 style="margin: 0 0 0.8rem 0; font-size: 0.95rem; border-bottom: 1px solid rgba(255,255,255,0.3); padding-bottom: 0.5rem;">⚠️ Desde Lurín</h4>
-        <div style="font-size: 0.85rem; line-height: 2;">
-            <div style="display: flex; justify-content: space-between;"><span>🔴 Wilson</span><span><b>1h 20min</b></span></div>
-            <div style="display: flex; justify-content: space-between;"><span>🔵 Paruro</span><span><b>1h 25min</b></span></div>
-            <div style="display: flex; justify-content: space-between;"><span>🟢 Malvinas</span><span><b>1h 30min</b></span></div>
-            <div style="display: flex; justify-content: space-between;"><span>🟣 Azángaro</span><span><b>1h 25min</b></span></div>
-            <div style="display: flex; justify-content: space-between; border-top: 1px solid rgba(255,255,255,0.2); padding-top: 6px; margin-top: 6px;"><span>🟠 CompuPalace</span><span><b>50 min</b></span></div>
-            <div style="display: flex; justify-content: space-between;"><span>🔵 Marsano</span><span><b>45 min</b></span></div>
-        </div>
-        <div style="margin-top: 1rem; padding-top: 0.8rem; border-top: 1px solid rgba(255,255,255,0.3); font-size: 0.9rem;">
-            <b>Promedio: ~1h 06min</b>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col3:
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, {COLORS['primary']} 0%, {COLORS['secondary']} 100%); color: white; padding: 1.2rem; border-radius: 10px; text-align: center;">
-        <h4 style="margin: 0 0 1rem 0; font-size: 0.95rem;">📊 Incremento</h4>
-        <div style="font-size: 2.5rem; font-weight: 700; color: #ffd93d;">+267%</div>
-        <div style="font-size: 0.85rem; opacity: 0.9; margin-top: 0.5rem;">en tiempo<br>promedio</div>
-        <div style="margin-top: 1rem; padding-top: 0.8rem; border-top: 1px solid rgba(255,255,255,0.3); font-size: 0.8rem;">
-            De <b>18 min</b><br>a <b>1h 06min</b>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-# Calcular métricas por zona del mapa para el insight
-zonas_mapa = ['WILSON', 'PARURO', 'MALVINAS', 'AZANGARO', 'COMPUPALACE', 'MARSANO']
-zonas_data = []
-total_ventas_zonas = df[df['ZONA_CONSOLIDADO'].isin(zonas_mapa)]['TOTAL_2025'].sum()
-
-for zona in zonas_mapa:
-    df_zona = df[df['ZONA_CONSOLIDADO'] == zona]
-    skus = df_zona['ARTICULO'].nunique()
-    venta = df_zona['TOTAL_2025'].sum()
-    pct_contribucion = (venta / total_ventas_zonas * 100) if total_ventas_zonas > 0 else 0
-    zonas_data.append({'skus': skus, 'venta': venta, 'pct': pct_contribucion})
-
-# Calcular total de las 4 zonas críticas del centro
-venta_centro = sum([zonas_data[i]['venta'] for i in range(4)])
-pct_centro = sum([zonas_data[i]['pct'] for i in range(4)])
-
-st.markdown(f"""
-<div class="insight-box-highlight">
-<strong>🚨 Impacto Operativo del Cambio:</strong><br><br>
-• <b>Tiempo promedio de entrega aumentó 267%</b> (de 18 min a 1h 06min en promedio)<br><br>
-• Las zonas del <b>centro de Lima</b> (Wilson, Paruro, Malvinas, Azángaro) pasaron de <b>~20 min</b> a <b>+1h 20min</b><br><br>
-• Estas 4 zonas concentran <b>{pct_centro:.1f}%</b> de las ventas (${venta_centro/1000:,.0f}K) y operan <b>100% canal MINORISTA</b><br><br>
-• <b>Capacidad de entrega reducida:</b> Antes se podían hacer 6-8 ciclos/día, ahora máximo 2-3 ciclos/día hacia el centro
-</div>
-""", unsafe_allow_html=True)
-
 # ============================================================================
 # INDICADORES PRINCIPALES 2025
 # ============================================================================
 st.markdown('<p class="section-title">📈 Indicadores de Venta 2025</p>', unsafe_allow_html=True)
 
-# Cálculos
-total_2025 = df['TOTAL_2025'].sum()
-promedio_mensual = total_2025 / 12
-skus_con_venta = df[df['TOTAL_2025'] > 0]['ARTICULO'].nunique()
-skus_totales = df['ARTICULO'].nunique()
+total_2025 = indicadores.total_2025
+promedio_mensual = indicadores.promedio_mensual
+skus_con_venta = indicadores.skus_con_venta
+skus_totales = indicadores.skus_totales
 
 # Métricas principales con diseño mejorado
 col1, col2, col3, col4 = st.columns(4)
@@ -551,512 +392,1074 @@ with col4:
     </div>
     """, unsafe_allow_html=True)
 
-# Evolución mensual con anotaciones
-st.markdown("#### 📊 Evolución Mensual de Ventas")
+# Tiempo hasta que el encabezado y los KPIs quedan enviados al navegador
+st.session_state['tiempo_primer_pintado'] = time.perf_counter() - inicio_script
+
+# ============================================================================
+# CÁLCULOS POR SECCIÓN (cacheados, se ejecutan solo al abrir la sección)
+# ============================================================================
+# Descripción y color de cada clase en la tabla de composición
+pct_clase = participacion_clases()
+CLASES_PORTAFOLIO = {
+    'S': (f"Alta contribución ({pct_clase['S']:.0f}%)", '#e94560'),
+    'A': (f"Contribución significativa ({pct_clase['A']:.0f}%)", '#f72585'),
+    'B': (f"Contribución moderada ({pct_clase['B']:.0f}%)", '#7209b7'),
+    'C': (f"Baja contribución ({pct_clase['C']:.0f}%)", '#4361ee'),
+    'T': (f"Cola larga ({pct_clase['T']:.0f}%)", '#4cc9f0'),
+    'Nuevo': ('Menos de 6 meses', '#00bf63'),
+    'Gestión': ('Seguimiento especial', '#ff6b35'),
+    'Obsoleto': ('Baja rotación', '#6c757d'),
+}
+
+# Las 4 primeras zonas del mapa son las del centro de Lima
+ZONAS_CENTRO = ZONAS_MAPA[:4]
+
+# Filas de las tablas por SKU: pandas Styler no dibuja más de 262,144 celdas
+FILAS_TABLA_SKUS = 500
+
+# Variación del promedio mensual (en %) que todavía se considera estable
+BANDA_ESTABLE = 5
+
+def tabla_composicion_html(composicion, total_skus):
+    filas = []
+    for clase, skus in composicion['SKUS'].items():
+        descripcion, color = CLASES_PORTAFOLIO.get(clase, ('Sin descripción', COLORS['muted']))
+        filas.append(f"""        <tr style="border-bottom: 1px solid #e9ecef;">
+            <td style="padding: 6px 0;"><span style="color: {color};">●</span> <b>{clase}</b> — {descripcion}</td>
+            <td style="text-align: right; padding: 6px 0;">{skus:,}</td>
+        </tr>""")
+    filas = "\n".join(filas)
+    return f"""
+    <div class="metric-box" style="background-color: #f8f9fa; padding: 1.5rem; border-radius: 10px;">
+    <table style="width: 100%; border-collapse: collapse; font-size: 0.9rem;">
+        <tr style="border-bottom: 2px solid #1a1a2e;">
+            <th style="text-align: left; padding: 8px 0; color: #1a1a2e;">Clasificación</th>
+            <th style="text-align: right; padding: 8px 0; color: #1a1a2e;">SKUs</th>
+        </tr>
+{filas}
+        <tr style="background-color: #1a1a2e; color: white;">
+            <td style="padding: 8px 0; font-weight: 600;">Total Portafolio</td>
+            <td style="text-align: right; padding: 8px 0; font-weight: 600;">{total_skus:,}</td>
+        </tr>
+    </table>
+    </div>
+    """
+
+@st.cache_data
+def matriz_tiempos():
+    # Matriz almacén × zona de km y minutos (también guardada en disco)
+    return cargar_o_calcular_matriz(ALMACENES, ZONAS)
+
+@st.cache_data(max_entries=4)
+def mapa_almacen(huella, filtro, clave_almacen):
+    # Figura serializada por almacén: 3 trazas (rutas, zonas, almacén) sin importar cuántas zonas haya
+    metricas_zona = resumen_filtrado(huella, filtro).metricas_zona
+    minutos_zona = matriz_tiempos().tabla('minutos')
+    km_zona = matriz_tiempos().tabla('km')
+    venta_maxima = max(metricas_zona['VENTA'].max(), 1.0)
+    filas = []
+    for zona, ubicacion in ZONAS.items():
+        metricas = metricas_zona.loc[zona] if zona in metricas_zona.index else None
+        tiempo = formatear_minutos(minutos_zona.loc[clave_almacen, zona])
+        resumen = (f'Venta 2025: ${metricas["VENTA"]/1000:,.0f}K ({metricas["PCT"]:.1f}%)<br>SKUs: {int(metricas["SKUS"]):,}'
+                   if metricas is not None else 'Sin ventas 2025')
+        filas.append({
+            'NOMBRE': ubicacion['nombre'],
+            'LAT': ubicacion['lat'],
+            'LON': ubicacion['lon'],
+            'COLOR': ubicacion['color'],
+            # Área del marcador proporcional a la venta de la zona
+            'TAMANO': 8 + 14 * np.sqrt(metricas['VENTA'] / venta_maxima) if metricas is not None else 8,
+            'TEXTO_RUTA': f'Ruta a {ubicacion["nombre"]}<br>Distancia: {km_zona.loc[clave_almacen, zona]:.0f} km<br>Tiempo: {tiempo}',
+            'TEXTO_ZONA': f'<b>{ubicacion["nombre"]}</b><br>Tiempo: {tiempo}<br>{resumen}',
+        })
+    return figura_rutas(ALMACENES[clave_almacen], pd.DataFrame(filas)).to_json()
+
+def tarjeta_tiempos_html(titulo, gradiente, clave_almacen, promedio):
+    minutos_zona = matriz_tiempos().tabla('minutos')
+    filas = []
+    for i, zona in enumerate(ZONAS_MAPA):
+        separador = ' border-top: 1px solid rgba(255,255,255,0.2); padding-top: 6px; margin-top: 6px;' if i == len(ZONAS_CENTRO) else ''
+        filas.append(f"""            <div style="display: flex; justify-content: space-between;{separador}"><span><span style="color: {ZONAS[zona]['color']};">●</span> {ZONAS[zona]['nombre']}</span><span><b>{formatear_minutos(minutos_zona.loc[clave_almacen, zona])}</b></span></div>""")
+    filas = "\n".join(filas)
+    return f"""
+    <div style="background: {gradiente}; color: white; padding: 1.2rem; border-radius: 10px;">
+        <h4 style="margin: 0 0 0.8rem 0; font-size: 0.95rem; border-bottom: 1px solid rgba(255,255,255,0.3); padding-bottom: 0.5rem;">{titulo}</h4>
+        <div style="font-size: 0.85rem; line-height: 2;">
+{filas}
+        </div>
+        <div style="margin-top: 1rem; padding-top: 0.8rem; border-top: 1px solid rgba(255,255,255,0.3); font-size: 0.9rem;">
+            <b>Promedio: ~{formatear_minutos(promedio)}</b>
+        </div>
+    </div>
+    """
 
-ventas_mensuales = df[meses].sum()
-df_mensual = pd.DataFrame({
-    'Mes': meses,
-    'Ventas': ventas_mensuales.values
-})
+@st.cache_data
+def rango_ciclos_centro(clave_almacen):
+    # Ciclos por camión y día con demanda ilimitada hacia las zonas del centro (percentiles 10-90)
+    ciclos = ciclos_maximos(matriz_tiempos().tabla('minutos').loc[clave_almacen, ZONAS_CENTRO].to_numpy())
+    return tuple(int(x) for x in np.percentile(ciclos, [10, 90]))
+
+def texto_rango(rango):
+    return f"{rango[0]}" if rango[0] == rango[1] else f"{rango[0]}-{rango[1]}"
+
+@st.cache_data(max_entries=16)
+def simular_flota(huella, filtro, clave_almacen, parametros, dias):
+    # Días simulados en bloque; la demanda es la venta mensual promedio de cada zona del mapa
+    resumen = resumen_filtrado(huella, filtro)
+    venta_mensual = resumen.cubo.tabla('zona', 'periodo', periodo=list(resumen.meses)).mean(axis=1)
+    return simular_despacho(matriz_tiempos().tabla('minutos').loc[clave_almacen, ZONAS_MAPA].to_numpy(),
+                            venta_mensual.reindex(ZONAS_MAPA, fill_value=0).to_numpy(),
+                            parametros, dias=dias, zonas=ZONAS_MAPA)
+
+@st.cache_data(max_entries=8)
+def evaluar_ubicaciones(huella, filtro, puntos, resolucion):
+    # Grilla completa puntuada con una sola matriz candidatos × zonas, más k-medianas para los puntos propuestos
+    destinos, ventas = destinos_con_venta(resumen_filtrado(huella, filtro).metricas_zona['VENTA'], ZONAS_LIMA)
+    if destinos.empty:
+        return None
+    almacenes = pd.DataFrame(ALMACENES).T[['lat', 'lon']].astype(float)
+    candidatos = grilla_candidatos(pd.concat([destinos, almacenes]), resolucion)
+    puntaje = puntuar_sitios(candidatos, destinos, ventas)
+    actuales = puntuar_sitios(almacenes, destinos, ventas)
+    sitios, asignacion = ubicar_sitios(destinos, ventas, puntos)
+    return destinos, ventas, puntaje, actuales, sitios, asignacion
 
-fig_linea = go.Figure()
+# ============================================================================
+# COMPOSICIÓN DEL PORTAFOLIO
+# ============================================================================
+@st.fragment
+def seccion_portafolio():
+    st.markdown('<p class="section-title">📦 Composición del Portafolio</p>', unsafe_allow_html=True)
 
-# Área de fondo para período pre-cambio
-fig_linea.add_vrect(
-    x0=-0.5, x1=6.5,
-    fillcolor="rgba(0, 191, 99, 0.1)",
-    layer="below",
-    line_width=0,
-)
+    composicion = composicion_filtrada(huella, filtro)
+    skus_portafolio = indicadores.skus_totales
+    skus_estrategicos = composicion.loc[['S', 'A', 'B'], 'SKUS'].sum()
+    pct_venta_estrategicos = composicion.loc[['S', 'A', 'B'], 'PCT_VENTA'].sum()
+    skus_cola_larga = composicion.loc[['C', 'T'], 'SKUS'].sum()
+    skus_obsoletos = composicion.loc['Obsoleto', 'SKUS']
+    pct_obsoletos = skus_obsoletos / skus_portafolio * 100
 
-# Área de fondo para período post-cambio
-fig_linea.add_vrect(
-    x0=6.5, x1=11.5,
-    fillcolor="rgba(233, 69, 96, 0.1)",
-    layer="below",
-    line_width=0,
-)
+    col1, col2 = st.columns([1, 2])
 
-fig_linea.add_trace(go.Scatter(
-    x=df_mensual['Mes'], 
-    y=df_mensual['Ventas'],
-    mode='lines+markers',
-    name='Ventas 2025',
-    line=dict(color=COLORS['primary'], width=3, shape='spline', smoothing=1.3),
-    marker=dict(size=10, color=COLORS['primary'], line=dict(width=2, color='white')),
-    fill='tozeroy',
-    fillcolor='rgba(26, 26, 46, 0.1)'
-))
-
-# Línea vertical para el cambio de almacén
-fig_linea.add_vline(x=7, line_dash="dash", line_color=COLORS['highlight'], line_width=2,
-                     annotation_text="📦 Cambio a Lurín", annotation_position="top",
-                     annotation_font=dict(size=11, color=COLORS['highlight']))
-
-fig_linea.add_hline(y=promedio_mensual, line_dash="dot", line_color=COLORS['muted'], line_width=1,
-                     annotation_text=f"Promedio: ${promedio_mensual:,.0f}", annotation_position="right")
-
-# Anotaciones para meses clave
-mes_max_idx = df_mensual['Ventas'].idxmax()
-mes_min_idx = df_mensual['Ventas'].idxmin()
-
-fig_linea.add_annotation(
-    x=meses[mes_max_idx], y=df_mensual['Ventas'].max(),
-    text=f"🏆 Máximo<br>${df_mensual['Ventas'].max()/1000:,.0f}K",
-    showarrow=True, arrowhead=2, arrowsize=1, arrowwidth=2,
-    arrowcolor=COLORS['success'], font=dict(size=10, color=COLORS['success']),
-    ax=0, ay=-40
-)
+    with col1:
+        st.markdown(tabla_composicion_html(composicion, skus_portafolio), unsafe_allow_html=True)
 
-fig_linea.add_annotation(
-    x=meses[mes_min_idx], y=df_mensual['Ventas'].min(),
-    text=f"📉 Mínimo<br>${df_mensual['Ventas'].min()/1000:,.0f}K",
-    showarrow=True, arrowhead=2, arrowsize=1, arrowwidth=2,
-    arrowcolor=COLORS['highlight'], font=dict(size=10, color=COLORS['highlight']),
-    ax=0, ay=40
-)
+    with col2:
+        st.markdown(f"""
+        <div class="insight-box">
+        <strong>📐 Metodología de Clasificación SABCT</strong><br><br>
+        La clasificación SABCT segmenta el portafolio según su contribución al negocio:
+        <br><br>
+        <b>🎯 Productos Estratégicos (S+A+B):</b> Representan el {pct_venta_estrategicos:.0f}% de la facturación con solo {skus_estrategicos:,} SKUs ({skus_estrategicos / skus_portafolio * 100:.1f}% del portafolio). Son el foco principal de disponibilidad y servicio.
+        <br><br>
+        <b>📊 Cola Larga (C+T):</b> {skus_cola_larga:,} SKUs que complementan la oferta y atienden necesidades específicas de nicho.
+        <br><br>
+        <b>⚙️ Gestión Especial:</b> Productos nuevos en evaluación, artículos en seguimiento comercial y obsoletos pendientes de liquidación.
+        </div>
+        """, unsafe_allow_html=True)
+    
+        st.markdown(f"""
+        <div class="insight-box-highlight">
+        <strong>⚠️ Oportunidad Identificada:</strong> El alto volumen de productos obsoletos (<b>{skus_obsoletos:,} SKUs</b> = {pct_obsoletos:.0f}% del portafolio) representa capital inmovilizado y espacio de almacenamiento que podría liberarse para productos de mayor rotación.
+        </div>
+        """, unsafe_allow_html=True)
 
-fig_linea.update_layout(
-    height=400,
-    yaxis_title="Ventas (USD)",
-    xaxis_title="",
-    yaxis_tickformat="$,.0f",
-    margin=dict(l=60, r=20, t=40, b=40),
-    plot_bgcolor='white',
-    paper_bgcolor='white',
-    showlegend=False
-)
-fig_linea.update_xaxes(showgrid=True, gridwidth=1, gridcolor='#f0f0f0')
-fig_linea.update_yaxes(showgrid=True, gridwidth=1, gridcolor='#f0f0f0')
+    with st.expander("🔁 Reclasificación SABCT calculada con las ventas 2025"):
+        niveles_reclasificacion = {'Todo el portafolio': None, 'Por canal': 'canal', 'Por zona': 'zona'}
+        nivel = st.radio("Nivel", list(niveles_reclasificacion), horizontal=True)
+        clasificacion = reclasificar(modelo.huella, filtro, niveles_reclasificacion[nivel])
 
-st.plotly_chart(fig_linea, use_container_width=True)
+        columna_grupo = clasificacion.columns[0] if niveles_reclasificacion[nivel] else None
+        if columna_grupo:
+            grupo = st.selectbox(nivel.replace('Por ', '').capitalize(), clasificacion[columna_grupo].unique())
+            clasificacion = clasificacion[clasificacion[columna_grupo] == grupo]
 
-# Insight sobre el cambio
-venta_antes = df['VENTA_ANTES_CAMBIO'].sum()
-venta_despues = df['VENTA_DESPUES_CAMBIO'].sum()
-promedio_antes = venta_antes / 7
-promedio_despues = venta_despues / 5
-variacion = ((promedio_despues / promedio_antes) - 1) * 100
+        difieren = clasificacion[clasificacion['DIFIERE']]
+        umbrales = ", ".join(f"{clase} ≤ {limite * 100:.0f}%" for clase, limite in list(UMBRALES_PARETO.items())[:-1])
+        st.markdown(f"""
+        <div class="insight-box">
+        <strong>🔁 ERP vs cálculo:</strong> <b>{len(difieren):,}</b> de {len(clasificacion):,} SKUs ({len(difieren) / max(len(clasificacion), 1) * 100:.0f}%) tienen una clase calculada distinta a la del ERP.
+        Umbrales acumulados: {umbrales}, T resto; Nuevo con menos de {MESES_NUEVO} meses de historia; Obsoleto sin venta en el período.
+        </div>
+        """, unsafe_allow_html=True)
 
-if variacion < 0:
-    st.markdown(f"""
-    <div class="insight-box-highlight">
-    <strong>📊 Impacto del Cambio de Almacén:</strong> El promedio mensual <b>antes del cambio</b> (Ene-Jul) fue de <b>${promedio_antes:,.0f}</b>, mientras que <b>después del cambio</b> (Ago-Dic) bajó a <b>${promedio_despues:,.0f}</b>. Esto representa una <b>reducción del {abs(variacion):.1f}%</b> que podría estar relacionada con la mayor distancia a las zonas comerciales del centro.
+        col1, col2 = st.columns([1, 1.4])
+        with col1:
+            st.caption("SKUs por clase ERP (filas) y calculada (columnas)")
+            st.dataframe(matriz_confusion(clasificacion, SABCT_PORTAFOLIO), use_container_width=True)
+        with col2:
+            st.caption(f"SKUs cuya clase calculada difiere del ERP (primeros {min(len(difieren), FILAS_TABLA_SKUS):,} "
+                       f"de {len(difieren):,} por venta)")
+            st.dataframe(
+                difieren.drop(columns=['DIFIERE']).head(FILAS_TABLA_SKUS)
+                .style.format({'VENTA': USD, 'PARTICIPACION_ACUMULADA': PORCENTAJE}),
+                use_container_width=True, hide_index=True, height=300,
+            )
+            if len(difieren) > FILAS_TABLA_SKUS:
+                st.download_button(
+                    "⬇️ Todos los SKUs que difieren (CSV)",
+                    difieren.drop(columns=['DIFIERE']).to_csv(index=False).encode('utf-8-sig'),
+                    file_name="reclasificacion_sabct.csv", mime="text/csv",
+                )
+
+    with st.expander("🧹 Obsolescencia y prioridad de liquidación"):
+        analisis = analizar_obsoletos(modelo.huella, filtro)
+        conteo_estados = analisis['ESTADO'].value_counts()
+        erp_con_venta = int(((analisis['SABCT'] == 'Obsoleto') & (analisis['ESTADO'] == 'Activo')).sum())
+        st.markdown(f"""
+        <div class="insight-box">
+        <strong>🧹 Filas SKU × canal × zona por estado ({meses[0]} a {meses[-1]}):</strong>
+        <b>{conteo_estados['Sin venta']:,}</b> sin venta · <b>{conteo_estados['Muerto']:,}</b> muertas ({MESES_MUERTO}+ meses sin venta al cierre) ·
+        <b>{conteo_estados['En declive']:,}</b> en declive (tendencia ≤ {UMBRAL_DECLIVE * 100:.0f}% del promedio por mes) ·
+        <b>{conteo_estados['Activo']:,}</b> activas. {erp_con_venta:,} filas marcadas Obsoleto en el ERP siguen activas.
+        </div>
+        """, unsafe_allow_html=True)
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            zona_liquidacion = st.selectbox("Zona", ["Todas"] + sorted(analisis['ZONA_CONSOLIDADO'].astype(str).unique()))
+        with col2:
+            canal_liquidacion = st.selectbox("Canal", ["Todos"] + sorted(analisis['CANAL'].astype(str).unique()))
+        with col3:
+            filas_liquidacion = st.slider("Filas a mostrar", min_value=10, max_value=200, value=50, step=10)
+
+        seleccion_liquidacion = analisis
+        if zona_liquidacion != "Todas":
+            seleccion_liquidacion = seleccion_liquidacion[seleccion_liquidacion['ZONA_CONSOLIDADO'] == zona_liquidacion]
+        if canal_liquidacion != "Todos":
+            seleccion_liquidacion = seleccion_liquidacion[seleccion_liquidacion['CANAL'] == canal_liquidacion]
+        ranking = ranking_liquidacion(seleccion_liquidacion, por=())
+
+        col1, col2 = st.columns([1.6, 1])
+        with col1:
+            st.caption(f"Prioridad de liquidación ({len(ranking):,} filas candidatas)")
+            st.dataframe(
+                ranking.head(filas_liquidacion).set_index('RANKING')[COLUMNAS_OBSOLESCENCIA]
+                .style.format({'VENTA': USD, 'PENDIENTE': '{:+,.0f}', 'PENDIENTE_RELATIVA': '{:+.0%}'}),
+                use_container_width=True, height=350,
+            )
+        with col2:
+            st.caption("Filas por zona y estado")
+            st.dataframe(resumen_estados(seleccion_liquidacion), use_container_width=True, height=350)
+
+        st.download_button(
+            "⬇️ Ranking por zona y canal (CSV)",
+            ranking_liquidacion(analisis).to_csv(index=False).encode('utf-8-sig'),
+            file_name="liquidacion_zona_canal.csv", mime="text/csv",
+        )
+
+# ============================================================================
+# COBERTURA GEOGRÁFICA - COMPARATIVA SAN LUIS vs LURÍN
+# ============================================================================
+@st.fragment
+def seccion_cambio_almacen():
+    st.markdown('<p class="section-title">🗺️ Impacto del Cambio de Almacén en Tiempos de Entrega</p>', unsafe_allow_html=True)
+
+    st.markdown("""
+    <div class="insight-box">
+    <strong>📍 Contexto del cambio:</strong> En Agosto 2025, el centro de distribución se trasladó de <b>San Luis</b> (centro-este de Lima) 
+    a <b>Lurín</b> (extremo sur). Esta comparativa muestra el impacto en los tiempos de entrega hacia las principales zonas comerciales.
     </div>
     """, unsafe_allow_html=True)
-else:
+
+    tiempos_entrega = matriz_tiempos()
+
+    # Crear dos mapas lado a lado
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("""
+        <div style="text-align: center; padding: 0.5rem; background: linear-gradient(135deg, #00bf63 0%, #2ecc71 100%); color: white; border-radius: 8px 8px 0 0; font-weight: 600;">
+        ✅ ANTES: San Luis (Ene-Jul 2025)
+        </div>
+        """, unsafe_allow_html=True)
+        st.plotly_chart(pio.from_json(mapa_almacen(modelo.huella, filtro, ALMACEN_ANTERIOR)), use_container_width=True)
+
+    with col2:
+        st.markdown("""
+        <div style="text-align: center; padding: 0.5rem; background: linear-gradient(135deg, #e94560 0%, #ff6b6b 100%); color: white; border-radius: 8px 8px 0 0; font-weight: 600;">
+        ⚠️ AHORA: Lurín (Ago-Dic 2025)
+        </div>
+        """, unsafe_allow_html=True)
+        st.plotly_chart(pio.from_json(mapa_almacen(modelo.huella, filtro, ALMACEN_ACTUAL)), use_container_width=True)
+
+    # Tabla comparativa de tiempos
+    st.markdown("#### ⏱️ Comparativa de Tiempos de Entrega")
+
+    # Promedios sobre las zonas del mapa y las del centro de Lima
+    promedio_antes_min = tiempos_entrega.promedio(ZONAS_MAPA)[ALMACEN_ANTERIOR]
+    promedio_ahora_min = tiempos_entrega.promedio(ZONAS_MAPA)[ALMACEN_ACTUAL]
+    centro_antes_min = tiempos_entrega.promedio(ZONAS_CENTRO)[ALMACEN_ANTERIOR]
+    centro_ahora_min = tiempos_entrega.promedio(ZONAS_CENTRO)[ALMACEN_ACTUAL]
+    incremento_tiempo = (promedio_ahora_min / promedio_antes_min - 1) * 100
+
+    col1, col2, col3 = st.columns([1.2, 1.2, 0.8])
+
+    with col1:
+        st.markdown(tarjeta_tiempos_html("✅ Desde San Luis", f"linear-gradient(135deg, {COLORS['success']} 0%, #2ecc71 100%)",
+                                         ALMACEN_ANTERIOR, promedio_antes_min), unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(tarjeta_tiempos_html("⚠️ Desde Lurín", f"linear-gradient(135deg, {COLORS['highlight']} 0%, #ff6b6b 100%)",
+                                         ALMACEN_ACTUAL, promedio_ahora_min), unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, {COLORS['primary']} 0%, {COLORS['secondary']} 100%); color: white; padding: 1.2rem; border-radius: 10px; text-align: center;">
+            <h4 style="margin: 0 0 1rem 0; font-size: 0.95rem;">📊 Incremento</h4>
+            <div style="font-size: 2.5rem; font-weight: 700; color: #ffd93d;">{incremento_tiempo:+.0f}%</div>
+            <div style="font-size: 0.85rem; opacity: 0.9; margin-top: 0.5rem;">en tiempo<br>promedio</div>
+            <div style="margin-top: 1rem; padding-top: 0.8rem; border-top: 1px solid rgba(255,255,255,0.3); font-size: 0.8rem;">
+                De <b>{formatear_minutos(promedio_antes_min)}</b><br>a <b>{formatear_minutos(promedio_ahora_min)}</b>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    ciclos_antes = rango_ciclos_centro(ALMACEN_ANTERIOR)
+    ciclos_ahora = rango_ciclos_centro(ALMACEN_ACTUAL)
+
+    # Total de las 4 zonas críticas del centro
+    venta_centro = indicadores.venta_centro
+    pct_centro = indicadores.pct_centro
+
     st.markdown(f"""
-    <div class="insight-box-success">
-    <strong>📊 Impacto del Cambio de Almacén:</strong> A pesar del cambio de ubicación, el promedio mensual se mantuvo estable. Antes: <b>${promedio_antes:,.0f}</b> vs Después: <b>${promedio_despues:,.0f}</b> ({variacion:+.1f}%).
+    <div class="insight-box-highlight">
+    <strong>🚨 Impacto Operativo del Cambio:</strong><br><br>
+    • <b>Tiempo promedio de entrega aumentó {incremento_tiempo:.0f}%</b> (de {formatear_minutos(promedio_antes_min)} a {formatear_minutos(promedio_ahora_min)} en promedio)<br><br>
+    • Las zonas del <b>centro de Lima</b> (Wilson, Paruro, Malvinas, Azángaro) pasaron de <b>~{formatear_minutos(centro_antes_min)}</b> a <b>~{formatear_minutos(centro_ahora_min)}</b><br><br>
+    • Estas 4 zonas concentran <b>{pct_centro:.1f}%</b> de las ventas (${venta_centro/1000:,.0f}K) y operan <b>100% canal MINORISTA</b><br><br>
+    • <b>Capacidad de entrega reducida:</b> Antes se podían hacer {texto_rango(ciclos_antes)} ciclos/día, ahora máximo {texto_rango(ciclos_ahora)} ciclos/día hacia el centro
     </div>
     """, unsafe_allow_html=True)
 
+    with st.expander("🚚 Simulador de capacidad de despacho"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            camiones = st.slider("Camiones", min_value=1, max_value=12, value=ParametrosFlota.camiones)
+        with col2:
+            venta_por_viaje = st.number_input("Venta entregada por viaje (USD)", min_value=250, max_value=20000,
+                                              value=int(ParametrosFlota.venta_por_viaje), step=250)
+        with col3:
+            dias_simulados = st.select_slider("Días simulados", options=[1000, 2000, 5000, 10000], value=2000)
+
+        parametros_flota = ParametrosFlota(camiones=camiones, venta_por_viaje=float(venta_por_viaje))
+        resultados_flota = {clave: simular_flota(modelo.huella, filtro, clave, parametros_flota, dias_simulados)
+                            for clave in (ALMACEN_ANTERIOR, ALMACEN_ACTUAL)}
+
+        col1, col2 = st.columns(2)
+        for columna, clave in zip((col1, col2), resultados_flota):
+            resumen_flota = resultados_flota[clave].resumen()
+            with columna:
+                st.markdown(f"""
+                <div class="metric-box" style="text-align: center; padding: 1rem;">
+                    <p class="story-label">{ALMACENES[clave]['nombre']}</p>
+                    <p class="story-number">{resumen_flota['nivel_servicio'] * 100:.0f}%</p>
+                    <p style="color: {COLORS['muted']}; margin: 0;">de viajes atendidos en la jornada · {resumen_flota['dias_completos'] * 100:.0f}% de días sin pendientes</p>
+                    <p style="color: {COLORS['muted']}; margin: 0;">{resumen_flota['ciclos_por_camion']:.1f} ciclos por camión ({resumen_flota['ciclos_p10']:.1f}-{resumen_flota['ciclos_p90']:.1f}) · {resumen_flota['viajes_solicitados']:.1f} viajes pedidos/día</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+        servicio_zonas = pd.DataFrame({ALMACENES[clave]['nombre']: resultado.servicio_por_zona() * 100
+                                       for clave, resultado in resultados_flota.items()})
+        servicio_zonas.index = [ZONAS[zona]['nombre'] for zona in servicio_zonas.index]
+        st.caption("Nivel de servicio por zona (% de viajes atendidos)")
+        st.dataframe(servicio_zonas.style.format(PORCENTAJE_ENTERO), use_container_width=True)
+
+    with st.expander("📍 Evaluar ubicaciones candidatas (cross-docking o punto intermedio)"):
+        col1, col2 = st.columns(2)
+        with col1:
+            puntos_propuestos = st.slider("Puntos de despacho", min_value=1, max_value=4, value=1)
+        with col2:
+            resolucion_grilla = st.select_slider("Resolución de la grilla", options=[20, 40, 60, 80, 100], value=60)
+
+        ubicaciones = evaluar_ubicaciones(modelo.huella, filtro, puntos_propuestos, resolucion_grilla)
+        if ubicaciones is None:
+            st.info("La selección no tiene venta en las zonas de Lima: no hay ubicaciones que evaluar.")
+        else:
+            destinos_lima, ventas_lima, puntaje_sitios, puntaje_actual, sitios_propuestos, asignacion_sitios = ubicaciones
+            minutos_propuestos = np.average(sitios_propuestos['MINUTOS_PONDERADOS'], weights=sitios_propuestos['VENTA_ATENDIDA'])
+
+            st.markdown(f"""
+            <div class="insight-box">
+            <strong>📍 Tiempo de entrega ponderado por venta (zonas de Lima):</strong>
+            {ALMACENES[ALMACEN_ANTERIOR]['nombre']} <b>{formatear_minutos(puntaje_actual.loc[ALMACEN_ANTERIOR, 'MINUTOS_PONDERADOS'])}</b> ·
+            {ALMACENES[ALMACEN_ACTUAL]['nombre']} <b>{formatear_minutos(puntaje_actual.loc[ALMACEN_ACTUAL, 'MINUTOS_PONDERADOS'])}</b> ·
+            mejor punto de la grilla <b>{formatear_minutos(puntaje_sitios['MINUTOS_PONDERADOS'].iloc[0])}</b> ·
+            {puntos_propuestos} punto(s) propuesto(s) <b>{formatear_minutos(minutos_propuestos)}</b>
+            ({len(puntaje_sitios):,} candidatos evaluados).
+            </div>
+            """, unsafe_allow_html=True)
+
+            st.plotly_chart(figura_sitios(puntaje_sitios, destinos_lima, ventas_lima, ALMACENES, sitios_propuestos),
+                            use_container_width=True)
+
+            st.dataframe(
+                sitios_propuestos.assign(ZONAS=asignacion_sitios.groupby(asignacion_sitios).apply(lambda z: ", ".join(z.index)))
+                .style.format({'lat': '{:.4f}', 'lon': '{:.4f}', 'MINUTOS_PONDERADOS': '{:.0f} min', 'VENTA_ATENDIDA': USD}),
+                use_container_width=True,
+            )
+
 # ============================================================================
-# ANÁLISIS POR CANAL
+# EVOLUCIÓN MENSUAL
 # ============================================================================
-st.markdown('<p class="section-title">🏪 Distribución por Canal de Venta</p>', unsafe_allow_html=True)
+@st.fragment
+def seccion_evolucion():
+    promedio_mensual = indicadores.promedio_mensual
+
+    # Evolución mensual con anotaciones
+    st.markdown("#### 📊 Evolución Mensual de Ventas")
+
+    ventas_mensuales = indicadores.ventas_mensuales
+    df_mensual = pd.DataFrame({
+        'Mes': meses,
+        'Ventas': ventas_mensuales.values
+    })
+
+    # Mes de corte de la comparativa antes/después (por defecto, el cambio de almacén)
+    opciones_corte = meses[1:]
+    corte = st.select_slider(
+        "Mes de corte para comparar antes / después",
+        options=opciones_corte,
+        value=MES_CAMBIO if MES_CAMBIO in opciones_corte else opciones_corte[len(opciones_corte) // 2],
+    )
+    idx_corte = meses.index(corte)
+    es_cambio_almacen = corte == MES_CAMBIO
 
-canal_analysis = df.groupby('CANAL').agg({
-    'TOTAL_2025': 'sum',
-    'ARTICULO': 'nunique'
-}).reset_index()
+    fig_linea = go.Figure()
 
-canal_analysis.columns = ['CANAL', 'VENTA_2025', 'SKUs']
-canal_analysis['PROMEDIO_MENSUAL'] = canal_analysis['VENTA_2025'] / 12
-canal_analysis['PARTICIPACION'] = (canal_analysis['VENTA_2025'] / canal_analysis['VENTA_2025'].sum()) * 100
-canal_analysis = canal_analysis.sort_values('VENTA_2025', ascending=False)
+    # Área de fondo para período pre-cambio
+    fig_linea.add_vrect(
+        x0=-0.5, x1=idx_corte - 0.5,
+        fillcolor="rgba(0, 191, 99, 0.1)",
+        layer="below",
+        line_width=0,
+    )
 
-col1, col2 = st.columns([1.2, 0.8])
+    # Área de fondo para período post-cambio
+    fig_linea.add_vrect(
+        x0=idx_corte - 0.5, x1=len(meses) - 0.5,
+        fillcolor="rgba(233, 69, 96, 0.1)",
+        layer="below",
+        line_width=0,
+    )
 
-with col1:
-    # Donut chart más visual
-    fig_donut = go.Figure(data=[go.Pie(
-        labels=canal_analysis['CANAL'],
-        values=canal_analysis['VENTA_2025'],
-        hole=0.6,
-        marker=dict(colors=[CANAL_COLORS.get(c, '#999') for c in canal_analysis['CANAL']]),
-        textinfo='label+percent',
-        textfont=dict(size=12),
-        hovertemplate="<b>%{label}</b><br>Venta: $%{value:,.0f}<br>Participación: %{percent}<extra></extra>"
-    )])
-    
-    fig_donut.add_annotation(
-        text=f"<b>${total_2025/1000000:.1f}M</b><br><span style='font-size:12px'>Total 2025</span>",
-        x=0.5, y=0.5, font=dict(size=20, color=COLORS['primary']), showarrow=False
+    fig_linea.add_trace(go.Scatter(
+        x=df_mensual['Mes'], 
+        y=df_mensual['Ventas'],
+        mode='lines+markers',
+        name='Ventas 2025',
+        line=dict(color=COLORS['primary'], width=3, shape='spline', smoothing=1.3),
+        marker=dict(size=10, color=COLORS['primary'], line=dict(width=2, color='white')),
+        fill='tozeroy',
+        fillcolor='rgba(26, 26, 46, 0.1)'
+    ))
+
+    # Línea vertical para el cambio de almacén (o el corte elegido)
+    fig_linea.add_vline(x=idx_corte, line_dash="dash", line_color=COLORS['highlight'], line_width=2,
+                         annotation_text="📦 Cambio a Lurín" if es_cambio_almacen else f"📌 Corte: {corte}", annotation_position="top",
+                         annotation_font=dict(size=11, color=COLORS['highlight']))
+
+    fig_linea.add_hline(y=promedio_mensual, line_dash="dot", line_color=COLORS['muted'], line_width=1,
+                         annotation_text=f"Promedio: ${promedio_mensual:,.0f}", annotation_position="right")
+
+    # Anotaciones para meses clave
+    mes_max_idx = df_mensual['Ventas'].idxmax()
+    mes_min_idx = df_mensual['Ventas'].idxmin()
+
+    fig_linea.add_annotation(
+        x=meses[mes_max_idx], y=df_mensual['Ventas'].max(),
+        text=f"🏆 Máximo<br>${df_mensual['Ventas'].max()/1000:,.0f}K",
+        showarrow=True, arrowhead=2, arrowsize=1, arrowwidth=2,
+        arrowcolor=COLORS['success'], font=dict(size=10, color=COLORS['success']),
+        ax=0, ay=-40
     )
-    
-    fig_donut.update_layout(
-        height=350,
-        showlegend=True,
-        legend=dict(orientation="h", yanchor="bottom", y=-0.1, xanchor="center", x=0.5),
-        margin=dict(l=20, r=20, t=20, b=60)
+
+    fig_linea.add_annotation(
+        x=meses[mes_min_idx], y=df_mensual['Ventas'].min(),
+        text=f"📉 Mínimo<br>${df_mensual['Ventas'].min()/1000:,.0f}K",
+        showarrow=True, arrowhead=2, arrowsize=1, arrowwidth=2,
+        arrowcolor=COLORS['highlight'], font=dict(size=10, color=COLORS['highlight']),
+        ax=0, ay=40
     )
-    
-    st.plotly_chart(fig_donut, use_container_width=True)
 
-with col2:
-    st.markdown("#### Detalle por Canal")
-    for _, row in canal_analysis.iterrows():
-        color = CANAL_COLORS.get(row['CANAL'], '#999')
+    fig_linea.update_layout(
+        height=400,
+        yaxis_title="Ventas (USD)",
+        xaxis_title="",
+        yaxis_tickformat="$,.0f",
+        margin=dict(l=60, r=20, t=40, b=40),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        showlegend=False
+    )
+    fig_linea.update_xaxes(showgrid=True, gridwidth=1, gridcolor='#f0f0f0')
+    fig_linea.update_yaxes(showgrid=True, gridwidth=1, gridcolor='#f0f0f0')
+
+    col_grafico, col_proyeccion = st.columns([3, 1])
+
+    with col_grafico:
+        st.plotly_chart(fig_linea, use_container_width=True)
+
+    with col_proyeccion:
+        # Proyección del próximo trimestre con toda la historia de la selección (canal, zona, SABCT),
+        # no con el rango de meses del gráfico: suma de las series ajustadas si ya terminaron,
+        # si no, el modelo agregado mientras el cálculo sigue en segundo plano
+        futuro_pronostico = pronostico_por_serie(huella)
+        pronostico_listo = futuro_pronostico.done()
+        if pronostico_listo and futuro_pronostico.exception() is None:
+            pronostico = pronostico_filtrado(huella, filtro)
+            proyeccion = pronostico[meses_pronostico(pronostico)].sum()
+            fuente_proyeccion = f"Suma de {len(pronostico):,} series SKU × canal × zona"
+        else:
+            proyeccion = proyeccion_agregada(huella, filtro)
+            fuente_proyeccion = ("Estimación agregada (pronóstico por serie no disponible)" if pronostico_listo
+                                 else "Estimación agregada · pronóstico por serie en cálculo…")
+
+        serie_historica = historia_mensual(huella, filtro)
+        intervalo = intervalo_proyeccion(huella, filtro, proyeccion)
+        ultimos_meses = serie_historica.iloc[-len(proyeccion):]
+        variacion_proyeccion = (proyeccion.sum() / ultimos_meses.sum() - 1) * 100 if ultimos_meses.sum() > 0 else 0
+        detalle_meses = "".join(
+            f"<p style='margin: 0.2rem 0; color: {COLORS['primary']};'>{mes}: <b>${valor/1000:,.0f}K</b> "
+            f"<span style='color: {COLORS['muted']};'>(${inferior/1000:,.0f}K-${superior/1000:,.0f}K)</span></p>"
+            for mes, valor, inferior, superior in zip(proyeccion.index, proyeccion, intervalo['INFERIOR'], intervalo['SUPERIOR'])
+        )
         st.markdown(f"""
-        <div style="background: white; padding: 0.8rem 1rem; border-radius: 8px; margin-bottom: 0.5rem; border-left: 4px solid {color}; box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
-            <div style="display: flex; justify-content: space-between; align-items: center;">
-                <span style="font-weight: 600; color: {color};">{row['CANAL']}</span>
-                <span style="font-size: 0.85rem; color: #6c757d;">{row['PARTICIPACION']:.1f}%</span>
-            </div>
-            <div style="font-size: 1.2rem; font-weight: 700; color: #1a1a2e;">${row['VENTA_2025']/1000:,.0f}K</div>
-            <div style="font-size: 0.8rem; color: #6c757d;">{row['SKUs']} SKUs activos</div>
+        <div class="metric-box" style="text-align: center; padding: 1.5rem;">
+            <p class="story-label">🔮 Próximo trimestre ({proyeccion.index[0][:3]}-{proyeccion.index[-1]})</p>
+            <p class="story-number">${proyeccion.sum()/1000000:.2f}M</p>
+            <p style="color: {COLORS['muted']}; margin: 0;">{variacion_proyeccion:+.1f}% vs {ultimos_meses.index[0]} a {ultimos_meses.index[-1]}</p>
+            <hr style="margin: 0.8rem 0;">
+            {detalle_meses}
         </div>
         """, unsafe_allow_html=True)
 
-participacion_minorista = canal_analysis[canal_analysis['CANAL'] == 'MINORISTA']['PARTICIPACION'].values[0]
-st.markdown(f"""
-<div class="insight-box">
-<strong>🎯 Concentración de ventas:</strong> El canal <b>MINORISTA</b> representa el <b>{participacion_minorista:.1f}%</b> de las ventas totales, lo que indica alta dependencia de este segmento. Los canales <b>INTEGRADOR</b> y <b>OPERADORES</b> ofrecen oportunidades de diversificación con potencial de mayor margen en proyectos especializados.
-</div>
-""", unsafe_allow_html=True)
+        # Últimos meses reales, proyección y su intervalo en la misma figura
+        recientes = serie_historica.iloc[-6:]
+        fig_proyeccion = go.Figure()
+        fig_proyeccion.add_trace(go.Scatter(
+            x=list(intervalo.index) + list(intervalo.index[::-1]),
+            y=list(intervalo['SUPERIOR']) + list(intervalo['INFERIOR'][::-1]),
+            fill='toself', fillcolor='rgba(233, 69, 96, 0.15)', line=dict(width=0),
+            name=f"Intervalo {NIVEL_INTERVALO:.0%}", hoverinfo='skip'
+        ))
+        fig_proyeccion.add_trace(go.Scatter(
+            x=recientes.index, y=recientes.to_numpy(), mode='lines+markers', name='Real',
+            line=dict(color=COLORS['primary'], width=2)
+        ))
+        fig_proyeccion.add_trace(go.Scatter(
+            x=[recientes.index[-1]] + list(proyeccion.index), y=[recientes.iloc[-1]] + list(proyeccion),
+            mode='lines+markers', name='Proyección', line=dict(color=COLORS['highlight'], width=2, dash='dash')
+        ))
+        fig_proyeccion.update_layout(
+            height=220,
+            margin=dict(l=10, r=10, t=10, b=10),
+            # La banda se dibuja primero: el orden de los meses se fija para que no la tome de ella
+            xaxis=dict(categoryorder='array', categoryarray=list(recientes.index) + list(proyeccion.index)),
+            yaxis_tickformat="$.2s",
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            showlegend=False
+        )
+        st.plotly_chart(fig_proyeccion, use_container_width=True)
+        st.caption(fuente_proyeccion)
+        st.caption(f"🔮 Ajustada con toda la historia ({serie_historica.index[0]} a {serie_historica.index[-1]}) de los "
+                   f"canales, zonas y clases SABCT elegidos; no usa el rango de meses del gráfico ({meses[0]} a {meses[-1]}). "
+                   f"Banda: intervalo del {NIVEL_INTERVALO:.0%}.")
+
+    # Insight sobre el cambio (prefijos precalculados: O(1) para cualquier corte)
+    comparativa = indicadores.comparativas['total'].grupo('TOTAL', corte)
+    promedio_antes = comparativa['PROMEDIO_ANTES']
+    promedio_despues = comparativa['PROMEDIO_DESPUES']
+    variacion = comparativa['VARIACION']
+    evento = "Cambio de Almacén" if es_cambio_almacen else f"Corte en {corte}"
+    periodo_antes = f"{meses[0][:3]}-{meses[idx_corte - 1][:3]}"
+    periodo_despues = f"{corte[:3]}-{meses[-1][:3]}"
+
+    if pd.isna(variacion):
+        st.markdown(f"""
+        <div class="insight-box">
+        <strong>📊 Impacto del {evento}:</strong> Sin ventas antes del corte ({periodo_antes}) en la selección: no hay promedio previo con qué comparar. Después ({periodo_despues}) el promedio mensual fue de <b>${promedio_despues:,.0f}</b>.
+        </div>
+        """, unsafe_allow_html=True)
+    elif variacion <= -BANDA_ESTABLE:
+        causa = " que podría estar relacionada con la mayor distancia a las zonas comerciales del centro" if es_cambio_almacen else ""
+        st.markdown(f"""
+        <div class="insight-box-highlight">
+        <strong>📊 Impacto del {evento}:</strong> El promedio mensual <b>antes del cambio</b> ({periodo_antes}) fue de <b>${promedio_antes:,.0f}</b>, mientras que <b>después del cambio</b> ({periodo_despues}) bajó a <b>${promedio_despues:,.0f}</b>. Esto representa una <b>reducción del {abs(variacion):.1f}%</b>{causa}.
+        </div>
+        """, unsafe_allow_html=True)
+    elif variacion >= BANDA_ESTABLE:
+        contexto = "A pesar del cambio de ubicación, el" if es_cambio_almacen else "El"
+        st.markdown(f"""
+        <div class="insight-box-success">
+        <strong>📊 Impacto del {evento}:</strong> {contexto} promedio mensual <b>creció</b>: antes ({periodo_antes}) fue de <b>${promedio_antes:,.0f}</b> y después ({periodo_despues}) subió a <b>${promedio_despues:,.0f}</b>, un <b>aumento del {variacion:.1f}%</b>.
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        contexto = "A pesar del cambio de ubicación, el" if es_cambio_almacen else "El"
+        st.markdown(f"""
+        <div class="insight-box-success">
+        <strong>📊 Impacto del {evento}:</strong> {contexto} promedio mensual se mantuvo estable (variación menor a ±{BANDA_ESTABLE}%). Antes: <b>${promedio_antes:,.0f}</b> vs Después: <b>${promedio_despues:,.0f}</b> ({variacion:+.1f}%).
+        </div>
+        """, unsafe_allow_html=True)
+
+    with st.expander(f"🔎 Antes vs después de {corte} por canal y zona"):
+        col1, col2 = st.columns(2)
+        with col1:
+            por_canal = indicadores.comparativas['canal'].comparar(corte).sort_values('VENTA_DESPUES', ascending=False)
+            st.dataframe(por_canal.style.format(FORMATO_COMPARATIVA, na_rep="-"), use_container_width=True)
+        with col2:
+            por_zona = indicadores.comparativas['zona'].comparar(corte).sort_values('VENTA_DESPUES', ascending=False)
+            st.dataframe(por_zona.style.format(FORMATO_COMPARATIVA, na_rep="-"), use_container_width=True)
 
 # ============================================================================
-# ANÁLISIS SABCT POR CANAL - NUEVO DISEÑO DIDÁCTICO
+# ANÁLISIS POR CANAL
 # ============================================================================
-st.markdown('<p class="section-title">🧩 Composición SABCT por Canal de Venta</p>', unsafe_allow_html=True)
+@st.fragment
+def seccion_canales():
+    st.markdown('<p class="section-title">🏪 Distribución por Canal de Venta</p>', unsafe_allow_html=True)
+
+    canal_analysis = indicadores.canal_analysis
+    total_2025 = indicadores.total_2025
+
+    col1, col2 = st.columns([1.2, 0.8])
+
+    with col1:
+        # Donut chart más visual
+        fig_donut = go.Figure(data=[go.Pie(
+            labels=canal_analysis['CANAL'],
+            values=canal_analysis['VENTA_2025'],
+            hole=0.6,
+            marker=dict(colors=[CANAL_COLORS.get(c, '#999') for c in canal_analysis['CANAL']]),
+            textinfo='label+percent',
+            textfont=dict(size=12),
+            hovertemplate="<b>%{label}</b><br>Venta: $%{value:,.0f}<br>Participación: %{percent}<extra></extra>"
+        )])
+    
+        fig_donut.add_annotation(
+            text=f"<b>${total_2025/1000000:.1f}M</b><br><span style='font-size:12px'>Total 2025</span>",
+            x=0.5, y=0.5, font=dict(size=20, color=COLORS['primary']), showarrow=False
+        )
+    
+        fig_donut.update_layout(
+            height=350,
+            showlegend=True,
+            legend=dict(orientation="h", yanchor="bottom", y=-0.1, xanchor="center", x=0.5),
+            margin=dict(l=20, r=20, t=20, b=60)
+        )
+    
+        st.plotly_chart(fig_donut, use_container_width=True)
+
+    with col2:
+        st.markdown("#### Detalle por Canal")
+        for _, row in canal_analysis.iterrows():
+            color = CANAL_COLORS.get(row['CANAL'], '#999')
+            st.markdown(f"""
+            <div style="background: white; padding: 0.8rem 1rem; border-radius: 8px; margin-bottom: 0.5rem; border-left: 4px solid {color}; box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
+                <div style="display: flex; justify-content: space-between; align-items: center;">
+                    <span style="font-weight: 600; color: {color};">{row['CANAL']}</span>
+                    <span style="font-size: 0.85rem; color: #6c757d;">{row['PARTICIPACION']:.1f}%</span>
+                </div>
+                <div style="font-size: 1.2rem; font-weight: 700; color: #1a1a2e;">${row['VENTA_2025']/1000:,.0f}K</div>
+                <div style="font-size: 0.8rem; color: #6c757d;">{row['SKUs']} SKUs activos</div>
+            </div>
+            """, unsafe_allow_html=True)
 
-st.markdown("""
-<div class="insight-box">
-<strong>📖 ¿Qué nos dice este análisis?</strong> Cada canal de venta tiene una "personalidad" diferente según el tipo de productos que mueve. 
-Entender esta composición ayuda a definir estrategias de inventario y servicio diferenciadas.
-</div>
-""", unsafe_allow_html=True)
+    participacion_minorista = indicadores.participacion_minorista
+    st.markdown(f"""
+    <div class="insight-box">
+    <strong>🎯 Concentración de ventas:</strong> El canal <b>MINORISTA</b> representa el <b>{participacion_minorista:.1f}%</b> de las ventas totales, lo que indica alta dependencia de este segmento. Los canales <b>INTEGRADOR</b> y <b>OPERADORES</b> ofrecen oportunidades de diversificación con potencial de mayor margen en proyectos especializados.
+    </div>
+    """, unsafe_allow_html=True)
 
-# Filtrar solo clasificaciones activas (excluir Obsoleto y Gestión)
-sabct_activos = ['S', 'A', 'B', 'C', 'T', 'Nuevo']
-df_sabct_canal = df[df['SABCT'].isin(sabct_activos)]
-
-# Colores SABCT
-SABCT_COLORS = {
-    'S': '#e94560',
-    'A': '#f72585', 
-    'B': '#7209b7',
-    'C': '#4361ee',
-    'T': '#4cc9f0',
-    'Nuevo': '#00bf63'
-}
+# ============================================================================
+# ANÁLISIS SABCT POR CANAL - NUEVO DISEÑO DIDÁCTICO
+# ============================================================================
+@st.fragment
+def seccion_sabct_canal():
+    st.markdown('<p class="section-title">🧩 Composición SABCT por Canal de Venta</p>', unsafe_allow_html=True)
 
-# Tabla 1: Recuento de SKUs por Canal y SABCT
-pivot_skus = df_sabct_canal.groupby(['CANAL', 'SABCT'])['ARTICULO'].nunique().unstack(fill_value=0)
-pivot_skus = pivot_skus.reindex(columns=['S', 'A', 'B', 'C', 'T', 'Nuevo'], fill_value=0)
-pivot_skus['Total'] = pivot_skus.sum(axis=1)
-
-# Tabla 2: Participación de cada canal en cada clasificación SABCT
-totales_sabct = df_sabct_canal.groupby('SABCT')['ARTICULO'].nunique()
-pivot_participacion = pivot_skus.copy()
-for col in ['S', 'A', 'B', 'C', 'T', 'Nuevo']:
-    if col in totales_sabct.index and totales_sabct[col] > 0:
-        pivot_participacion[col] = (pivot_skus[col] / totales_sabct[col] * 100).round(0).astype(int)
-    else:
-        pivot_participacion[col] = 0
-
-# Gráfico de Treemap - Más didáctico que barras apiladas
-st.markdown("#### 🗺️ Mapa de Composición: ¿Dónde están los productos?")
-
-# Preparar datos para treemap
-treemap_data = []
-for canal in ['MINORISTA', 'INTEGRADOR', 'OPERADORES', 'RETAIL']:
-    if canal in pivot_skus.index:
-        for sabct in ['S', 'A', 'B', 'C', 'T', 'Nuevo']:
-            if pivot_skus.loc[canal, sabct] > 0:
-                treemap_data.append({
-                    'Canal': canal,
-                    'SABCT': sabct,
-                    'SKUs': pivot_skus.loc[canal, sabct],
-                    'Label': f"{sabct}"
-                })
-
-df_treemap = pd.DataFrame(treemap_data)
-
-fig_treemap = px.treemap(
-    df_treemap,
-    path=['Canal', 'SABCT'],
-    values='SKUs',
-    color='Canal',
-    color_discrete_map=CANAL_COLORS,
-    hover_data={'SKUs': True}
-)
+    st.markdown("""
+    <div class="insight-box">
+    <strong>📖 ¿Qué nos dice este análisis?</strong> Cada canal de venta tiene una "personalidad" diferente según el tipo de productos que mueve. 
+    Entender esta composición ayuda a definir estrategias de inventario y servicio diferenciadas.
+    </div>
+    """, unsafe_allow_html=True)
 
-fig_treemap.update_traces(
-    textinfo="label+value",
-    textfont=dict(size=14),
-    hovertemplate="<b>%{label}</b><br>SKUs: %{value}<extra></extra>"
-)
+    # Tabla 1: Recuento de SKUs por Canal y SABCT (solo clasificaciones activas)
+    pivot_skus = modelo.pivot_skus
 
-fig_treemap.update_layout(
-    height=450,
-    margin=dict(l=10, r=10, t=30, b=10)
-)
+    # Tabla 2: Participación de cada canal en cada clasificación SABCT
+    pivot_participacion = modelo.pivot_participacion
 
-st.plotly_chart(fig_treemap, use_container_width=True)
+    # Gráfico de Treemap - Más didáctico que barras apiladas
+    st.markdown("#### 🗺️ Mapa de Composición: ¿Dónde están los productos?")
 
-# Tablas lado a lado
-col1, col2 = st.columns(2)
+    df_treemap = modelo.df_treemap
 
-with col1:
-    st.markdown("#### 📊 Cantidad de SKUs")
-    # Estilizar tabla
-    styled_skus = pivot_skus.style.background_gradient(cmap='Blues', subset=['S', 'A', 'B', 'C', 'T', 'Nuevo'])
-    st.dataframe(pivot_skus, use_container_width=True)
+    if df_treemap.empty:
+        st.info("La selección no tiene SKUs en clases activas.")
+    else:
+        fig_treemap = px.treemap(
+            df_treemap,
+            path=['Canal', 'SABCT'],
+            values='SKUs',
+            color='Canal',
+            color_discrete_map=CANAL_COLORS,
+            hover_data={'SKUs': True}
+        )
+
+        fig_treemap.update_traces(
+            textinfo="label+value",
+            textfont=dict(size=14),
+            hovertemplate="<b>%{label}</b><br>SKUs: %{value}<extra></extra>"
+        )
+
+        fig_treemap.update_layout(
+            height=450,
+            margin=dict(l=10, r=10, t=30, b=10)
+        )
+
+        st.plotly_chart(fig_treemap, use_container_width=True)
+
+    # Tablas lado a lado
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("#### 📊 Cantidad de SKUs")
+        st.dataframe(pivot_skus, use_container_width=True)
+
+    with col2:
+        st.markdown("#### 📈 Participación del Canal en cada SABCT")
+        # El formato se aplica al dibujar la tabla, sin materializar una copia en texto
+        st.dataframe(pivot_participacion[['S', 'A', 'B', 'C', 'T', 'Nuevo']].style.format(PORCENTAJE_ENTERO), use_container_width=True)
+
+    # Gráfico radar para comparar perfiles
+    st.markdown("#### 🎯 Perfil de cada Canal")
+
+    canales_order = ['MINORISTA', 'INTEGRADOR', 'OPERADORES', 'RETAIL']
+    fig_radar = go.Figure()
+
+    for canal in canales_order:
+        if canal in pivot_participacion.index:
+            valores = [pivot_participacion.loc[canal, col] for col in ['S', 'A', 'B', 'C', 'T', 'Nuevo']]
+            valores.append(valores[0])  # Cerrar el polígono
+        
+            fig_radar.add_trace(go.Scatterpolar(
+                r=valores,
+                theta=['S', 'A', 'B', 'C', 'T', 'Nuevo', 'S'],
+                fill='toself',
+                fillcolor=f"rgba{tuple(list(int(CANAL_COLORS[canal].lstrip('#')[i:i+2], 16) for i in (0, 2, 4)) + [0.2])}",
+                line=dict(color=CANAL_COLORS[canal], width=2),
+                name=canal
+            ))
+
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 70]),
+            angularaxis=dict(tickfont=dict(size=12))
+        ),
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5),
+        height=400,
+        margin=dict(l=60, r=60, t=40, b=60)
+    )
 
-with col2:
-    st.markdown("#### 📈 Participación del Canal en cada SABCT")
-    pivot_part_display = pivot_participacion[['S', 'A', 'B', 'C', 'T', 'Nuevo']].copy()
-    pivot_part_display = pivot_part_display.applymap(lambda x: f"{x}%")
-    st.dataframe(pivot_part_display, use_container_width=True)
+    st.plotly_chart(fig_radar, use_container_width=True)
 
-# Gráfico radar para comparar perfiles
-st.markdown("#### 🎯 Perfil de cada Canal")
+    # Insights
+    part_minorista_nuevos = pivot_participacion.loc['MINORISTA', 'Nuevo'] if 'MINORISTA' in pivot_participacion.index else 0
 
-canales_order = ['MINORISTA', 'INTEGRADOR', 'OPERADORES', 'RETAIL']
-fig_radar = go.Figure()
+    st.markdown(f"""
+    <div class="insight-box-success">
+    <strong>💡 Hallazgos Clave:</strong><br><br>
+    • <b>MINORISTA es el motor de innovación:</b> Concentra el <b>{part_minorista_nuevos}%</b> de productos Nuevos, siendo el canal de prueba para nuevos lanzamientos.<br><br>
+    • <b>INTEGRADOR apuesta por valor:</b> Mayor participación relativa en productos S (alta contribución), enfocándose en proyectos de alto impacto.<br><br>
+    • <b>RETAIL es nicho:</b> Participación marginal (1-4%) sugiere ser un canal complementario, no prioritario.
+    </div>
+    """, unsafe_allow_html=True)
 
-for canal in canales_order:
-    if canal in pivot_participacion.index:
-        valores = [pivot_participacion.loc[canal, col] for col in ['S', 'A', 'B', 'C', 'T', 'Nuevo']]
-        valores.append(valores[0])  # Cerrar el polígono
-        
-        fig_radar.add_trace(go.Scatterpolar(
-            r=valores,
-            theta=['S', 'A', 'B', 'C', 'T', 'Nuevo', 'S'],
-            fill='toself',
-            fillcolor=f"rgba{tuple(list(int(CANAL_COLORS[canal].lstrip('#')[i:i+2], 16) for i in (0, 2, 4)) + [0.2])}",
-            line=dict(color=CANAL_COLORS[canal], width=2),
-            name=canal
-        ))
+# ============================================================================
+# NUEVA SECCIÓN: ANÁLISIS ZONA vs CANAL
+# ============================================================================
+@st.fragment
+def seccion_zonas():
+    st.markdown('<p class="section-title">🌍 Rendimiento por Zona y Canal</p>', unsafe_allow_html=True)
 
-fig_radar.update_layout(
-    polar=dict(
-        radialaxis=dict(visible=True, range=[0, 70]),
-        angularaxis=dict(tickfont=dict(size=12))
-    ),
-    showlegend=True,
-    legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5),
-    height=400,
-    margin=dict(l=60, r=60, t=40, b=60)
-)
+    st.markdown("""
+    <div class="insight-box">
+    <strong>📖 ¿Por qué es importante?</strong> Este cruce nos permite identificar qué zonas geográficas son más fuertes en cada canal, 
+    optimizar rutas de distribución y detectar oportunidades de crecimiento territorial.
+    </div>
+    """, unsafe_allow_html=True)
 
-st.plotly_chart(fig_radar, use_container_width=True)
+    # Tablas pivote zona × canal, ordenadas por venta total
+    pivot_pedidos = modelo.pivot_pedidos
+    pivot_ventas = modelo.pivot_ventas
+
+    # Visualización: Heatmap de ventas por zona y canal
+    st.markdown("#### 🔥 Mapa de Calor: Ventas por Zona y Canal")
+
+    # Preparar datos para heatmap (sin columna Total para mejor visualización)
+    canales_heatmap = [c for c in ['INTEGRADOR', 'MINORISTA', 'OPERADORES', 'RETAIL'] if c in pivot_ventas.columns]
+    zonas_top = pivot_ventas.head(10).index.tolist()
+
+    heatmap_values = pivot_ventas.loc[zonas_top, canales_heatmap].values
+
+    # Plotly escribe las etiquetas en miles desde z; las celdas sin venta quedan vacías
+    fig_heatmap = go.Figure(data=go.Heatmap(
+        z=np.where(heatmap_values > 0, heatmap_values / 1000, np.nan),
+        x=canales_heatmap,
+        y=zonas_top,
+        customdata=heatmap_values,
+        colorscale='Blues',
+        texttemplate="$%{z:,.0f}K",
+        textfont=dict(size=11),
+        hovertemplate="<b>%{y}</b> × <b>%{x}</b><br>Venta: $%{customdata:,.0f}<extra></extra>",
+        colorbar=dict(title="Venta USD", tickformat="$,.0f", ticksuffix="K")
+    ))
 
-# Insights
-part_minorista_nuevos = pivot_participacion.loc['MINORISTA', 'Nuevo'] if 'MINORISTA' in pivot_participacion.index else 0
-part_minorista_a = pivot_participacion.loc['MINORISTA', 'A'] if 'MINORISTA' in pivot_participacion.index else 0
+    # Una sola anotación marca la celda de mayor venta
+    if heatmap_values.size:
+        fila_max, columna_max = np.unravel_index(heatmap_values.argmax(), heatmap_values.shape)
+        fig_heatmap.add_annotation(x=canales_heatmap[columna_max], y=zonas_top[fila_max], text="⭐",
+                                   showarrow=False, font=dict(size=16), yshift=16)
+
+    fig_heatmap.update_layout(
+        height=450,
+        xaxis_title="Canal de Venta",
+        yaxis_title="",
+        margin=dict(l=120, r=20, t=30, b=60),
+        yaxis=dict(autorange="reversed")
+    )
 
-st.markdown(f"""
-<div class="insight-box-success">
-<strong>💡 Hallazgos Clave:</strong><br><br>
-• <b>MINORISTA es el motor de innovación:</b> Concentra el <b>{part_minorista_nuevos}%</b> de productos Nuevos, siendo el canal de prueba para nuevos lanzamientos.<br><br>
-• <b>INTEGRADOR apuesta por valor:</b> Mayor participación relativa en productos S (alta contribución), enfocándose en proyectos de alto impacto.<br><br>
-• <b>RETAIL es nicho:</b> Participación marginal (1-4%) sugiere ser un canal complementario, no prioritario.
-</div>
-""", unsafe_allow_html=True)
+    st.plotly_chart(fig_heatmap, use_container_width=True)
 
-# ============================================================================
-# NUEVA SECCIÓN: ANÁLISIS ZONA vs CANAL
-# ============================================================================
-st.markdown('<p class="section-title">🌍 Rendimiento por Zona y Canal</p>', unsafe_allow_html=True)
+    # Tablas detalladas
+    col1, col2 = st.columns(2)
 
-st.markdown("""
-<div class="insight-box">
-<strong>📖 ¿Por qué es importante?</strong> Este cruce nos permite identificar qué zonas geográficas son más fuertes en cada canal, 
-optimizar rutas de distribución y detectar oportunidades de crecimiento territorial.
-</div>
-""", unsafe_allow_html=True)
+    with col1:
+        st.markdown("#### 📦 SKUs Únicos por Zona y Canal")
+        st.dataframe(pivot_pedidos.style.format(ENTERO), use_container_width=True, height=400)
 
-# Calcular métricas por zona y canal
-zona_canal = df.groupby(['ZONA_CONSOLIDADO', 'CANAL']).agg({
-    'ARTICULO': 'nunique',  # Pedidos promedio (aproximación por SKUs únicos)
-    'TOTAL_2025': 'sum'     # Venta total
-}).reset_index()
-
-zona_canal.columns = ['ZONA', 'CANAL', 'PEDIDOS_PROMEDIO', 'VENTA_2025']
-
-# Crear tabla pivote
-pivot_pedidos = zona_canal.pivot_table(index='ZONA', columns='CANAL', values='PEDIDOS_PROMEDIO', aggfunc='sum', fill_value=0)
-pivot_ventas = zona_canal.pivot_table(index='ZONA', columns='CANAL', values='VENTA_2025', aggfunc='sum', fill_value=0)
-
-# Agregar totales
-pivot_pedidos['Total'] = pivot_pedidos.sum(axis=1)
-pivot_ventas['Total'] = pivot_ventas.sum(axis=1)
-
-# Ordenar por venta total
-pivot_ventas = pivot_ventas.sort_values('Total', ascending=False)
-pivot_pedidos = pivot_pedidos.loc[pivot_ventas.index]
-
-# Visualización: Heatmap de ventas por zona y canal
-st.markdown("#### 🔥 Mapa de Calor: Ventas por Zona y Canal")
-
-# Preparar datos para heatmap (sin columna Total para mejor visualización)
-canales_heatmap = ['INTEGRADOR', 'MINORISTA', 'OPERADORES', 'RETAIL']
-zonas_top = pivot_ventas.head(10).index.tolist()
-
-heatmap_values = pivot_ventas.loc[zonas_top, canales_heatmap].values
-
-fig_heatmap = go.Figure(data=go.Heatmap(
-    z=heatmap_values,
-    x=canales_heatmap,
-    y=zonas_top,
-    colorscale='Blues',
-    text=[[f"${val/1000:,.0f}K" if val > 0 else "-" for val in row] for row in heatmap_values],
-    texttemplate="%{text}",
-    textfont=dict(size=11),
-    hovertemplate="<b>%{y}</b> × <b>%{x}</b><br>Venta: $%{z:,.0f}<extra></extra>",
-    colorbar=dict(title="Venta USD", tickformat="$,.0f")
-))
-
-# Agregar anotaciones para valores destacados
-max_val = heatmap_values.max()
-for i, zona in enumerate(zonas_top):
-    for j, canal in enumerate(canales_heatmap):
-        val = heatmap_values[i][j]
-        if val == max_val:
-            fig_heatmap.add_annotation(
-                x=canal, y=zona,
-                text="⭐",
-                showarrow=False,
-                font=dict(size=16)
-            )
+    with col2:
+        st.markdown("#### 💰 Venta 2025 por Zona y Canal")
+        st.dataframe(estilo_usd(pivot_ventas), use_container_width=True, height=400)
 
-fig_heatmap.update_layout(
-    height=450,
-    xaxis_title="Canal de Venta",
-    yaxis_title="",
-    margin=dict(l=120, r=20, t=30, b=60),
-    yaxis=dict(autorange="reversed")
-)
+    # Gráfico de barras horizontales apiladas - Top zonas
+    st.markdown("#### 📊 Composición de Ventas: Top 8 Zonas")
 
-st.plotly_chart(fig_heatmap, use_container_width=True)
+    top_zonas = pivot_ventas.head(8).index.tolist()
 
-# Tablas detalladas
-col1, col2 = st.columns(2)
+    fig_barras_zona = go.Figure()
 
-with col1:
-    st.markdown("#### 📦 SKUs Únicos por Zona y Canal")
-    pivot_pedidos_display = pivot_pedidos.copy()
-    pivot_pedidos_display = pivot_pedidos_display.astype(int)
-    st.dataframe(pivot_pedidos_display, use_container_width=True, height=400)
+    for canal in ['MINORISTA', 'INTEGRADOR', 'OPERADORES', 'RETAIL']:
+        if canal in pivot_ventas.columns:
+            valores = pivot_ventas.loc[top_zonas, canal].to_numpy()
+            fig_barras_zona.add_trace(go.Bar(
+                name=canal,
+                y=top_zonas,
+                x=valores,
+                orientation='h',
+                marker_color=CANAL_COLORS.get(canal, '#999'),
+                # Los segmentos de hasta $50K no llevan etiqueta
+                texttemplate=np.where(valores > 50000, "%{x:$,.0f}", ""),
+                textposition='inside',
+                insidetextanchor='middle',
+                textfont=dict(size=10, color='white')
+            ))
 
-with col2:
-    st.markdown("#### 💰 Venta 2025 por Zona y Canal")
-    pivot_ventas_display = pivot_ventas.copy()
-    pivot_ventas_display = pivot_ventas_display.applymap(lambda x: f"${x:,.0f}" if x > 0 else "-")
-    st.dataframe(pivot_ventas_display, use_container_width=True, height=400)
-
-# Gráfico de barras horizontales apiladas - Top zonas
-st.markdown("#### 📊 Composición de Ventas: Top 8 Zonas")
-
-top_zonas = pivot_ventas.head(8).index.tolist()
-
-fig_barras_zona = go.Figure()
-
-for canal in ['MINORISTA', 'INTEGRADOR', 'OPERADORES', 'RETAIL']:
-    if canal in pivot_ventas.columns:
-        valores = [pivot_ventas.loc[zona, canal] for zona in top_zonas]
-        fig_barras_zona.add_trace(go.Bar(
-            name=canal,
-            y=top_zonas,
-            x=valores,
-            orientation='h',
-            marker_color=CANAL_COLORS.get(canal, '#999'),
-            text=[f"${v/1000:,.0f}K" if v > 50000 else "" for v in valores],
-            textposition='inside',
-            textfont=dict(size=10, color='white')
-        ))
+    fig_barras_zona.update_layout(
+        barmode='stack',
+        height=400,
+        xaxis_title="Venta Total 2025 (USD)",
+        xaxis_tickformat="$,.0f",
+        yaxis_title="",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        margin=dict(l=120, r=20, t=60, b=40),
+        plot_bgcolor='white'
+    )
+    fig_barras_zona.update_xaxes(showgrid=True, gridwidth=1, gridcolor='#f0f0f0')
+    fig_barras_zona.update_yaxes(autorange="reversed")
 
-fig_barras_zona.update_layout(
-    barmode='stack',
-    height=400,
-    xaxis_title="Venta Total 2025 (USD)",
-    xaxis_tickformat="$,.0f",
-    yaxis_title="",
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
-    margin=dict(l=120, r=20, t=60, b=40),
-    plot_bgcolor='white'
-)
-fig_barras_zona.update_xaxes(showgrid=True, gridwidth=1, gridcolor='#f0f0f0')
-fig_barras_zona.update_yaxes(autorange="reversed")
+    st.plotly_chart(fig_barras_zona, use_container_width=True)
 
-st.plotly_chart(fig_barras_zona, use_container_width=True)
+    # Insights de zona-canal
+    zona_top = pivot_ventas.index[0]
+    venta_zona_top = pivot_ventas.loc[zona_top, 'Total']
+    canal_dominante_zona_top = pivot_ventas.loc[zona_top, canales_heatmap].idxmax()
 
-# Insights de zona-canal
-zona_top = pivot_ventas.index[0]
-venta_zona_top = pivot_ventas.loc[zona_top, 'Total']
-canal_dominante_zona_top = pivot_ventas.loc[zona_top, canales_heatmap].idxmax()
+    st.markdown(f"""
+    <div class="insight-box">
+    <strong>🎯 Hallazgos Territoriales:</strong><br><br>
+    • <b>{zona_top}</b> es la zona líder con <b>${venta_zona_top:,.0f}</b> en ventas, dominada por el canal <b>{canal_dominante_zona_top}</b>.<br><br>
+    • Las zonas del <b>centro de Lima</b> (Wilson, Paruro, Malvinas, Azángaro) muestran fuerte concentración en MINORISTA, lo que amplifica el impacto del mayor tiempo de traslado desde Lurín.<br><br>
+    • <b>Provincias</b> muestra diversificación entre canales, sugiriendo estrategias diferenciadas por región.
+    </div>
+    """, unsafe_allow_html=True)
 
-st.markdown(f"""
-<div class="insight-box">
-<strong>🎯 Hallazgos Territoriales:</strong><br><br>
-• <b>{zona_top}</b> es la zona líder con <b>${venta_zona_top:,.0f}</b> en ventas, dominada por el canal <b>{canal_dominante_zona_top}</b>.<br><br>
-• Las zonas del <b>centro de Lima</b> (Wilson, Paruro, Malvinas, Azángaro) muestran fuerte concentración en MINORISTA, lo que amplifica el impacto del mayor tiempo de traslado desde Lurín.<br><br>
-• <b>Provincias</b> muestra diversificación entre canales, sugiriendo estrategias diferenciadas por región.
-</div>
-""", unsafe_allow_html=True)
+# ============================================================================
+# DETALLE POR SKU
+# ============================================================================
+@st.fragment
+def seccion_articulo():
+    st.markdown('<p class="section-title">🔍 Detalle por SKU</p>', unsafe_allow_html=True)
+
+    indice = indice_articulos(modelo.huella)
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        prefijo = st.text_input("Buscar artículo", placeholder="Inicio del código, p. ej. ADSS")
+    coincidencias, total_coincidencias = indice.buscar(prefijo)
+    with col2:
+        articulo = st.selectbox(f"Artículo ({total_coincidencias:,} coincidencias)", coincidencias,
+                                index=None if prefijo.strip() == "" else 0, placeholder="Elige un artículo")
+    if articulo is None:
+        st.caption(f"{len(indice):,} artículos en el catálogo")
+        return
+
+    # Los filtros de canal, zona y SABCT del panel lateral se aplican sobre las filas del artículo;
+    # la historia usa todos los meses, no solo el rango elegido
+    motor = MotorPandas(indice.filas(articulo))
+    seleccion = replace(filtro, desde=None, hasta=None)
+    historia = motor.consultar(Consulta(por=('canal', 'zona'), medidas=('meses',), filtro=seleccion))
+    if historia.empty:
+        st.info("El artículo no tiene filas en la selección de filtros.")
+        return
+
+    todos_meses = motor.meses
+    historia.index = [f"{canal} · {zona}" for canal, zona in historia.index]
+    clases = ", ".join(motor.consultar(Consulta(por=('sabct',), medidas=('filas',), filtro=seleccion)).index)
+    venta_periodo = historia[meses].to_numpy(dtype=np.float64).sum()
+
+    corte_articulo = MES_CAMBIO if MES_CAMBIO in meses[1:] else meses[len(meses) // 2]
+    comparativa = ComparativaCorte(historia[meses].to_numpy(), historia.index, meses).comparar(corte_articulo)
+    total = ComparativaCorte(historia[meses].sum().to_numpy()[None, :], ['TOTAL'], meses).grupo('TOTAL', corte_articulo)
+
+    col1, col2, col3, col4 = st.columns(4)
+    tarjetas = [
+        ("Clase SABCT", clases),
+        (f"Venta {meses[0]} a {meses[-1]}", f"${venta_periodo:,.0f}"),
+        (f"Promedio antes / desde {corte_articulo}", f"${total['PROMEDIO_ANTES']:,.0f} / ${total['PROMEDIO_DESPUES']:,.0f}"),
+        ("Variación", f"{total['VARIACION']:+.1f}%" if np.isfinite(total['VARIACION']) else "-"),
+    ]
+    for columna, (etiqueta, valor) in zip((col1, col2, col3, col4), tarjetas):
+        with columna:
+            st.markdown(f"""
+            <div class="metric-box" style="text-align: center; padding: 1rem;">
+                <p class="story-label">{etiqueta}</p>
+                <p style="font-size: 1.4rem; font-weight: 700; color: {COLORS['primary']}; margin: 0;">{valor}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+    fig_articulo = go.Figure()
+    for serie, valores in historia.iterrows():
+        fig_articulo.add_trace(go.Scatter(
+            x=todos_meses, y=valores.to_numpy(), mode='lines+markers', name=serie,
+            line=dict(color=CANAL_COLORS.get(serie.split(' · ')[0], COLORS['muted']), width=2),
+            hovertemplate=f"<b>{serie}</b><br>%{{x}}: $%{{y:,.0f}}<extra></extra>",
+        ))
+    if corte_articulo in todos_meses:
+        fig_articulo.add_vline(x=todos_meses.index(corte_articulo), line_dash="dash", line_color=COLORS['highlight'], line_width=2)
+    fig_articulo.update_layout(
+        height=380,
+        yaxis_title="Ventas (USD)",
+        yaxis_tickformat="$,.0f",
+        legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5),
+        margin=dict(l=60, r=20, t=20, b=40),
+        plot_bgcolor='white',
+    )
+    fig_articulo.update_xaxes(showgrid=True, gridwidth=1, gridcolor='#f0f0f0')
+    fig_articulo.update_yaxes(showgrid=True, gridwidth=1, gridcolor='#f0f0f0')
+    st.plotly_chart(fig_articulo, use_container_width=True)
+
+    st.caption(f"Venta mensual por canal · zona y comparativa antes / desde {corte_articulo}")
+    detalle = historia.join(comparativa[['PROMEDIO_ANTES', 'PROMEDIO_DESPUES', 'VARIACION']])
+    formato = dict.fromkeys(todos_meses, USD)
+    formato.update({col: FORMATO_COMPARATIVA[col] for col in ['PROMEDIO_ANTES', 'PROMEDIO_DESPUES', 'VARIACION']})
+    st.dataframe(detalle.style.format(formato, na_rep="-"), use_container_width=True)
 
 # ============================================================================
 # RESUMEN EJECUTIVO
 # ============================================================================
-st.markdown('<p class="section-title">📋 Resumen Ejecutivo</p>', unsafe_allow_html=True)
+@st.fragment
+def seccion_resumen():
+    st.markdown('<p class="section-title">📋 Resumen Ejecutivo</p>', unsafe_allow_html=True)
 
-# Calcular participación Lima vs Provincia
-zona_analysis = df.groupby('ZONA_CONSOLIDADO').agg({
-    'TOTAL_2025': 'sum'
-}).reset_index()
-zona_analysis['PARTICIPACION'] = (zona_analysis['TOTAL_2025'] / zona_analysis['TOTAL_2025'].sum()) * 100
-zonas_lima = ['LIMA', 'WILSON', 'MALVINAS', 'PARURO', 'AZANGARO', 'COMPUPALACE', 'MARSANO', 'CALLAO', 'RIMAC']
-zona_analysis['TIPO'] = zona_analysis['ZONA_CONSOLIDADO'].apply(lambda x: 'Lima' if x in zonas_lima else 'Provincia')
-part_lima = zona_analysis[zona_analysis['TIPO'] == 'Lima']['PARTICIPACION'].sum()
-part_provincia = zona_analysis[zona_analysis['TIPO'] == 'Provincia']['PARTICIPACION'].sum()
+    total_2025 = indicadores.total_2025
+    promedio_mensual = indicadores.promedio_mensual
+    skus_con_venta = indicadores.skus_con_venta
+    skus_totales = indicadores.skus_totales
+    participacion_minorista = indicadores.participacion_minorista
+    skus_obsoletos = composicion_filtrada(huella, filtro).loc['Obsoleto', 'SKUS']
+    pct_obsoletos = skus_obsoletos / skus_totales * 100
 
-col1, col2, col3 = st.columns(3)
+    # Participación Lima vs Provincia
+    part_lima = indicadores.part_lima
+    part_provincia = indicadores.part_provincia
 
-with col1:
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, {COLORS['primary']} 0%, {COLORS['secondary']} 100%); color: white; padding: 1.5rem; border-radius: 12px; height: 100%;">
-    <h4 style="margin: 0 0 1rem 0; border-bottom: 1px solid rgba(255,255,255,0.2); padding-bottom: 0.5rem;">📊 Indicadores Clave</h4>
-    <div style="font-size: 0.9rem; line-height: 1.8;">
-    • Venta total: <b>${total_2025:,.0f}</b><br>
-    • Promedio mensual: <b>${promedio_mensual:,.0f}</b><br>
-    • SKUs activos: <b>{skus_con_venta:,}</b> de {skus_totales:,}<br>
-    • Canal principal: MINORISTA ({participacion_minorista:.1f}%)<br>
-    • Concentración Lima: {part_lima:.1f}%
-    </div>
-    </div>
-    """, unsafe_allow_html=True)
+    col1, col2, col3 = st.columns(3)
 
-with col2:
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, {COLORS['warning']} 0%, #ff8c42 100%); color: white; padding: 1.5rem; border-radius: 12px; height: 100%;">
-    <h4 style="margin: 0 0 1rem 0; border-bottom: 1px solid rgba(255,255,255,0.2); padding-bottom: 0.5rem;">⚠️ Riesgos Identificados</h4>
-    <div style="font-size: 0.9rem; line-height: 1.8;">
-    • Alta dependencia del canal MINORISTA<br>
-    • Tiempos de entrega +1h al centro de Lima<br>
-    • 6,296 SKUs obsoletos (71% del catálogo)<br>
-    • Posible caída post-cambio de almacén<br>
-    • Concentración en pocas zonas
-    </div>
-    </div>
-    """, unsafe_allow_html=True)
+    with col1:
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, {COLORS['primary']} 0%, {COLORS['secondary']} 100%); color: white; padding: 1.5rem; border-radius: 12px; height: 100%;">
+        <h4 style="margin: 0 0 1rem 0; border-bottom: 1px solid rgba(255,255,255,0.2); padding-bottom: 0.5rem;">📊 Indicadores Clave</h4>
+        <div style="font-size: 0.9rem; line-height: 1.8;">
+        • Venta total: <b>${total_2025:,.0f}</b><br>
+        • Promedio mensual: <b>${promedio_mensual:,.0f}</b><br>
+        • SKUs activos: <b>{skus_con_venta:,}</b> de {skus_totales:,}<br>
+        • Canal principal: MINORISTA ({participacion_minorista:.1f}%)<br>
+        • Concentración Lima: {part_lima:.1f}%
+        </div>
+        </div>
+        """, unsafe_allow_html=True)
 
-with col3:
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, {COLORS['success']} 0%, #2ecc71 100%); color: white; padding: 1.5rem; border-radius: 12px; height: 100%;">
-    <h4 style="margin: 0 0 1rem 0; border-bottom: 1px solid rgba(255,255,255,0.2); padding-bottom: 0.5rem;">✅ Oportunidades</h4>
-    <div style="font-size: 0.9rem; line-height: 1.8;">
-    • Diversificar hacia INTEGRADOR/OPERADORES<br>
-    • Depurar inventario obsoleto<br>
-    • Optimizar rutas centro de Lima<br>
-    • Expandir en Provincias ({part_provincia:.1f}%)<br>
-    • Cross-docking o punto intermedio
-    </div>
-    </div>
-    """, unsafe_allow_html=True)
+    with col2:
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, {COLORS['warning']} 0%, #ff8c42 100%); color: white; padding: 1.5rem; border-radius: 12px; height: 100%;">
+        <h4 style="margin: 0 0 1rem 0; border-bottom: 1px solid rgba(255,255,255,0.2); padding-bottom: 0.5rem;">⚠️ Riesgos Identificados</h4>
+        <div style="font-size: 0.9rem; line-height: 1.8;">
+        • Alta dependencia del canal MINORISTA<br>
+        • Tiempos de entrega +1h al centro de Lima<br>
+        • {skus_obsoletos:,} SKUs obsoletos ({pct_obsoletos:.0f}% del catálogo)<br>
+        • Posible caída post-cambio de almacén<br>
+        • Concentración en pocas zonas
+        </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, {COLORS['success']} 0%, #2ecc71 100%); color: white; padding: 1.5rem; border-radius: 12px; height: 100%;">
+        <h4 style="margin: 0 0 1rem 0; border-bottom: 1px solid rgba(255,255,255,0.2); padding-bottom: 0.5rem;">✅ Oportunidades</h4>
+        <div style="font-size: 0.9rem; line-height: 1.8;">
+        • Diversificar hacia INTEGRADOR/OPERADORES<br>
+        • Depurar inventario obsoleto<br>
+        • Optimizar rutas centro de Lima<br>
+        • Expandir en Provincias ({part_provincia:.1f}%)<br>
+        • Cross-docking o punto intermedio
+        </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+# ============================================================================
+# NAVEGACIÓN: solo la sección abierta se calcula y se dibuja
+# ============================================================================
+SECCIONES = {
+    "📦 Portafolio": seccion_portafolio,
+    "🗺️ Cambio de almacén": seccion_cambio_almacen,
+    "📊 Evolución mensual": seccion_evolucion,
+    "🏪 Canales": seccion_canales,
+    "🧩 SABCT por canal": seccion_sabct_canal,
+    "🌍 Zona y canal": seccion_zonas,
+    "🔍 Detalle por SKU": seccion_articulo,
+    "📋 Resumen ejecutivo": seccion_resumen,
+}
+
+st.markdown("---")
+seccion = st.radio("Sección", list(SECCIONES), horizontal=True, key="seccion", label_visibility="collapsed")
+SECCIONES[seccion]()
 
 # Footer
 st.markdown("---")
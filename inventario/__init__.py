@@ -0,0 +1,42 @@
+"""
+INVENTARIO - Motor de datos del dashboard de movimiento de inventario
+Ingesta, limpieza y métricas sin dependencia de Streamlit
+
+Importar el paquete no carga pandas: los nombres públicos se resuelven al
+primer acceso (inventario.calcular_metricas importa recién ahí su módulo).
+"""
+
+import importlib
+
+# Nombre público -> submódulo que lo define
+_PUBLICOS = {
+    'cargar_con_cache': 'cache',
+    'huella_csv': 'cache',
+    'preparar_datos': 'ingesta',
+    'detectar_meses': 'ingesta',
+    'Filtro': 'filtros',
+    'ModelosFiltrados': 'filtros',
+    'Consulta': 'consultas',
+    'abrir_motor': 'consultas',
+    'resumir_por_bloques': 'bloques',
+    'ModeloMetricas': 'modelo',
+    'calcular_modelo': 'modelo',
+    'contar_skus': 'paralelo',
+    'calcular_metricas': 'metricas',
+    'metricas_principales': 'metricas',
+    'tabla_metricas': 'metricas',
+}
+
+__all__ = sorted(_PUBLICOS)
+
+
+def __getattr__(nombre):
+    if nombre not in _PUBLICOS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(importlib.import_module(f".{_PUBLICOS[nombre]}", __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,137 @@
+"""
+Línea de comandos del motor de inventario.
+
+Uso:
+    python -m inventario calentar-cache [--csv RUTA] [--forzar]
+    python -m inventario anexar-mes ARCHIVO [--mes Feb-26] [--csv RUTA]
+    python -m inventario pronosticar [--metodo ses] [--procesos N]
+    python -m inventario metricas [--csv RUTA ...] [--formato json|parquet] [--salida ARCHIVO]
+                                [--bloques N | --motor-consultas pandas|polars|duckdb]
+
+Cada comando importa sus módulos al ejecutarse: el arranque y --help no
+cargan pandas.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from .configuracion import (DIRECTORIO_CACHE, FILAS_POR_BLOQUE, FORMATOS_METRICAS, HORIZONTE, METODOS, MOTORES,
+                            MOTORES_CONSULTA, RUTA_CSV)
+
+
+def _calentar_cache(args):
+    from .cache import calentar_cache
+
+    inicio = time.perf_counter()
+    destino = calentar_cache(args.csv, args.directorio, forzar=args.forzar, motor=args.motor)
+    print(f"Caché lista: {destino} ({time.perf_counter() - inicio:.2f} s)")
+
+
+def _anexar_mes(args):
+    from .cache import anexar_mes_cache
+
+    inicio = time.perf_counter()
+    mes, destino = anexar_mes_cache(args.archivo, args.mes, args.csv, args.directorio)
+    print(f"{mes} anexado a {destino} ({time.perf_counter() - inicio:.2f} s)")
+
+
+def _pronosticar(args):
+    from .cache import cargar_con_cache
+    from .pronostico import cargar_o_pronosticar, ruta_pronostico
+
+    inicio = time.perf_counter()
+    df, huella = cargar_con_cache(args.csv, args.directorio)
+    destino = ruta_pronostico(huella, args.metodo, args.horizonte, args.directorio)
+    if args.forzar:
+        destino.unlink(missing_ok=True)
+    pronostico = cargar_o_pronosticar(df, huella, args.metodo, args.horizonte, args.directorio, args.procesos)
+    print(f"{len(pronostico):,} series pronosticadas: {destino} ({time.perf_counter() - inicio:.2f} s)")
+
+
+def _metricas(args):
+    from .filtros import Filtro
+    from .metricas import calcular_metricas, tabla_metricas
+
+    filtro = Filtro(canal=tuple(args.canal), zona=tuple(args.zona), sabct=tuple(args.sabct),
+                    desde=args.desde, hasta=args.hasta)
+    metricas = []
+    for ruta in args.csv or [RUTA_CSV]:
+        try:
+            metricas.append(calcular_metricas(ruta, filtro, args.directorio, args.bloques, args.motor_consultas))
+        except ValueError as error:
+            # Filtro sin filas o mes fuera del rango del CSV
+            raise SystemExit(f"{ruta}: {error}")
+        except ImportError as error:
+            raise SystemExit(f"--motor-consultas {args.motor_consultas} no está disponible: {error}")
+
+    if args.formato == 'parquet':
+        tabla_metricas(metricas).to_parquet(args.salida, index=False)
+        print(f"{len(metricas)} unidad(es) de negocio: {args.salida}", file=sys.stderr)
+        return
+    contenido = json.dumps(metricas, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(contenido + '\n')
+    else:
+        print(contenido)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m inventario', description='Motor de datos del dashboard de inventario')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    p_cache = subparsers.add_parser('calentar-cache', help='Genera la caché columnar del CSV (para hooks de despliegue)')
+    p_cache.add_argument('--csv', default=RUTA_CSV, help='CSV de origen')
+    p_cache.add_argument('--directorio', default=DIRECTORIO_CACHE, help='directorio de la caché')
+    p_cache.add_argument('--motor', choices=MOTORES, default='c', help='motor de lectura del CSV')
+    p_cache.add_argument('--forzar', action='store_true', help='reconstruir aunque la caché esté vigente')
+    p_cache.set_defaults(funcion=_calentar_cache)
+
+    p_mes = subparsers.add_parser('anexar-mes', help='Fusiona un archivo de un solo mes en la caché columnar')
+    p_mes.add_argument('archivo', help='CSV ARTICULO;SABCT;CANAL;ZONA_CONSOLIDADO;<valor>')
+    p_mes.add_argument('--mes', help='mes del archivo (Mmm-AA); por defecto, el encabezado de la columna de valores')
+    p_mes.add_argument('--csv', default=RUTA_CSV, help='CSV base de la caché')
+    p_mes.add_argument('--directorio', default=DIRECTORIO_CACHE, help='directorio de la caché')
+    p_mes.set_defaults(funcion=_anexar_mes)
+
+    p_pron = subparsers.add_parser('pronosticar', help='Ajusta y guarda el pronóstico de todas las series SKU × canal × zona')
+    p_pron.add_argument('--metodo', choices=METODOS, default='ses', help='modelo de cada serie')
+    p_pron.add_argument('--horizonte', type=int, default=HORIZONTE, help='meses a proyectar')
+    p_pron.add_argument('--procesos', type=int, help='procesos del pool (1 = sin pool)')
+    p_pron.add_argument('--csv', default=RUTA_CSV, help='CSV de origen')
+    p_pron.add_argument('--directorio', default=DIRECTORIO_CACHE, help='directorio de la caché')
+    p_pron.add_argument('--forzar', action='store_true', help='volver a ajustar aunque exista el pronóstico')
+    p_pron.set_defaults(funcion=_pronosticar)
+
+    p_met = subparsers.add_parser('metricas', help='Calcula los KPIs del dashboard y los escribe en JSON o Parquet')
+    p_met.add_argument('--csv', action='append', help='CSV de una unidad de negocio (repetible); por defecto el CSV configurado')
+    p_met.add_argument('--formato', choices=FORMATOS_METRICAS, default='json', help='formato de salida')
+    p_met.add_argument('--salida', help='archivo de salida (obligatorio con parquet; JSON va a la salida estándar)')
+    p_met.add_argument('--canal', nargs='+', default=[], help='canales a incluir (por defecto todos)')
+    p_met.add_argument('--zona', nargs='+', default=[], help='zonas a incluir (por defecto todas)')
+    p_met.add_argument('--sabct', nargs='+', default=[], help='clases SABCT a incluir (por defecto todas)')
+    p_met.add_argument('--desde', help='primer mes del rango (Mmm-AA)')
+    p_met.add_argument('--hasta', help='último mes del rango (Mmm-AA)')
+    p_met.add_argument('--directorio', default=DIRECTORIO_CACHE, help='directorio de la caché')
+    p_met.add_argument('--bloques', type=int, metavar='FILAS', const=FILAS_POR_BLOQUE, nargs='?',
+                       help=f'leer el CSV por bloques de FILAS filas (por defecto {FILAS_POR_BLOQUE:,}), '
+                            'con memoria acotada y sin caché')
+    p_met.add_argument('--motor-consultas', choices=MOTORES_CONSULTA,
+                       help='calcular con inventario.consultas en este motor (polars y duckdb son opcionales)')
+    p_met.set_defaults(funcion=_metricas)
+
+    args = parser.parse_args(argv)
+    if args.funcion is _metricas and args.formato == 'parquet' and not args.salida:
+        parser.error("--formato parquet requiere --salida")
+    if args.funcion is _metricas and args.bloques is not None and args.bloques < 1:
+        parser.error("--bloques debe ser al menos 1")
+    if args.funcion is _metricas and args.bloques and args.motor_consultas:
+        parser.error("--bloques y --motor-consultas no se combinan")
+    args.funcion(args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
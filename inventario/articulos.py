@@ -0,0 +1,81 @@
+"""
+Índice por artículo para el detalle de un SKU.
+
+El DataFrame se ordena una vez por ARTICULO y se guarda, para cada código,
+el rango de filas [inicio, fin) que ocupa en el frame ordenado. Un código se
+resuelve con una búsqueda binaria y un corte de filas, sin recorrer el
+DataFrame con una máscara. La búsqueda por prefijo (sin distinguir
+mayúsculas) es otro par de búsquedas binarias sobre los mismos códigos.
+
+Sin copia (modo de memoria ligera) se guarda solo el orden de las filas y
+cada consulta toma sus filas del DataFrame original.
+"""
+
+import numpy as np
+
+from .cubo import _codigos
+
+# Mayor code point: cualquier código que empiece con el prefijo queda antes de prefijo + _FIN
+_FIN = '\U0010ffff'
+
+
+class IndiceArticulos:
+    """Frame ordenado por artículo (o solo su orden, sin ``copia``) y rango de filas de cada código."""
+
+    def __init__(self, df, copia=True):
+        codigos, etiquetas = _codigos(df['ARTICULO'])
+        etiquetas = np.asarray(etiquetas, dtype=str)
+        claves = np.char.upper(etiquetas)
+
+        # Rango de cada etiqueta en el orden de las claves; las filas se ordenan por ese rango
+        orden_etiquetas = np.argsort(claves, kind='stable')
+        rango = np.empty(len(etiquetas), dtype=np.int64)
+        rango[orden_etiquetas] = np.arange(len(etiquetas))
+        clave_fila = rango[codigos]
+        orden = np.argsort(clave_fila, kind='stable')
+
+        conteos = np.bincount(clave_fila, minlength=len(etiquetas))
+        presentes = conteos > 0
+        fines = np.cumsum(conteos)
+        self.codigos = etiquetas[orden_etiquetas][presentes]
+        self.claves = claves[orden_etiquetas][presentes]
+        self.inicios = (fines - conteos)[presentes]
+        self.fines = fines[presentes]
+        if copia:
+            self.df = df.take(orden).reset_index(drop=True)
+            self.orden = None
+        else:
+            self.df = df
+            self.orden = orden
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def __contains__(self, codigo):
+        return self._posicion(codigo) is not None
+
+    def _posicion(self, codigo):
+        clave = str(codigo).upper()
+        i = int(np.searchsorted(self.claves, clave))
+        # Puede haber códigos que solo difieren en mayúsculas: se busca el exacto entre los de igual clave
+        while i < len(self.claves) and self.claves[i] == clave:
+            if self.codigos[i] == codigo:
+                return i
+            i += 1
+        return None
+
+    def filas(self, codigo):
+        """Filas del artículo ``codigo`` (corte del frame ordenado); KeyError si no existe."""
+        i = self._posicion(codigo)
+        if i is None:
+            raise KeyError(codigo)
+        if self.orden is None:
+            return self.df.iloc[self.inicios[i]:self.fines[i]]
+        return self.df.take(self.orden[self.inicios[i]:self.fines[i]])
+
+    def buscar(self, prefijo, limite=50):
+        """Hasta ``limite`` códigos que empiezan con ``prefijo``, en orden alfabético, y el total de coincidencias."""
+        prefijo = prefijo.strip().upper()
+        inicio = int(np.searchsorted(self.claves, prefijo, side='left'))
+        fin = int(np.searchsorted(self.claves, prefijo + _FIN, side='left'))
+        return self.codigos[inicio:min(fin, inicio + limite)].tolist(), fin - inicio
@@ -0,0 +1,172 @@
+"""
+Indicadores del CSV leído por bloques, sin cargar el archivo completo.
+
+Para exportaciones que no caben en memoria: el CSV se recorre en bloques de
+filas y cada bloque actualiza agregados acumulados: las ventas en un arreglo
+denso canal × zona × sabct × mes y, para los SKUs únicos, una marca
+booleana por SKU × valor de cada dimensión. La memoria queda acotada por el
+tamaño del bloque y la cantidad de SKUs y valores distintos, no por el
+número de filas.
+
+Los SKUs únicos se cuentan con esas marcas exactas y no con HyperLogLog:
+el resultado tiene que coincidir con el de calcular_modelo sobre el
+archivo completo. Las etiquetas se ordenan como las categorías de
+leer_csv, así que el cubo y los indicadores salen de las mismas funciones
+(Cubo.desde_celdas, construir_comparativas, indicadores).
+
+Se lee solo el CSV: los meses anexados a la caché columnar no se incluyen.
+"""
+
+from math import prod
+
+import numpy as np
+import pandas as pd
+
+from .cache import _sha256
+from .configuracion import FILAS_POR_BLOQUE
+from .corte import construir_comparativas
+from .cubo import COLUMNAS_DIMENSION, Cubo
+from .filtros import DIMENSIONES_FILTRO, SIN_FILTRO
+from .ingesta import ANIO_ANALISIS, RUTA_CSV, _leer_encabezado, detectar_meses, leer_csv_por_bloques
+from .modelo import ResumenIndicadores, indicadores
+
+# Ejes del cubo que se leen de las filas (periodo son las columnas)
+_EJES_FILAS = ('canal', 'zona', 'sabct')
+
+
+class _Etiquetas:
+    """Código global de cada valor de una dimensión, en orden de aparición."""
+
+    def __init__(self, columna):
+        self.columna = columna
+        self.posiciones = {}
+
+    def __len__(self):
+        return len(self.posiciones)
+
+    def codificar(self, serie):
+        """Códigos globales de las filas de ``serie`` (categórica con las categorías del bloque)."""
+        codigos = serie.cat.codes.to_numpy()
+        if (codigos < 0).any():
+            raise ValueError(f"Hay filas sin {self.columna}")
+        # setdefault evalúa len() antes de insertar: un valor nuevo recibe el siguiente código
+        mapa = np.array([self.posiciones.setdefault(valor, len(self.posiciones))
+                         for valor in serie.cat.categories.astype(str)], dtype=np.int64)
+        return mapa[codigos]
+
+    def orden(self):
+        """(etiquetas ordenadas, código global de cada una)."""
+        etiquetas = sorted(self.posiciones)
+        return etiquetas, np.array([self.posiciones[e] for e in etiquetas], dtype=np.int64)
+
+
+def _ampliar(marcas, forma):
+    """``marcas`` con al menos ``forma``; las filas (SKUs) crecen al doble para no copiar en cada bloque."""
+    if all(n <= m for n, m in zip(forma, marcas.shape)):
+        return marcas
+    nueva = (max(forma[0], 2 * marcas.shape[0]),) + tuple(max(n, m) for n, m in zip(forma[1:], marcas.shape[1:]))
+    ampliada = np.zeros(nueva, dtype=bool)
+    ampliada[tuple(slice(m) for m in marcas.shape)] = marcas
+    return ampliada
+
+
+class AgregadosBloques:
+    """Ventas y SKUs únicos acumulados bloque a bloque.
+
+    ``periodos`` son todas las columnas de mes del CSV (ejes del cubo) y
+    ``meses`` el rango que define los SKUs con venta.
+    """
+
+    def __init__(self, periodos, meses, filtro=SIN_FILTRO):
+        self.periodos = list(periodos)
+        self.meses = list(meses)
+        self.filtro = filtro
+        self.filas = 0
+        self._etiquetas = {dim: _Etiquetas(columna) for dim, columna in COLUMNAS_DIMENSION.items()}
+        self._ventas = np.zeros((0,) * len(_EJES_FILAS) + (len(self.periodos),))
+        # Marcas SKU × valor por dimensión y SKU con venta en el rango
+        self._vistos = {dim: np.zeros((0, 0), dtype=bool) for dim in _EJES_FILAS}
+        self._con_venta = np.zeros(0, dtype=bool)
+
+    def agregar(self, bloque):
+        # Se codifica el bloque entero antes de filtrar: las etiquetas del cubo
+        # son todos los valores del archivo, como las categorías de leer_csv
+        codigos = {dim: etiquetas.codificar(bloque[etiquetas.columna]) for dim, etiquetas in self._etiquetas.items()}
+        if self.filtro.filtra_filas():
+            mascara = np.ones(len(bloque), dtype=bool)
+            for dim in DIMENSIONES_FILTRO:
+                valores = getattr(self.filtro, dim)
+                if valores:
+                    mascara &= bloque[COLUMNAS_DIMENSION[dim]].isin(valores).to_numpy()
+            bloque = bloque[mascara]
+            codigos = {dim: c[mascara] for dim, c in codigos.items()}
+        self.filas += len(bloque)
+
+        forma = tuple(len(self._etiquetas[dim]) for dim in _EJES_FILAS) + (len(self.periodos),)
+        if forma != self._ventas.shape:
+            self._ventas = np.pad(self._ventas, [(0, n - m) for n, m in zip(forma, self._ventas.shape)])
+        matriz = bloque[self.periodos].to_numpy(dtype=np.float32)
+        filas, columnas = np.nonzero(matriz)
+        plano = np.ravel_multi_index([codigos[dim][filas] for dim in _EJES_FILAS] + [columnas], forma)
+        self._ventas += np.bincount(plano, weights=matriz[filas, columnas].astype(np.float64),
+                                    minlength=prod(forma)).reshape(forma)
+
+        sku = codigos['sku']
+        # Mismo criterio que TOTAL_2025 > 0 de agregar_totales
+        con_venta = bloque[self.meses].to_numpy(dtype=np.float64).sum(axis=1) > 0
+        n_skus = len(self._etiquetas['sku'])
+        for dim in _EJES_FILAS:
+            self._vistos[dim] = _ampliar(self._vistos[dim], (n_skus, len(self._etiquetas[dim])))
+            self._vistos[dim][sku, codigos[dim]] = True
+        self._con_venta = _ampliar(self._con_venta, (n_skus,))
+        self._con_venta[sku[con_venta]] = True
+
+    def cubo(self):
+        etiquetas = {'periodo': self.periodos}
+        posiciones = []
+        for dim in _EJES_FILAS:
+            etiquetas[dim], orden = self._etiquetas[dim].orden()
+            posiciones.append(orden)
+        return Cubo.desde_celdas(self._ventas[np.ix_(*posiciones, range(len(self.periodos)))], etiquetas)
+
+    def skus_por(self, dim):
+        """SKUs únicos por valor de ``dim``, solo valores con filas y en orden alfabético."""
+        etiquetas, orden = self._etiquetas[dim].orden()
+        conteos = self._vistos[dim].sum(axis=0)[orden]
+        presentes = conteos > 0
+        return pd.Series(conteos[presentes], index=pd.Index(etiquetas, name=COLUMNAS_DIMENSION[dim])[presentes],
+                         name='ARTICULO')
+
+    def resumen(self, huella=''):
+        """ResumenIndicadores de lo acumulado; ValueError si ninguna fila pasó el filtro."""
+        if not self.filas:
+            raise ValueError("La combinación de filtros no tiene filas")
+        cubo = self.cubo()
+        comparativas = construir_comparativas(cubo, None, self.meses)
+        skus = {dim: self.skus_por(dim) for dim in _EJES_FILAS}
+        return ResumenIndicadores(
+            huella=huella,
+            meses=tuple(self.meses),
+            filas=self.filas,
+            cubo=cubo,
+            comparativas=comparativas,
+            # Toda fila tiene canal: un SKU con filas tiene alguna marca de canal
+            skus_totales=int(self._vistos['canal'].any(axis=1).sum()),
+            skus_con_venta=int(self._con_venta.sum()),
+            skus_por_dimension=skus,
+            **indicadores(cubo, comparativas['total'], self.meses, skus['canal'], skus['zona']),
+        )
+
+
+def resumir_por_bloques(ruta=RUTA_CSV, filtro=SIN_FILTRO, filas_por_bloque=FILAS_POR_BLOQUE):
+    """ResumenIndicadores del CSV para ``filtro`` leyendo ``filas_por_bloque`` filas a la vez.
+
+    ValueError si el filtro no tiene filas o el rango nombra un mes que no está en el CSV.
+    """
+    columnas = _leer_encabezado(ruta)
+    filtro = filtro.normalizado()
+    agregados = AgregadosBloques(detectar_meses(columnas), filtro.rango(detectar_meses(columnas, ANIO_ANALISIS)),
+                                 filtro)
+    for bloque in leer_csv_por_bloques(ruta, filas_por_bloque):
+        agregados.agregar(bloque)
+    return agregados.resumen(_sha256(ruta))
@@ -0,0 +1,176 @@
+"""
+Caché columnar en disco del DataFrame limpio.
+
+El resultado de preparar_datos se guarda en Feather (Arrow IPC sin
+compresión). El CSV se identifica por tamaño, mtime y SHA-256; los arranques
+posteriores leen el archivo con memory-map en lugar de volver a interpretar
+el CSV, y cualquier cambio en su contenido fuerza la reconstrucción.
+
+La caché es también el almacén al que se anexan meses incrementales: la
+huella del dataset combina la del CSV con la de cada mes anexado.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from .configuracion import DIRECTORIO_CACHE
+from .incremental import anexar_mes, leer_mes
+from .ingesta import RUTA_CSV, preparar_datos
+
+# Incrementar cuando cambie la forma del DataFrame guardado
+VERSION_CACHE = 2
+
+_BLOQUE_HASH = 1 << 20
+
+
+def _sha256(ruta):
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        while bloque := f.read(_BLOQUE_HASH):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _ruta_registro(ruta, directorio):
+    return Path(directorio) / f"{Path(ruta).stem}.json"
+
+
+def _leer_registro(ruta, directorio):
+    try:
+        with open(_ruta_registro(ruta, directorio), encoding='utf-8') as f:
+            registro = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return registro if registro.get('version') == VERSION_CACHE else None
+
+
+def _escribir_registro(ruta, directorio, registro):
+    contenido = json.dumps(registro, indent=2)
+    escribir_atomico(_ruta_registro(ruta, directorio),
+                      lambda tmp: Path(tmp).write_text(contenido, encoding='utf-8'))
+
+
+def escribir_atomico(destino, escribir):
+    """Llama ``escribir(temporal)`` y reemplaza ``destino`` con el temporal en un solo paso.
+
+    Un lector concurrente ve el archivo anterior o el nuevo, nunca uno a medio escribir.
+    """
+    temporal = destino.with_name(destino.name + '.tmp')
+    escribir(temporal)
+    os.replace(temporal, destino)
+
+
+def _misma_version_csv(registro, stat):
+    return (registro is not None
+            and registro['tamano'] == stat.st_size and registro['mtime_ns'] == stat.st_mtime_ns)
+
+
+def huella_csv(ruta=RUTA_CSV, directorio=DIRECTORIO_CACHE):
+    """Devuelve la huella del dataset (CSV más meses anexados).
+
+    Si tamaño y mtime del CSV coinciden con el registro se reutiliza la huella
+    guardada; solo se vuelve a leer el archivo completo cuando alguno cambia.
+    """
+    registro = _leer_registro(ruta, directorio)
+    if _misma_version_csv(registro, os.stat(ruta)):
+        return registro['huella']
+    return _sha256(ruta)
+
+
+def _ruta_datos(ruta, directorio, huella):
+    return Path(directorio) / f"{Path(ruta).stem}-{huella[:16]}.feather"
+
+
+def _guardar(df, ruta, directorio, registro, anterior):
+    from pyarrow import feather
+
+    destino = _ruta_datos(ruta, directorio, registro['huella'])
+    registro['archivo'] = destino.name
+    escribir_atomico(destino, lambda tmp: feather.write_feather(df, tmp, compression='uncompressed'))
+    _escribir_registro(ruta, directorio, registro)
+
+    # Eliminar la versión anterior del almacén (puede seguir mapeada por otro proceso)
+    if anterior and anterior.get('archivo') != destino.name:
+        try:
+            (Path(directorio) / anterior['archivo']).unlink(missing_ok=True)
+        except OSError:
+            pass
+    return destino
+
+
+def calentar_cache(ruta=RUTA_CSV, directorio=DIRECTORIO_CACHE, forzar=False, motor='c'):
+    """Construye (o valida) el archivo de caché y devuelve su ruta."""
+    ruta = Path(ruta)
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+
+    stat = os.stat(ruta)
+    registro = _leer_registro(ruta, directorio)
+    vigente = registro is not None and (directorio / registro['archivo']).exists() and not forzar
+
+    if vigente and _misma_version_csv(registro, stat):
+        return directorio / registro['archivo']
+
+    sha = _sha256(ruta)
+    if vigente and registro['sha256'] == sha:
+        # Solo cambió el mtime: se conserva el almacén (y sus meses anexados)
+        registro.update(tamano=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        _escribir_registro(ruta, directorio, registro)
+        return directorio / registro['archivo']
+
+    nuevo_registro = {
+        'version': VERSION_CACHE,
+        'origen': str(ruta),
+        'tamano': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha,
+        'huella': sha,
+        'anexos': [],
+    }
+    return _guardar(preparar_datos(ruta, motor=motor), ruta, directorio, nuevo_registro, registro)
+
+
+def _leer_almacen(destino, memory_map=True):
+    from pyarrow import feather
+    return feather.read_table(destino, memory_map=memory_map).to_pandas()
+
+
+def cargar_con_cache(ruta=RUTA_CSV, directorio=DIRECTORIO_CACHE, motor='c'):
+    """Devuelve (df, huella) leyendo la caché columnar si está vigente.
+
+    Sin pyarrow instalado se interpreta el CSV directamente.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return preparar_datos(ruta, motor='c'), _sha256(ruta)
+
+    try:
+        destino = calentar_cache(ruta, directorio, motor=motor)
+    except OSError:
+        # Directorio de caché de solo lectura: se trabaja sin persistir
+        return preparar_datos(ruta, motor=motor), _sha256(ruta)
+
+    registro = _leer_registro(ruta, directorio)
+    return _leer_almacen(destino), registro['huella']
+
+
+def anexar_mes_cache(ruta_mes, mes=None, ruta=RUTA_CSV, directorio=DIRECTORIO_CACHE):
+    """Fusiona un archivo de un mes en el almacén columnar y devuelve (mes, ruta).
+
+    Un cambio posterior del CSV completo reconstruye el almacén desde cero,
+    descartando los meses anexados (la nueva exportación los reemplaza).
+    """
+    destino = calentar_cache(ruta, directorio)
+    registro = _leer_registro(ruta, directorio)
+
+    mes, nuevo = leer_mes(ruta_mes, mes)
+    df = anexar_mes(_leer_almacen(destino, memory_map=False), nuevo, mes)
+
+    sha_mes = _sha256(ruta_mes)
+    anterior = dict(registro)
+    registro['anexos'] = registro['anexos'] + [{'mes': mes, 'origen': str(ruta_mes), 'sha256': sha_mes}]
+    registro['huella'] = hashlib.sha256(f"{registro['huella']}:{mes}:{sha_mes}".encode()).hexdigest()
+    return mes, _guardar(df, ruta, directorio, registro, anterior)
@@ -0,0 +1,128 @@
+"""
+Reclasificación SABCT calculada a partir de las ventas mensuales.
+
+La clase de cada SKU sale de su contribución acumulada (Pareto) dentro del
+grupo: S hasta el 50% de la venta, A hasta el 80%, B hasta el 95%, C hasta
+el 99% y T el resto. Los SKUs con menos de MESES_NUEVO meses de historia son
+'Nuevo' y los que no venden en el período son 'Obsoleto'. Todo el catálogo se
+clasifica con un único ordenamiento y una suma acumulada, sin bucles por SKU.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .cubo import COLUMNAS_DIMENSION, _codigos
+from .ingesta import detectar_meses
+
+# Participación acumulada máxima de cada clase
+UMBRALES_PARETO = {'S': 0.50, 'A': 0.80, 'B': 0.95, 'C': 0.99, 'T': 1.00}
+
+MESES_NUEVO = 6
+
+NIVELES = (None, 'canal', 'zona')
+
+COLUMNAS_CLASIFICACION = ['ARTICULO', 'VENTA', 'PARTICIPACION_ACUMULADA', 'MESES_HISTORIA',
+                          'SABCT_ERP', 'SABCT_CALCULADA', 'DIFIERE']
+
+
+def participacion_clases():
+    """Porcentaje de la venta que cubre cada clase Pareto: {'S': 50.0, 'A': 30.0, ...}."""
+    participacion = {}
+    anterior = 0.0
+    for clase, limite in UMBRALES_PARETO.items():
+        participacion[clase] = round((limite - anterior) * 100, 1)
+        anterior = limite
+    return participacion
+
+
+def _meses_historia(matriz, sku, n_skus):
+    """Meses desde la primera venta de cada SKU hasta el último período (0 si nunca vendió)."""
+    n_periodos = matriz.shape[1]
+    con_venta = matriz > 0
+    primera_fila = np.where(con_venta.any(axis=1), con_venta.argmax(axis=1), n_periodos)
+    primera = np.full(n_skus, n_periodos)
+    np.minimum.at(primera, sku, primera_fila)
+    return n_periodos - primera
+
+
+def clasificar_sabct(df, por=None, meses=None):
+    """Clase SABCT calculada por SKU, en todo el catálogo o dentro de cada canal o zona.
+
+    ``meses`` es el período cuya venta se rankea (por defecto, todos los meses
+    del DataFrame); la historia para 'Nuevo' se mide sobre todos los meses.
+    El resultado queda ordenado por grupo y ranking, con la etiqueta del ERP
+    (la de la fila de mayor venta del SKU en el grupo) y si ambas difieren.
+    """
+    if por not in NIVELES:
+        raise ValueError(f"Nivel desconocido: {por!r} (opciones: canal, zona o None)")
+
+    periodos = detectar_meses(df.columns)
+    meses = periodos if meses is None else list(meses)
+    matriz = df[periodos].to_numpy(dtype=np.float64)
+    ventas_fila = matriz[:, [periodos.index(mes) for mes in meses]].sum(axis=1)
+
+    sku, skus = _codigos(df['ARTICULO'])
+    sku = sku.astype(np.int64)
+    sabct, etiquetas_sabct = _codigos(df['SABCT'])
+    if por is None:
+        grupo, grupos = np.zeros(len(df), dtype=np.int64), ['TOTAL']
+    else:
+        grupo, grupos = _codigos(df[COLUMNAS_DIMENSION[por]])
+        grupo = grupo.astype(np.int64)
+
+    historia = _meses_historia(matriz, sku, len(skus))
+
+    # Una fila por (grupo, SKU); la etiqueta del ERP es la de su fila de mayor venta
+    claves, inversa = np.unique(grupo * len(skus) + sku, return_inverse=True)
+    ventas = np.bincount(inversa, weights=ventas_fila, minlength=len(claves))
+    principal = np.lexsort((-ventas_fila, inversa))
+    primeras = np.r_[True, inversa[principal][1:] != inversa[principal][:-1]]
+    erp = np.empty(len(claves), dtype=np.int64)
+    erp[inversa[principal][primeras]] = sabct[principal][primeras]
+
+    grupo_clave, sku_clave = claves // len(skus), claves % len(skus)
+    historia_clave = historia[sku_clave]
+    nuevo = (historia_clave > 0) & (historia_clave < MESES_NUEVO)
+    sin_venta = (ventas <= 0) & ~nuevo
+
+    # Pareto: un solo ordenamiento (grupo, venta desc) y una suma acumulada
+    orden = np.lexsort((-ventas, grupo_clave))
+    g = grupo_clave[orden]
+    v = np.where(nuevo | sin_venta, 0.0, ventas)[orden]
+    acumulado = np.cumsum(v)
+    inicio_grupo = np.searchsorted(g, g, side='left')
+    acumulado_grupo = acumulado - (acumulado[inicio_grupo] - v[inicio_grupo])
+    total_grupo = np.bincount(g, weights=v, minlength=len(grupos))[g]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        previo = np.where(total_grupo > 0, (acumulado_grupo - v) / total_grupo, 0.0)
+        participacion = np.where(total_grupo > 0, acumulado_grupo / total_grupo, 0.0)
+
+    clases = np.array(list(UMBRALES_PARETO), dtype=object)
+    limites = list(UMBRALES_PARETO.values())[:-1]
+    calculada = clases[np.searchsorted(limites, previo, side='right')]
+    calculada[nuevo[orden]] = 'Nuevo'
+    calculada[sin_venta[orden]] = 'Obsoleto'
+
+    erp_etiqueta = np.asarray(etiquetas_sabct, dtype=object)[erp[orden]]
+    resultado = pd.DataFrame({
+        'ARTICULO': np.asarray(skus, dtype=object)[sku_clave[orden]],
+        'VENTA': ventas[orden],
+        'PARTICIPACION_ACUMULADA': participacion * 100,
+        'MESES_HISTORIA': historia_clave[orden],
+        'SABCT_ERP': erp_etiqueta,
+        'SABCT_CALCULADA': calculada,
+        'DIFIERE': erp_etiqueta != calculada,
+    })
+    if por is not None:
+        resultado.insert(0, COLUMNAS_DIMENSION[por], np.asarray(grupos, dtype=object)[g])
+    return resultado
+
+
+def matriz_confusion(clasificacion, orden=None):
+    """Conteo de SKUs por etiqueta ERP (filas) y clase calculada (columnas)."""
+    tabla = pd.crosstab(clasificacion['SABCT_ERP'], clasificacion['SABCT_CALCULADA'])
+    if orden is not None:
+        presentes = set(tabla.index) | set(tabla.columns)
+        etiquetas = [e for e in orden if e in presentes] + sorted(presentes - set(orden))
+        tabla = tabla.reindex(index=etiquetas, columns=etiquetas, fill_value=0)
+    return tabla
@@ -0,0 +1,39 @@
+"""
+Rutas y opciones del motor que no dependen de pandas ni numpy.
+
+Viven aparte para que la línea de comandos (y quien solo necesite una ruta
+o la lista de opciones) arranque sin importar la pila de datos. Los módulos
+que las usan las reexportan con el mismo nombre.
+"""
+
+import os
+from pathlib import Path
+
+_RAIZ = Path(__file__).resolve().parent.parent
+
+RUTA_CSV = Path(os.environ.get('INVENTARIO_CSV', _RAIZ / 'sku_canal_zonas_usd.csv'))
+
+DIRECTORIO_CACHE = Path(os.environ.get('INVENTARIO_CACHE_DIR', _RAIZ / '.cache'))
+
+MOTORES = ('c', 'pyarrow')
+
+METODOS = ('ses', 'holt', 'arima')
+
+# Próximo trimestre
+HORIZONTE = 3
+
+FORMATOS_METRICAS = ('json', 'parquet')
+
+EJECUTORES = ('serie', 'hilos', 'procesos')
+
+# Ejecutor de los conteos de SKUs únicos de calcular_modelo y de los lotes de la simulación de despacho
+EJECUTOR = os.environ.get('INVENTARIO_EJECUTOR', 'serie')
+
+# Motores de inventario.consultas; polars y duckdb son dependencias opcionales
+MOTORES_CONSULTA = ('pandas', 'polars', 'duckdb')
+
+# Motor con que el dashboard resuelve las agregaciones de sus secciones
+MOTOR_CONSULTAS = os.environ.get('INVENTARIO_MOTOR_CONSULTAS', 'pandas')
+
+# Filas por bloque en la lectura por bloques del CSV
+FILAS_POR_BLOQUE = 100_000
@@ -0,0 +1,299 @@
+"""
+API de agregación con motores intercambiables: pandas, Polars y DuckDB.
+
+Una Consulta dice por qué dimensiones agrupar, qué medidas calcular y con
+qué Filtro (valores de canal, zona y SABCT y rango de meses). Cada motor la
+traduce a su propio lenguaje y todos devuelven el mismo DataFrame de pandas:
+un grupo por fila con las dimensiones como índice (texto, en orden
+alfabético, solo grupos con filas) y una columna por medida.
+
+pandas es el motor por defecto y no agrega dependencias. Polars y DuckDB
+son opcionales y se importan al abrir el motor: leen la caché columnar
+(Feather) sin cargarla entera, Polars con scan_ipc y DuckDB consultando la
+tabla Arrow mapeada sin copiarla, y agregan con varios hilos.
+resumen_consultas arma los indicadores principales con cinco consultas,
+sobre cualquier motor.
+"""
+
+import threading
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+from .cache import DIRECTORIO_CACHE, calentar_cache, cargar_con_cache, huella_csv
+from .configuracion import MOTORES_CONSULTA
+from .corte import construir_comparativas
+from .cubo import COLUMNAS_DIMENSION, EJES_CUBO, Cubo
+from .filtros import DIMENSIONES_FILTRO, SIN_FILTRO, Filtro
+from .ingesta import ANIO_ANALISIS, RUTA_CSV, detectar_meses
+from .modelo import ResumenIndicadores, indicadores
+
+# Medida -> columna del resultado; 'meses' agrega una columna por mes del rango
+MEDIDAS = {
+    'venta': 'VENTA',
+    'meses': None,
+    'skus': 'SKUS',
+    'skus_con_venta': 'SKUS_CON_VENTA',
+    'filas': 'FILAS',
+}
+
+
+@dataclass(frozen=True)
+class Consulta:
+    """Agrupar por ``por`` (claves de COLUMNAS_DIMENSION) y calcular ``medidas`` sobre las filas de ``filtro``.
+
+    VENTA suma los meses del rango; SKUS_CON_VENTA cuenta los SKUs con alguna
+    fila cuya venta en el rango es positiva (como TOTAL_2025 > 0).
+    """
+
+    por: tuple = ()
+    medidas: tuple = ('venta',)
+    filtro: Filtro = SIN_FILTRO
+
+    def __post_init__(self):
+        desconocidas = [d for d in self.por if d not in COLUMNAS_DIMENSION]
+        desconocidas += [m for m in self.medidas if m not in MEDIDAS]
+        if desconocidas:
+            raise ValueError(f"Dimensiones o medidas desconocidas: {', '.join(desconocidas)}")
+
+
+class MotorConsultas:
+    """Base de los motores: rango de meses y forma común del resultado."""
+
+    nombre = None
+
+    def __init__(self, meses, huella=''):
+        self.meses = list(meses)
+        self.huella = huella
+
+    def consultar(self, consulta):
+        """DataFrame con un grupo por fila para ``consulta``."""
+        meses = consulta.filtro.rango(self.meses)
+        tabla = self._agregar(consulta, meses)
+        return self._normalizar(tabla, consulta, meses)
+
+    def _agregar(self, consulta, meses):
+        raise NotImplementedError
+
+    @staticmethod
+    def _columnas(consulta, meses):
+        columnas = []
+        for medida in consulta.medidas:
+            columnas.extend(meses if medida == 'meses' else [MEDIDAS[medida]])
+        return columnas
+
+    def _normalizar(self, tabla, consulta, meses):
+        """Mismos tipos, orden de filas y de columnas para todos los motores."""
+        dimensiones = [COLUMNAS_DIMENSION[d] for d in consulta.por]
+        columnas = self._columnas(consulta, meses)
+        for columna in columnas:
+            entera = columna in ('SKUS', 'SKUS_CON_VENTA', 'FILAS')
+            tabla[columna] = tabla[columna].fillna(0).astype(np.int64 if entera else np.float64)
+        if not dimensiones:
+            return tabla[columnas].reset_index(drop=True)
+        for columna in dimensiones:
+            tabla[columna] = tabla[columna].astype(str).astype(object)
+        return tabla.set_index(dimensiones).sort_index()[columnas]
+
+
+class MotorPandas(MotorConsultas):
+    """Consultas con groupby de pandas sobre un DataFrame en memoria."""
+
+    nombre = 'pandas'
+
+    def __init__(self, df, huella='', meses=None):
+        super().__init__(detectar_meses(df.columns) if meses is None else meses, huella)
+        self.df = df
+
+    def _agregar(self, consulta, meses):
+        filas = self.df
+        if consulta.filtro.filtra_filas():
+            mascara = np.ones(len(filas), dtype=bool)
+            for dimension in DIMENSIONES_FILTRO:
+                valores = getattr(consulta.filtro, dimension)
+                if valores:
+                    mascara &= filas[COLUMNAS_DIMENSION[dimension]].isin(valores).to_numpy()
+            filas = filas[mascara]
+
+        dimensiones = [COLUMNAS_DIMENSION[d] for d in consulta.por]
+        matriz = filas[meses].to_numpy(dtype=np.float64)
+        datos = pd.DataFrame(matriz, columns=meses, index=filas.index)
+        datos['VENTA'] = matriz.sum(axis=1)
+        datos['ARTICULO'] = filas['ARTICULO']
+        # Sin dimensiones se agrupa por una clave constante: un solo grupo
+        claves = [filas[c] for c in dimensiones] or [np.zeros(len(filas), dtype=np.int8)]
+        grupos = datos.groupby(claves, observed=True)
+
+        partes = {}
+        for medida in consulta.medidas:
+            if medida == 'venta':
+                partes['VENTA'] = grupos['VENTA'].sum()
+            elif medida == 'meses':
+                partes.update({mes: grupos[mes].sum() for mes in meses})
+            elif medida == 'skus':
+                partes['SKUS'] = grupos['ARTICULO'].nunique()
+            elif medida == 'skus_con_venta':
+                con_venta = datos['VENTA'].to_numpy() > 0
+                partes['SKUS_CON_VENTA'] = datos[con_venta].groupby(
+                    [c[con_venta] for c in claves], observed=True)['ARTICULO'].nunique()
+            else:
+                partes['FILAS'] = grupos.size()
+        tabla = pd.DataFrame(partes)
+        if not dimensiones:
+            # Un filtro sin filas deja el grupo constante vacío: se devuelve una fila en 0
+            return tabla.reindex([0]).reset_index(drop=True)
+        return tabla.rename_axis(dimensiones).reset_index()
+
+
+class MotorPolars(MotorConsultas):
+    """Consultas con Polars (lazy, multihilo) sobre un DataFrame o LazyFrame de Polars."""
+
+    nombre = 'polars'
+
+    def __init__(self, frame, huella='', meses=None):
+        self.frame = frame.lazy()
+        super().__init__(detectar_meses(self.frame.collect_schema().names()) if meses is None else meses, huella)
+
+    def _agregar(self, consulta, meses):
+        import polars as pl
+
+        consulta_lazy = self.frame
+        for dimension in DIMENSIONES_FILTRO:
+            valores = getattr(consulta.filtro, dimension)
+            if valores:
+                consulta_lazy = consulta_lazy.filter(
+                    pl.col(COLUMNAS_DIMENSION[dimension]).cast(pl.Utf8).is_in(list(valores)))
+        consulta_lazy = consulta_lazy.with_columns(
+            pl.sum_horizontal([pl.col(mes).cast(pl.Float64) for mes in meses]).alias('VENTA'))
+
+        expresiones = []
+        for medida in consulta.medidas:
+            if medida == 'venta':
+                expresiones.append(pl.col('VENTA').sum())
+            elif medida == 'meses':
+                expresiones.extend(pl.col(mes).cast(pl.Float64).sum() for mes in meses)
+            elif medida == 'skus':
+                expresiones.append(pl.col('ARTICULO').n_unique().alias('SKUS'))
+            elif medida == 'skus_con_venta':
+                expresiones.append(pl.col('ARTICULO').filter(pl.col('VENTA') > 0).n_unique().alias('SKUS_CON_VENTA'))
+            else:
+                expresiones.append(pl.len().alias('FILAS'))
+
+        dimensiones = [COLUMNAS_DIMENSION[d] for d in consulta.por]
+        if dimensiones:
+            consulta_lazy = consulta_lazy.group_by([pl.col(c).cast(pl.Utf8) for c in dimensiones]).agg(expresiones)
+        else:
+            consulta_lazy = consulta_lazy.select(expresiones)
+        return consulta_lazy.collect().to_pandas()
+
+
+class MotorDuckDB(MotorConsultas):
+    """Consultas SQL con DuckDB embebido sobre una tabla Arrow (sin copiarla).
+
+    La conexión no admite consultas simultáneas: las sesiones del dashboard
+    comparten el motor, así que cada consulta toma un candado.
+    """
+
+    nombre = 'duckdb'
+
+    def __init__(self, tabla, huella='', meses=None):
+        import duckdb
+
+        super().__init__(detectar_meses(tabla.column_names) if meses is None else meses, huella)
+        self.conexion = duckdb.connect()
+        self.conexion.register('ventas', tabla)
+        self._candado = threading.Lock()
+
+    def _agregar(self, consulta, meses):
+        condiciones, parametros = [], []
+        for dimension in DIMENSIONES_FILTRO:
+            valores = getattr(consulta.filtro, dimension)
+            if valores:
+                condiciones.append(f'CAST("{COLUMNAS_DIMENSION[dimension]}" AS VARCHAR) IN '
+                                   f'({", ".join("?" * len(valores))})')
+                parametros.extend(valores)
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        venta = ' + '.join(f'CAST("{mes}" AS DOUBLE)' for mes in meses) or '0.0'
+
+        selecciones = []
+        for medida in consulta.medidas:
+            if medida == 'venta':
+                selecciones.append('SUM(VENTA) AS VENTA')
+            elif medida == 'meses':
+                selecciones.extend(f'SUM(CAST("{mes}" AS DOUBLE)) AS "{mes}"' for mes in meses)
+            elif medida == 'skus':
+                selecciones.append('COUNT(DISTINCT ARTICULO) AS SKUS')
+            elif medida == 'skus_con_venta':
+                selecciones.append('COUNT(DISTINCT ARTICULO) FILTER (WHERE VENTA > 0) AS SKUS_CON_VENTA')
+            else:
+                selecciones.append('COUNT(*) AS FILAS')
+
+        dimensiones = [f'CAST("{COLUMNAS_DIMENSION[d]}" AS VARCHAR) AS "{COLUMNAS_DIMENSION[d]}"' for d in consulta.por]
+        agrupar = f"GROUP BY {', '.join(str(i + 1) for i in range(len(dimensiones)))}" if dimensiones else ""
+        sql = (f"SELECT {', '.join(dimensiones + selecciones)} "
+               f"FROM (SELECT *, {venta} AS VENTA FROM ventas {donde}) {agrupar}")
+        with self._candado:
+            return self.conexion.execute(sql, parametros).df()
+
+
+def abrir_motor(nombre='pandas', ruta=RUTA_CSV, directorio=DIRECTORIO_CACHE, df=None):
+    """Motor ``nombre`` sobre la caché columnar del CSV ``ruta`` (se construye si falta).
+
+    ``df`` es el DataFrame de ``ruta`` si ya está en memoria: el motor pandas
+    lo usa en lugar de volver a leer la caché; los demás lo ignoran.
+    ImportError si el motor necesita una dependencia opcional que no está instalada.
+    """
+    if nombre not in MOTORES_CONSULTA:
+        raise ValueError(f"Motor de consultas desconocido: {nombre!r} (opciones: {', '.join(MOTORES_CONSULTA)})")
+    if nombre == 'pandas':
+        if df is None:
+            df, huella = cargar_con_cache(ruta, directorio)
+        else:
+            huella = huella_csv(ruta, directorio)
+        return MotorPandas(df, huella)
+
+    destino = calentar_cache(ruta, directorio)
+    huella = huella_csv(ruta, directorio)
+    if nombre == 'polars':
+        import polars as pl
+        return MotorPolars(pl.scan_ipc(destino), huella)
+
+    from pyarrow import feather
+    return MotorDuckDB(feather.read_table(destino, memory_map=True), huella)
+
+
+def resumen_consultas(motor, filtro=SIN_FILTRO):
+    """ResumenIndicadores de ``filtro`` a partir de consultas a ``motor``.
+
+    El cubo tiene solo los meses del rango y los valores con filas en la
+    selección. ValueError si el filtro no tiene filas.
+    """
+    filtro = filtro.normalizado()
+    meses = filtro.rango(detectar_meses(motor.meses, ANIO_ANALISIS))
+    seleccion = replace(filtro, desde=meses[0], hasta=meses[-1])
+
+    resumen = motor.consultar(Consulta(medidas=('skus', 'skus_con_venta', 'filas'), filtro=seleccion)).iloc[0]
+    if not resumen['FILAS']:
+        raise ValueError("La combinación de filtros no tiene filas")
+
+    celdas = motor.consultar(Consulta(por=EJES_CUBO[:-1], medidas=('meses',), filtro=seleccion))
+    etiquetas = {eje: sorted(set(celdas.index.get_level_values(i))) for i, eje in enumerate(EJES_CUBO[:-1])}
+    etiquetas['periodo'] = meses
+    densas = celdas.reindex(pd.MultiIndex.from_product([etiquetas[eje] for eje in EJES_CUBO[:-1]]), fill_value=0.0)
+    cubo = Cubo.desde_celdas(densas.to_numpy().reshape([len(etiquetas[eje]) for eje in EJES_CUBO]), etiquetas)
+    comparativas = construir_comparativas(cubo, None, meses)
+
+    skus = {dim: motor.consultar(Consulta(por=(dim,), medidas=('skus',), filtro=seleccion))['SKUS']
+            .rename('ARTICULO') for dim in ('canal', 'zona', 'sabct')}
+    return ResumenIndicadores(
+        huella=motor.huella,
+        meses=tuple(meses),
+        filas=int(resumen['FILAS']),
+        cubo=cubo,
+        comparativas=comparativas,
+        skus_totales=int(resumen['SKUS']),
+        skus_con_venta=int(resumen['SKUS_CON_VENTA']),
+        skus_por_dimension=skus,
+        **indicadores(cubo, comparativas['total'], meses, skus['canal'], skus['zona']),
+    )
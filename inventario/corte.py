@@ -0,0 +1,87 @@
+"""
+Comparativas antes/después para cualquier mes de corte.
+
+Para cada nivel (total, canal, zona, sabct, sku) se guardan las sumas
+acumuladas sobre el eje de meses. Las ventas antes y después de un corte
+salen de restar dos prefijos, así que cada consulta es O(1) por grupo y un
+control deslizante puede recorrer cortes sin volver a las filas.
+"""
+
+import numpy as np
+import pandas as pd
+
+COLUMNAS_COMPARATIVA = ['VENTA_ANTES', 'VENTA_DESPUES', 'PROMEDIO_ANTES', 'PROMEDIO_DESPUES', 'VARIACION']
+
+
+class ComparativaCorte:
+    """Prefijos acumulados de una matriz grupos × meses."""
+
+    def __init__(self, matriz, grupos, meses):
+        matriz = np.asarray(matriz, dtype=np.float64)
+        self.grupos = pd.Index(grupos)
+        self.meses = list(meses)
+        self._posiciones = {mes: i for i, mes in enumerate(self.meses)}
+
+        self.prefijos = np.zeros((len(self.grupos), len(self.meses) + 1))
+        np.cumsum(matriz, axis=1, out=self.prefijos[:, 1:])
+        self.prefijos.flags.writeable = False
+
+    def _meses_antes(self, corte):
+        k = self._posiciones.get(corte)
+        if k is None or k == 0:
+            raise ValueError(f"Corte inválido {corte!r}: debe ser uno de {', '.join(self.meses[1:])}")
+        return k
+
+    def comparar(self, corte):
+        """VENTA/PROMEDIO antes y después de ``corte`` (incluido en 'después') y su variación %."""
+        k = self._meses_antes(corte)
+        antes = self.prefijos[:, k]
+        despues = self.prefijos[:, -1] - antes
+        promedio_antes = antes / k
+        promedio_despues = despues / (len(self.meses) - k)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variacion = np.where(promedio_antes > 0, (promedio_despues / promedio_antes - 1) * 100, np.nan)
+        return pd.DataFrame({
+            'VENTA_ANTES': antes,
+            'VENTA_DESPUES': despues,
+            'PROMEDIO_ANTES': promedio_antes,
+            'PROMEDIO_DESPUES': promedio_despues,
+            'VARIACION': variacion,
+        }, index=self.grupos)
+
+    def grupo(self, grupo, corte):
+        """Comparativa de un solo grupo como dict."""
+        k = self._meses_antes(corte)
+        fila = self.prefijos[self.grupos.get_loc(grupo)]
+        antes = fila[k]
+        despues = fila[-1] - antes
+        promedio_antes = antes / k
+        promedio_despues = despues / (len(self.meses) - k)
+        variacion = (promedio_despues / promedio_antes - 1) * 100 if promedio_antes > 0 else float('nan')
+        return dict(zip(COLUMNAS_COMPARATIVA, [antes, despues, promedio_antes, promedio_despues, variacion]))
+
+
+def construir_comparativas(cubo, hechos, meses):
+    """Comparativas por nivel a partir del cubo y (para SKUs) de la tabla de hechos.
+
+    Sin ``hechos`` (p. ej. en la lectura por bloques) no se arma el nivel sku.
+    """
+    meses = list(meses)
+    comparativas = {
+        'total': ComparativaCorte(cubo.serie('periodo', periodo=meses).to_numpy()[None, :], ['TOTAL'], meses),
+    }
+    for nivel in ('canal', 'zona', 'sabct'):
+        tabla = cubo.tabla(nivel, 'periodo', periodo=meses)
+        comparativas[nivel] = ComparativaCorte(tabla.to_numpy(), tabla.index, meses)
+    if hechos is None:
+        return comparativas
+
+    # Por SKU: matriz densa sku × periodo acumulada con un solo bincount
+    skus = hechos.etiquetas['sku']
+    periodos = hechos.etiquetas['periodo']
+    plano = hechos.hechos['sku'].to_numpy(dtype=np.int64) * len(periodos) + hechos.hechos['periodo'].to_numpy()
+    matriz = np.bincount(plano, weights=hechos.hechos['usd'].to_numpy(dtype=np.float64),
+                         minlength=len(skus) * len(periodos)).reshape(len(skus), len(periodos))
+    columnas = [periodos.index(mes) for mes in meses]
+    comparativas['sku'] = ComparativaCorte(matriz[:, columnas], skus, meses)
+    return comparativas
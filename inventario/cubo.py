@@ -0,0 +1,151 @@
+"""
+Tabla de hechos en formato largo y cubo de agregados precalculado.
+
+La tabla de hechos tiene una fila por celda con venta distinta de cero
+(sku, sabct, canal, zona, periodo, usd) y dimensiones codificadas como
+enteros. Sobre ella se construye un cubo denso canal × zona × sabct × periodo
+con todos los subtotales, de modo que cada gráfico es una lectura de celdas
+del cubo en lugar de un groupby sobre las filas.
+"""
+
+from dataclasses import dataclass
+from math import prod
+
+import numpy as np
+import pandas as pd
+
+from .ingesta import detectar_meses
+
+# Columna del DataFrame ancho para cada dimensión de la tabla de hechos
+COLUMNAS_DIMENSION = {
+    'sku': 'ARTICULO',
+    'sabct': 'SABCT',
+    'canal': 'CANAL',
+    'zona': 'ZONA_CONSOLIDADO',
+}
+
+EJES_CUBO = ('canal', 'zona', 'sabct', 'periodo')
+
+
+@dataclass(frozen=True)
+class TablaHechos:
+    """Hechos con dimensiones codificadas; ``etiquetas[dim][codigo]`` da el valor original."""
+
+    hechos: pd.DataFrame
+    etiquetas: dict
+
+
+def _codigos(serie):
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype('category')
+    return serie.cat.codes.to_numpy(), serie.cat.categories.astype(str).tolist()
+
+
+def construir_hechos(df, periodos=None):
+    """Convierte el DataFrame ancho en la tabla de hechos larga (solo celdas no nulas)."""
+    periodos = detectar_meses(df.columns) if periodos is None else list(periodos)
+    matriz = df[periodos].to_numpy(dtype=np.float32)
+    filas, columnas = np.nonzero(matriz)
+
+    datos = {}
+    etiquetas = {}
+    for dimension, columna in COLUMNAS_DIMENSION.items():
+        codigos, etiquetas[dimension] = _codigos(df[columna])
+        tipo = np.int32 if len(etiquetas[dimension]) > np.iinfo(np.int16).max else np.int16
+        datos[dimension] = codigos[filas].astype(tipo)
+    datos['periodo'] = columnas.astype(np.int16)
+    datos['usd'] = matriz[filas, columnas]
+    etiquetas['periodo'] = periodos
+
+    return TablaHechos(hechos=pd.DataFrame(datos), etiquetas=etiquetas)
+
+
+def _con_subtotales(valores):
+    # Subtotales: al recorrer los ejes en orden, cada posición "total"
+    # acumula también los totales de los ejes anteriores
+    for eje, n in enumerate(valores.shape):
+        total = [slice(None)] * valores.ndim
+        total[eje] = n - 1
+        valores[tuple(total)] = valores.take(range(n - 1), axis=eje).sum(axis=eje)
+    return valores
+
+
+class Cubo:
+    """Rollup denso canal × zona × sabct × periodo con todos los subtotales.
+
+    Cada eje tiene una posición adicional al final que contiene el total de
+    ese eje, así que las 16 combinaciones de subtotales son celdas del cubo.
+    """
+
+    def __init__(self, valores, etiquetas):
+        self.valores = valores
+        self.valores.flags.writeable = False
+        self.etiquetas = {eje: list(etiquetas[eje]) for eje in EJES_CUBO}
+        self._posiciones = {eje: {e: i for i, e in enumerate(self.etiquetas[eje])} for eje in EJES_CUBO}
+
+    @classmethod
+    def desde_hechos(cls, tabla):
+        forma = tuple(len(tabla.etiquetas[eje]) + 1 for eje in EJES_CUBO)
+        plano = np.ravel_multi_index([tabla.hechos[eje].to_numpy() for eje in EJES_CUBO], forma)
+        valores = np.bincount(plano, weights=tabla.hechos['usd'].to_numpy(dtype=np.float64),
+                              minlength=prod(forma)).reshape(forma)
+        return cls(_con_subtotales(valores), tabla.etiquetas)
+
+    @classmethod
+    def desde_celdas(cls, celdas, etiquetas):
+        """Cubo a partir de las sumas canal × zona × sabct × periodo, sin subtotales."""
+        valores = np.zeros(tuple(n + 1 for n in celdas.shape))
+        valores[tuple(slice(n) for n in celdas.shape)] = celdas
+        return cls(_con_subtotales(valores), etiquetas)
+
+    def _recortar(self, mantener, filtros):
+        desconocidos = set(filtros) - set(EJES_CUBO)
+        if desconocidos:
+            raise ValueError(f"Ejes desconocidos: {', '.join(sorted(desconocidos))}")
+
+        arreglo = self.valores
+        eje_actual = 0
+        etiquetas = []
+        for eje in EJES_CUBO:
+            seleccion = filtros.get(eje)
+            if isinstance(seleccion, str):
+                arreglo = arreglo.take(self._posiciones[eje][seleccion], axis=eje_actual)
+                continue
+            if seleccion is None and eje not in mantener:
+                arreglo = arreglo.take(-1, axis=eje_actual)
+                continue
+
+            if seleccion is None:
+                seleccion = self.etiquetas[eje]
+            else:
+                seleccion = [e for e in seleccion if e in self._posiciones[eje]]
+            arreglo = arreglo.take([self._posiciones[eje][e] for e in seleccion], axis=eje_actual)
+
+            if eje in mantener:
+                etiquetas.append(seleccion)
+                eje_actual += 1
+            else:
+                arreglo = arreglo.sum(axis=eje_actual)
+        return arreglo, etiquetas
+
+    def valor(self, **filtros):
+        """Suma para una combinación de filtros, p. ej. ``valor(canal='RETAIL', periodo=meses)``.
+
+        Un filtro puede ser una etiqueta o una lista de etiquetas (se suman);
+        un eje sin filtro usa su total.
+        """
+        arreglo, _ = self._recortar((), filtros)
+        return float(arreglo)
+
+    def serie(self, eje, **filtros):
+        """Serie a lo largo de ``eje``; un filtro de lista sobre el mismo eje elige y ordena sus etiquetas."""
+        arreglo, (etiquetas,) = self._recortar((eje,), filtros)
+        return pd.Series(arreglo, index=pd.Index(etiquetas, name=eje))
+
+    def tabla(self, filas, columnas, **filtros):
+        """Tabla ``filas`` × ``columnas`` con el resto de ejes filtrados o totalizados."""
+        if EJES_CUBO.index(filas) > EJES_CUBO.index(columnas):
+            return self.tabla(columnas, filas, **filtros).T
+        arreglo, (etiquetas_filas, etiquetas_columnas) = self._recortar((filas, columnas), filtros)
+        return pd.DataFrame(arreglo, index=pd.Index(etiquetas_filas, name=filas),
+                            columns=pd.Index(etiquetas_columnas, name=columnas))
@@ -0,0 +1,137 @@
+"""
+Filtros cruzados (canal, zona, SABCT y rango de meses) sobre el dataset.
+
+Al cargar el dataset se construye, para cada dimensión filtrable, un bitmap
+de filas por valor (un bit por fila, empaquetado con np.packbits). Una
+combinación de filtros se resuelve con OR entre los valores elegidos de una
+dimensión y AND entre dimensiones, sin volver a recorrer columnas de texto.
+El modelo de métricas de cada combinación se memoiza con desalojo LRU.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from .cubo import COLUMNAS_DIMENSION, _codigos
+from .ingesta import agregar_totales
+from .modelo import calcular_modelo
+
+DIMENSIONES_FILTRO = ('canal', 'zona', 'sabct')
+
+# Modelos por combinación de filtros que se conservan en memoria
+MAX_MODELOS = 16
+
+
+@dataclass(frozen=True)
+class Filtro:
+    """Valores elegidos por dimensión (vacío = sin filtro) y rango de meses inclusivo."""
+
+    canal: tuple = ()
+    zona: tuple = ()
+    sabct: tuple = ()
+    desde: str = None
+    hasta: str = None
+
+    def normalizado(self):
+        """Mismo filtro con los valores ordenados, para que el orden de selección no cambie la clave."""
+        return replace(self, **{dim: tuple(sorted(getattr(self, dim))) for dim in DIMENSIONES_FILTRO})
+
+    def filtra_filas(self):
+        return any(getattr(self, dim) for dim in DIMENSIONES_FILTRO)
+
+    def rango(self, meses):
+        """Meses de ``meses`` dentro de [desde, hasta]."""
+        meses = list(meses)
+        inicio = meses.index(self.desde) if self.desde is not None else 0
+        fin = meses.index(self.hasta) + 1 if self.hasta is not None else len(meses)
+        return meses[inicio:fin]
+
+
+SIN_FILTRO = Filtro()
+
+
+class IndiceFiltros:
+    """Bitmaps empaquetados valor × filas para cada dimensión filtrable."""
+
+    def __init__(self, df, dimensiones=DIMENSIONES_FILTRO):
+        self.filas = len(df)
+        self.etiquetas = {}
+        self.bitmaps = {}
+        self._posiciones = {}
+        for dimension in dimensiones:
+            codigos, etiquetas = _codigos(df[COLUMNAS_DIMENSION[dimension]])
+            # Filas con valor nulo tienen código -1 y no pertenecen a ningún bitmap
+            validas = codigos >= 0
+            bits = np.zeros((len(etiquetas), self.filas), dtype=bool)
+            bits[codigos[validas], np.flatnonzero(validas)] = True
+            self.etiquetas[dimension] = etiquetas
+            self.bitmaps[dimension] = np.packbits(bits, axis=1)
+            self._posiciones[dimension] = {e: i for i, e in enumerate(etiquetas)}
+
+    def _bitmap(self, filtro):
+        resultado = np.full((self.filas + 7) // 8, 0xFF, dtype=np.uint8)
+        for dimension, bitmaps in self.bitmaps.items():
+            valores = getattr(filtro, dimension)
+            if not valores:
+                continue
+            posiciones = [self._posiciones[dimension][v] for v in valores if v in self._posiciones[dimension]]
+            resultado &= np.bitwise_or.reduce(bitmaps[posiciones], axis=0) if posiciones else 0
+        return resultado
+
+    def mascara(self, filtro):
+        """Máscara booleana de filas que cumplen ``filtro``."""
+        return np.unpackbits(self._bitmap(filtro), count=self.filas).view(bool)
+
+    def contar(self, filtro):
+        return int(np.count_nonzero(self.mascara(filtro)))
+
+
+class ModelosFiltrados:
+    """Modelos de métricas por combinación de filtros sobre un dataset, con caché LRU.
+
+    Es seguro compartirlo entre hilos (sesiones de Streamlit): el cálculo de
+    un modelo corre fuera del candado y solo el acceso al diccionario se serializa.
+    """
+
+    def __init__(self, df, meses, huella='', max_modelos=MAX_MODELOS):
+        self.df = df
+        self.meses = list(meses)
+        self.huella = huella
+        self.indice = IndiceFiltros(df)
+        self.max_modelos = max_modelos
+        self._modelos = OrderedDict()
+        self._candado = threading.Lock()
+
+    def filas(self, filtro):
+        """Filas del dataset para ``filtro``, con los totales recalculados sobre su rango de meses."""
+        meses = filtro.rango(self.meses)
+        filas = self.df.take(np.flatnonzero(self.indice.mascara(filtro))) if filtro.filtra_filas() else self.df
+        if meses != self.meses:
+            filas = agregar_totales(filas.copy() if filas is self.df else filas, meses)
+        return filas
+
+    def en_cache(self):
+        """Modelos memoizados, del menos al más recientemente usado."""
+        with self._candado:
+            return list(self._modelos.values())
+
+    def modelo(self, filtro=SIN_FILTRO):
+        """ModeloMetricas de la combinación ``filtro``; ValueError si no tiene filas."""
+        clave = filtro.normalizado()
+        with self._candado:
+            if clave in self._modelos:
+                self._modelos.move_to_end(clave)
+                return self._modelos[clave]
+
+        if clave.filtra_filas() and self.indice.contar(clave) == 0:
+            raise ValueError("La combinación de filtros no tiene filas")
+        modelo = calcular_modelo(self.filas(clave), clave.rango(self.meses), self.huella)
+
+        with self._candado:
+            self._modelos[clave] = modelo
+            self._modelos.move_to_end(clave)
+            while len(self._modelos) > self.max_modelos:
+                self._modelos.popitem(last=False)
+        return modelo
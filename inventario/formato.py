@@ -0,0 +1,28 @@
+"""
+Formatos de presentación compartidos por las tablas y los gráficos.
+
+Las tablas se formatean al dibujarse, con cadenas de formato de Styler, y
+nunca se guarda una copia del DataFrame convertida a texto. Los gráficos no
+reciben texto armado en Python: Plotly escribe sus etiquetas desde los
+valores con texttemplate y el formato d3 equivalente ('$,.0f').
+"""
+
+USD = '${:,.0f}'
+ENTERO = '{:,.0f}'
+PORCENTAJE = '{:.1f}%'
+PORCENTAJE_ENTERO = '{:.0f}%'
+VARIACION = '{:+.1f}%'
+
+# Columnas de ComparativaCorte.comparar
+FORMATO_COMPARATIVA = {
+    'VENTA_ANTES': USD,
+    'VENTA_DESPUES': USD,
+    'PROMEDIO_ANTES': USD,
+    'PROMEDIO_DESPUES': USD,
+    'VARIACION': VARIACION,
+}
+
+
+def estilo_usd(tabla, vacio='-'):
+    """Styler de ``tabla`` en dólares, con ``vacio`` en las celdas sin venta."""
+    return tabla.where(tabla > 0).style.format(USD, na_rep=vacio)
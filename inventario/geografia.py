@@ -0,0 +1,64 @@
+"""
+Ubicación de los almacenes y de las zonas de clientes.
+
+Las zonas usan el mismo nombre que ZONA_CONSOLIDADO. Las zonas de provincia
+se ubican en la ciudad que concentra sus despachos. Los tiempos y distancias
+de TIEMPOS_REFERENCIA son los medidos en ruta para las zonas del mapa.
+"""
+
+ALMACENES = {
+    'san_luis': {
+        'nombre': 'CD San Luis',
+        'lat': -12.070136596787389, 'lon': -76.99200082864617,
+        'direccion': 'Jr. Salaverry 161',
+        'operacion': 'Operó hasta Jul 2025',
+        'color': '#00bf63',
+        'centro': (-12.08, -77.01), 'zoom': 11.5,
+    },
+    'lurin': {
+        'nombre': 'CD Lurín',
+        'lat': -12.269444, 'lon': -76.890889,
+        'direccion': 'Km 29.5 Panamericana Sur',
+        'operacion': 'Opera desde Ago 2025',
+        'color': '#e94560',
+        'centro': (-12.15, -76.97), 'zoom': 10.2,
+    },
+}
+
+# Almacén antes y después del cambio de Ago-25
+ALMACEN_ANTERIOR = 'san_luis'
+ALMACEN_ACTUAL = 'lurin'
+
+ZONAS = {
+    'WILSON': {'nombre': 'Wilson', 'lat': -12.054828666634194, 'lon': -77.03806428818251, 'color': '#e94560'},
+    'PARURO': {'nombre': 'Paruro', 'lat': -12.05042038678001, 'lon': -77.02406775564982, 'color': '#4361ee'},
+    'MALVINAS': {'nombre': 'Malvinas', 'lat': -12.043337534371508, 'lon': -77.04817089428148, 'color': '#00bf63'},
+    'AZANGARO': {'nombre': 'Azángaro', 'lat': -12.051654779770855, 'lon': -77.03062129243266, 'color': '#7209b7'},
+    'COMPUPALACE': {'nombre': 'CompuPalace', 'lat': -12.116443820363907, 'lon': -77.02803893901076, 'color': '#ff6b35'},
+    'MARSANO': {'nombre': 'Marsano', 'lat': -12.117517551566221, 'lon': -77.00740718503695, 'color': '#4cc9f0'},
+    'LIMA': {'nombre': 'Lima', 'lat': -12.046374, 'lon': -77.042793, 'color': '#1a1a2e'},
+    'CALLAO': {'nombre': 'Callao', 'lat': -12.056610, 'lon': -77.118060, 'color': '#0f3460'},
+    'RIMAC': {'nombre': 'Rímac', 'lat': -12.029400, 'lon': -77.030000, 'color': '#16213e'},
+    'PROVINCIA NORTE': {'nombre': 'Provincia Norte', 'lat': -8.111600, 'lon': -79.028800, 'color': '#6c757d'},
+    'PROVINCIA CENTRO': {'nombre': 'Provincia Centro', 'lat': -12.065100, 'lon': -75.204900, 'color': '#6c757d'},
+    'PROVINCIA SUR': {'nombre': 'Provincia Sur', 'lat': -16.409000, 'lon': -71.537500, 'color': '#6c757d'},
+    'PROVINCIA ORIENTE': {'nombre': 'Provincia Oriente', 'lat': -8.379100, 'lon': -74.553900, 'color': '#6c757d'},
+}
+
+# Minutos y km medidos en ruta desde cada almacén
+TIEMPOS_REFERENCIA = {
+    'WILSON': {'san_luis': (20, 5), 'lurin': (80, 32)},
+    'PARURO': {'san_luis': (18, 4), 'lurin': (85, 33)},
+    'MALVINAS': {'san_luis': (25, 6), 'lurin': (90, 35)},
+    'AZANGARO': {'san_luis': (18, 4), 'lurin': (85, 33)},
+    'COMPUPALACE': {'san_luis': (15, 6), 'lurin': (50, 22)},
+    'MARSANO': {'san_luis': (12, 5), 'lurin': (45, 20)},
+}
+
+
+def formatear_minutos(minutos):
+    """75 -> '1h 15min', 18 -> '18min'."""
+    minutos = int(round(minutos))
+    if minutos < 60:
+        return f"{minutos}min"
+    return f"{minutos // 60}h {minutos % 60:02d}min"
@@ -0,0 +1,89 @@
+"""
+Anexado incremental de un mes al DataFrame limpio.
+
+Cada mes llega como un archivo de una sola columna de valores
+(ARTICULO;SABCT;CANAL;ZONA_CONSOLIDADO;valor). En lugar de reprocesar toda la
+historia, la columna se fusiona por clave de dimensiones y solo se ajustan
+los totales derivados afectados por ese mes.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .ingesta import ANIO_ANALISIS, DIMENSIONES, MES_CAMBIO, clave_mes
+
+
+def leer_mes(ruta, mes=None):
+    """Lee un archivo de un mes y devuelve (mes, DataFrame con DIMENSIONES + mes).
+
+    Si no se indica ``mes`` se toma del encabezado de la columna de valores.
+    """
+    df = pd.read_csv(ruta, sep=';', encoding='utf-8-sig', thousands=',',
+                     dtype={col: str for col in DIMENSIONES})
+
+    valores = [col for col in df.columns if col not in DIMENSIONES]
+    faltantes = [col for col in DIMENSIONES if col not in df.columns]
+    if faltantes or len(valores) != 1:
+        raise ValueError(f"{ruta}: se esperaba {';'.join(DIMENSIONES)};<valor>, se encontró {';'.join(df.columns)}")
+
+    mes = mes or valores[0]
+    if clave_mes(mes) is None:
+        raise ValueError(f"{ruta}: no se pudo determinar el mes ({mes!r}); indíquelo como Mmm-AA, p. ej. Feb-26")
+
+    df = df.rename(columns={valores[0]: mes})
+    df[mes] = df[mes].fillna(0).astype(np.float32)
+    return mes, df
+
+
+def _unir_categorias(df, nuevo):
+    for col in DIMENSIONES:
+        faltantes = pd.Index(nuevo[col].unique()).difference(df[col].cat.categories)
+        if len(faltantes):
+            df[col] = df[col].cat.add_categories(faltantes)
+        nuevo[col] = pd.Categorical(nuevo[col], categories=df[col].cat.categories)
+
+
+def _ajustar_totales(df, mes, delta, corte):
+    anio, _ = clave_mes(mes)
+    if anio != ANIO_ANALISIS:
+        return
+    df['TOTAL_2025'] += delta
+    if clave_mes(mes) < clave_mes(corte):
+        df['VENTA_ANTES_CAMBIO'] += delta
+    else:
+        df['VENTA_DESPUES_CAMBIO'] += delta
+
+
+def anexar_mes(df, nuevo, mes, corte=MES_CAMBIO):
+    """Fusiona la columna ``mes`` de ``nuevo`` en ``df`` y devuelve el resultado.
+
+    Las claves existentes reciben el valor en su primera fila; las nuevas se
+    agregan como filas con 0 en el resto de meses. Si el mes ya existía se
+    reemplaza (reenvío corregido). Solo se recalculan los totales de ese mes.
+    """
+    nuevo = nuevo.groupby(DIMENSIONES, as_index=False, sort=False)[mes].sum()
+    df = df.copy()
+    _unir_categorias(df, nuevo)
+
+    anterior = df[mes].to_numpy(dtype=np.float64) if mes in df.columns else np.zeros(len(df))
+    valores = np.zeros(len(df), dtype=np.float32)
+
+    # Posición de la primera fila de cada clave existente
+    primeras = np.flatnonzero(~df.duplicated(DIMENSIONES).to_numpy())
+    indice = pd.MultiIndex.from_frame(df[DIMENSIONES].iloc[primeras])
+    posiciones = indice.get_indexer(pd.MultiIndex.from_frame(nuevo[DIMENSIONES]))
+
+    existentes = posiciones >= 0
+    valores[primeras[posiciones[existentes]]] = nuevo[mes].to_numpy()[existentes]
+    df[mes] = valores
+    _ajustar_totales(df, mes, valores.astype(np.float64) - anterior, corte)
+
+    if (~existentes).any():
+        filas = nuevo.loc[~existentes, DIMENSIONES].reset_index(drop=True)
+        for col in df.columns.difference(DIMENSIONES):
+            filas[col] = np.zeros(len(filas), dtype=df[col].dtype)
+        filas[mes] = nuevo.loc[~existentes, mes].to_numpy()
+        _ajustar_totales(filas, mes, filas[mes].to_numpy(dtype=np.float64), corte)
+        df = pd.concat([df, filas[df.columns]], ignore_index=True)
+
+    return df
@@ -0,0 +1,136 @@
+"""
+Ingesta tipada del CSV de ventas por SKU, canal y zona.
+
+El separador de miles se interpreta durante la lectura y cada columna se
+declara con su tipo final: dimensiones como categóricas y meses como float32.
+Las columnas de mes (Ene-25 … Ene-26) se detectan por su nombre.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from .configuracion import FILAS_POR_BLOQUE, MOTORES, RUTA_CSV
+
+DIMENSIONES = ['ARTICULO', 'SABCT', 'CANAL', 'ZONA_CONSOLIDADO']
+
+NOMBRES_MES = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Set', 'Oct', 'Nov', 'Dic']
+_PATRON_MES = re.compile(r'^(' + '|'.join(NOMBRES_MES) + r')-(\d{2})$')
+
+# Año que resume el dashboard (TOTAL_2025) y mes del cambio de almacén
+ANIO_ANALISIS = 2025
+MES_CAMBIO = 'Ago-25'
+
+
+def clave_mes(columna):
+    """'Ago-25' -> (2025, 8); None si la columna no es un mes."""
+    coincidencia = _PATRON_MES.match(str(columna))
+    if coincidencia is None:
+        return None
+    nombre, anio = coincidencia.groups()
+    return 2000 + int(anio), NOMBRES_MES.index(nombre) + 1
+
+
+def detectar_meses(columnas, anio=None):
+    """Columnas de mes en orden cronológico, opcionalmente solo las de un año."""
+    meses = [col for col in columnas if clave_mes(col) is not None]
+    if anio is not None:
+        meses = [mes for mes in meses if clave_mes(mes)[0] == anio]
+    return sorted(meses, key=clave_mes)
+
+
+def meses_siguientes(ultimo, cantidad):
+    """Los ``cantidad`` meses posteriores a ``ultimo``: ('Ene-26', 2) -> ['Feb-26', 'Mar-26']."""
+    anio, mes = clave_mes(ultimo)
+    siguientes = []
+    for _ in range(cantidad):
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+        siguientes.append(f"{NOMBRES_MES[mes - 1]}-{anio % 100:02d}")
+    return siguientes
+
+
+def dividir_meses(meses, corte=MES_CAMBIO):
+    """Separa los meses en (antes, desde) el mes de corte."""
+    limite = clave_mes(corte)
+    antes = [mes for mes in meses if clave_mes(mes) < limite]
+    despues = [mes for mes in meses if clave_mes(mes) >= limite]
+    return antes, despues
+
+
+def _leer_encabezado(ruta):
+    return pd.read_csv(ruta, sep=';', encoding='utf-8-sig', nrows=0).columns.tolist()
+
+
+def _leer_csv_pyarrow(ruta, columnas):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv
+
+    # pyarrow no soporta separador de miles: se lee como texto y se limpia
+    # en una sola pasada vectorizada dentro de Arrow
+    tabla = csv.read_csv(
+        ruta,
+        parse_options=csv.ParseOptions(delimiter=';'),
+        convert_options=csv.ConvertOptions(column_types={col: pa.string() for col in columnas}),
+    )
+
+    arrays = []
+    for nombre in tabla.column_names:
+        columna = tabla.column(nombre)
+        if nombre in DIMENSIONES:
+            arrays.append(pc.dictionary_encode(columna))
+        else:
+            arrays.append(pc.cast(pc.replace_substring(columna, ',', ''), pa.float32()))
+
+    tabla = pa.table(arrays, names=tabla.column_names)
+    return tabla.to_pandas()
+
+
+def leer_csv(ruta=RUTA_CSV, motor='c'):
+    """Lee el CSV con dimensiones categóricas y meses en float32."""
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de lectura desconocido: {motor!r} (opciones: {', '.join(MOTORES)})")
+
+    columnas = _leer_encabezado(ruta)
+
+    if motor == 'pyarrow':
+        return _leer_csv_pyarrow(ruta, columnas)
+
+    tipos = {col: ('category' if col in DIMENSIONES else 'float32') for col in columnas}
+    return pd.read_csv(ruta, sep=';', encoding='utf-8-sig', thousands=',', dtype=tipos)
+
+
+def leer_csv_por_bloques(ruta=RUTA_CSV, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Itera el CSV en DataFrames de hasta ``filas_por_bloque`` filas, con los tipos de leer_csv.
+
+    Las categorías de cada bloque son solo los valores que aparecen en él.
+    """
+    tipos = {col: ('category' if col in DIMENSIONES else 'float32') for col in _leer_encabezado(ruta)}
+    with pd.read_csv(ruta, sep=';', encoding='utf-8-sig', thousands=',', dtype=tipos,
+                     chunksize=filas_por_bloque) as lector:
+        yield from lector
+
+
+def agregar_totales(df, meses=None, corte=MES_CAMBIO):
+    """Agrega TOTAL_2025 y las ventas antes/después del cambio de almacén.
+
+    Sin ``meses`` se usan los meses de ANIO_ANALISIS presentes en el DataFrame.
+    """
+    if meses is None:
+        meses = detectar_meses(df.columns, ANIO_ANALISIS)
+    meses_antes, meses_despues = dividir_meses(meses, corte)
+
+    # Los totales se acumulan en float64 para no perder precisión al sumar float32
+    matriz = df[meses].to_numpy(dtype=np.float64)
+    posicion = {mes: i for i, mes in enumerate(meses)}
+
+    df['TOTAL_2025'] = matriz.sum(axis=1)
+    df['VENTA_ANTES_CAMBIO'] = matriz[:, [posicion[m] for m in meses_antes]].sum(axis=1)
+    df['VENTA_DESPUES_CAMBIO'] = matriz[:, [posicion[m] for m in meses_despues]].sum(axis=1)
+    return df
+
+
+def preparar_datos(ruta=RUTA_CSV, motor='c'):
+    """Lee el CSV y devuelve el DataFrame limpio con los totales derivados."""
+    return agregar_totales(leer_csv(ruta, motor=motor))
@@ -0,0 +1,210 @@
+"""
+Matriz de distancias y tiempos de entrega almacén × zona.
+
+La distancia en línea recta sale de la fórmula de haversine vectorizada
+(todos los orígenes contra todos los destinos en una sola operación). Sin
+grafo vial se convierte en km y minutos de ruta con un modelo lineal
+calibrado contra los tiempos medidos de geografia.TIEMPOS_REFERENCIA. Con un
+grafo vial local (.npz) las rutas se resuelven con Dijkstra. Los pares con
+tiempo medido usan la medición; el modelo y el grafo cubren el resto y los
+sitios candidatos. Las matrices se guardan en disco por huella de
+coordenadas, modelo, grafo y mediciones, así que evaluar
+decenas de sitios candidatos cuesta un solo cálculo.
+"""
+
+import hashlib
+import os
+from dataclasses import astuple, dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import DIRECTORIO_CACHE, escribir_atomico
+from .geografia import ALMACENES, TIEMPOS_REFERENCIA, ZONAS
+
+RADIO_TIERRA_KM = 6371.0088
+
+# Grafo vial opcional: .npz con lat, lon (nodos), origen, destino, km y minutos (aristas)
+RUTA_GRAFO = os.environ.get('INVENTARIO_GRAFO_VIAL') or None
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distancia en línea recta en km; los argumentos se combinan por broadcasting."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(h))
+
+
+@dataclass(frozen=True)
+class ModeloTiempo:
+    """km de ruta = factor × km en línea recta; minutos = fijos + minutos/km dentro de Lima.
+
+    Pasado ``limite_urbano_km`` el resto del trayecto se recorre a velocidad de carretera.
+    """
+
+    factor_ruta: float
+    minutos_fijos: float
+    minutos_por_km: float
+    limite_urbano_km: float = 40.0
+    velocidad_carretera_kmh: float = 60.0
+
+    def km_ruta(self, km_lineal):
+        return np.asarray(km_lineal) * self.factor_ruta
+
+    def minutos(self, km_ruta):
+        km_ruta = np.asarray(km_ruta)
+        urbano = np.minimum(km_ruta, self.limite_urbano_km)
+        carretera = km_ruta - urbano
+        return self.minutos_fijos + urbano * self.minutos_por_km + carretera / self.velocidad_carretera_kmh * 60
+
+
+def calibrar_modelo(referencias=TIEMPOS_REFERENCIA, almacenes=ALMACENES, zonas=ZONAS):
+    """Ajusta ModeloTiempo por mínimos cuadrados a los tiempos y km medidos."""
+    filas = [(zona, almacen, minutos, km)
+             for zona, medidas in referencias.items()
+             for almacen, (minutos, km) in medidas.items()]
+    lineal = haversine_km([almacenes[a]['lat'] for _, a, _, _ in filas], [almacenes[a]['lon'] for _, a, _, _ in filas],
+                          [zonas[z]['lat'] for z, _, _, _ in filas], [zonas[z]['lon'] for z, _, _, _ in filas])
+    minutos = np.array([m for _, _, m, _ in filas], dtype=np.float64)
+    km = np.array([k for _, _, _, k in filas], dtype=np.float64)
+
+    factor = float(lineal @ km / (lineal @ lineal))
+    diseno = np.column_stack([np.ones_like(km), km])
+    (fijos, por_km), *_ = np.linalg.lstsq(diseno, minutos, rcond=None)
+    return ModeloTiempo(factor, float(fijos), float(por_km))
+
+
+@dataclass(frozen=True)
+class GrafoVial:
+    lat: np.ndarray
+    lon: np.ndarray
+    km: object  # scipy.sparse.csr_matrix nodos × nodos
+    minutos: object
+
+
+def cargar_grafo(ruta):
+    """Lee un grafo vial .npz (aristas dirigidas) como matrices dispersas de km y minutos."""
+    from scipy.sparse import csr_matrix
+
+    with np.load(ruta) as datos:
+        lat, lon = datos['lat'], datos['lon']
+        aristas = (datos['origen'], datos['destino'])
+        forma = (len(lat), len(lat))
+        return GrafoVial(lat, lon, csr_matrix((datos['km'], aristas), shape=forma),
+                         csr_matrix((datos['minutos'], aristas), shape=forma))
+
+
+@dataclass(frozen=True)
+class MatrizEntrega:
+    """km y minutos de ruta para cada par origen × destino."""
+
+    origenes: list
+    destinos: list
+    km: np.ndarray
+    minutos: np.ndarray
+
+    def tabla(self, medida='minutos'):
+        return pd.DataFrame(getattr(self, medida), index=pd.Index(self.origenes, name='origen'),
+                            columns=pd.Index(self.destinos, name='destino'))
+
+    def promedio(self, destinos=None, pesos=None, medida='minutos'):
+        """Promedio por origen sobre ``destinos`` (todos por defecto), opcionalmente ponderado."""
+        tabla = self.tabla(medida)
+        if destinos is not None:
+            tabla = tabla[list(destinos)]
+        return pd.Series(np.average(tabla.to_numpy(), axis=1, weights=pesos), index=tabla.index)
+
+
+def _coordenadas(puntos):
+    """Nombres, latitudes y longitudes de un dict {nombre: {'lat', 'lon'}} o un DataFrame con lat/lon."""
+    if isinstance(puntos, pd.DataFrame):
+        return [str(n) for n in puntos.index], puntos['lat'].to_numpy(np.float64), puntos['lon'].to_numpy(np.float64)
+    nombres = list(puntos)
+    return (nombres, np.array([puntos[n]['lat'] for n in nombres], dtype=np.float64),
+            np.array([puntos[n]['lon'] for n in nombres], dtype=np.float64))
+
+
+def _rutear(grafo, modelo, lat_o, lon_o, lat_d, lon_d):
+    from scipy.sparse.csgraph import dijkstra
+
+    # Cada punto entra y sale de la red por su nodo más cercano
+    nodo_o = haversine_km(lat_o[:, None], lon_o[:, None], grafo.lat, grafo.lon).argmin(axis=1)
+    nodo_d = haversine_km(lat_d[:, None], lon_d[:, None], grafo.lat, grafo.lon).argmin(axis=1)
+    acceso_o = modelo.km_ruta(haversine_km(lat_o, lon_o, grafo.lat[nodo_o], grafo.lon[nodo_o]))
+    acceso_d = modelo.km_ruta(haversine_km(lat_d, lon_d, grafo.lat[nodo_d], grafo.lon[nodo_d]))
+
+    unicos, inversa = np.unique(nodo_o, return_inverse=True)
+    km_red = dijkstra(grafo.km, indices=unicos)[inversa][:, nodo_d]
+    minutos_red = dijkstra(grafo.minutos, indices=unicos)[inversa][:, nodo_d]
+
+    acceso = acceso_o[:, None] + acceso_d[None, :]
+    km = km_red + acceso
+    minutos = minutos_red + modelo.minutos(acceso)
+    return km, minutos
+
+
+def matriz_entrega(origenes, destinos, modelo=None, grafo=None, referencias=TIEMPOS_REFERENCIA):
+    """Matriz origen × destino. Sin ``grafo`` usa el modelo lineal sobre la distancia haversine.
+
+    Los pares sin camino en el grafo caen de vuelta al modelo lineal. Los pares
+    medidos en ``referencias`` ({destino: {origen: (minutos, km)}}) usan la medición.
+    """
+    modelo = modelo or calibrar_modelo()
+    nombres_o, lat_o, lon_o = _coordenadas(origenes)
+    nombres_d, lat_d, lon_d = _coordenadas(destinos)
+
+    km = modelo.km_ruta(haversine_km(lat_o[:, None], lon_o[:, None], lat_d[None, :], lon_d[None, :]))
+    minutos = modelo.minutos(km)
+    if grafo is not None:
+        km_grafo, minutos_grafo = _rutear(grafo, modelo, lat_o, lon_o, lat_d, lon_d)
+        alcanzable = np.isfinite(minutos_grafo)
+        km = np.where(alcanzable, km_grafo, km)
+        minutos = np.where(alcanzable, minutos_grafo, minutos)
+
+    indice_o = {nombre: i for i, nombre in enumerate(nombres_o)}
+    for j, nombre_d in enumerate(nombres_d):
+        for nombre_o, (minutos_medidos, km_medidos) in referencias.get(nombre_d, {}).items():
+            if nombre_o in indice_o:
+                minutos[indice_o[nombre_o], j] = minutos_medidos
+                km[indice_o[nombre_o], j] = km_medidos
+    return MatrizEntrega(nombres_o, nombres_d, km, minutos)
+
+
+def _huella_matriz(origenes, destinos, modelo, ruta_grafo, referencias):
+    digest = hashlib.sha256()
+    for puntos in (origenes, destinos):
+        nombres, lat, lon = _coordenadas(puntos)
+        digest.update('\0'.join(nombres).encode())
+        digest.update(lat.tobytes())
+        digest.update(lon.tobytes())
+    digest.update(repr(astuple(modelo)).encode())
+    digest.update(repr(sorted((d, sorted(m.items())) for d, m in referencias.items())).encode())
+    if ruta_grafo is not None:
+        digest.update(Path(ruta_grafo).read_bytes())
+    return digest.hexdigest()
+
+
+def cargar_o_calcular_matriz(origenes=ALMACENES, destinos=ZONAS, ruta_grafo=RUTA_GRAFO, directorio=DIRECTORIO_CACHE,
+                             referencias=TIEMPOS_REFERENCIA):
+    """Matriz de entrega guardada en disco por huella de coordenadas, modelo, grafo y mediciones."""
+    modelo = calibrar_modelo(referencias)
+    huella = _huella_matriz(origenes, destinos, modelo, ruta_grafo, referencias)
+    destino = Path(directorio) / f"entrega-{huella[:16]}.npz"
+    nombres_o, _, _ = _coordenadas(origenes)
+    nombres_d, _, _ = _coordenadas(destinos)
+
+    if destino.exists():
+        with np.load(destino) as datos:
+            return MatrizEntrega(nombres_o, nombres_d, datos['km'], datos['minutos'])
+
+    grafo = cargar_grafo(ruta_grafo) if ruta_grafo is not None else None
+    matriz = matriz_entrega(origenes, destinos, modelo, grafo, referencias)
+
+    def escribir(temporal):
+        with open(temporal, 'wb') as archivo:
+            np.savez(archivo, km=matriz.km, minutos=matriz.minutos)
+
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    escribir_atomico(destino, escribir)
+    return matriz
@@ -0,0 +1,136 @@
+"""
+Mapas de rutas almacén → zonas con un número fijo de trazas.
+
+Todas las rutas van en una sola traza de líneas (segmentos separados por
+None) y todas las zonas en una sola traza de marcadores con color, tamaño y
+texto por punto. El almacén es la tercera traza. El tamaño del payload crece
+con el número de puntos, no con el de trazas.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+
+def _intercalar(origen, destinos):
+    """[o, d1, None, o, d2, None, ...] para dibujar todos los segmentos en una traza."""
+    n = len(destinos)
+    return np.column_stack([np.full(n, origen, dtype=object),
+                            np.asarray(destinos, dtype=object),
+                            np.full(n, None, dtype=object)]).ravel().tolist()
+
+
+def figura_rutas(almacen, zonas, altura=400):
+    """Mapa de rutas desde ``almacen`` hacia cada fila de ``zonas``.
+
+    ``almacen`` es una entrada de geografia.ALMACENES. ``zonas`` es un
+    DataFrame con columnas NOMBRE, LAT, LON, COLOR, TAMANO, TEXTO_RUTA y
+    TEXTO_ZONA (textos de hover de la ruta y del marcador).
+    """
+    texto_ruta = zonas['TEXTO_RUTA'].tolist()
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattermapbox(
+        lat=_intercalar(almacen['lat'], zonas['LAT']),
+        lon=_intercalar(almacen['lon'], zonas['LON']),
+        mode='lines',
+        line=dict(width=3, color=almacen['color']),
+        opacity=0.6,
+        name='Rutas',
+        hoverinfo='text',
+        hovertext=[t for texto in texto_ruta for t in (texto, texto, None)],
+    ))
+    fig.add_trace(go.Scattermapbox(
+        lat=zonas['LAT'].tolist(),
+        lon=zonas['LON'].tolist(),
+        mode='markers+text',
+        marker=dict(size=zonas['TAMANO'].tolist(), color=zonas['COLOR'].tolist()),
+        text=zonas['NOMBRE'].tolist(),
+        textposition='top right',
+        textfont=dict(size=10),
+        hoverinfo='text',
+        hovertext=zonas['TEXTO_ZONA'].tolist(),
+        showlegend=False,
+    ))
+    fig.add_trace(go.Scattermapbox(
+        lat=[almacen['lat']],
+        lon=[almacen['lon']],
+        mode='markers',
+        marker=dict(size=20, color=almacen['color'], symbol='circle'),
+        name=almacen['nombre'],
+        hoverinfo='text',
+        hovertext=f"<b>{almacen['nombre']}</b><br>{almacen['direccion']}<br><i>{almacen['operacion']}</i>",
+    ))
+
+    lat, lon = almacen['centro']
+    fig.update_layout(
+        mapbox=dict(style="carto-positron", center=dict(lat=lat, lon=lon), zoom=almacen['zoom']),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=altura,
+        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5, font=dict(size=9)),
+        showlegend=True,
+    )
+    return fig
+
+
+def figura_sitios(puntaje, destinos, ventas, almacenes, sitios, centro=(-12.10, -77.00), zoom=10.3, altura=450):
+    """Mapa de evaluación de sitios: grilla coloreada por minutos ponderados, zonas, almacenes y sitios propuestos.
+
+    ``puntaje`` es la salida de ubicacion.puntuar_sitios, ``destinos`` y
+    ``ventas`` las zonas atendidas, ``almacenes`` un dict de
+    geografia.ALMACENES y ``sitios`` la salida de ubicacion.ubicar_sitios.
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Scattermapbox(
+        lat=puntaje['lat'].tolist(),
+        lon=puntaje['lon'].tolist(),
+        mode='markers',
+        marker=dict(size=6, color=puntaje['MINUTOS_PONDERADOS'].tolist(), colorscale='RdYlGn_r', opacity=0.45,
+                    colorbar=dict(title='min', thickness=10, len=0.6)),
+        name='Candidatos',
+        # El texto de hover lo formatea plotly.js en el navegador, no una cadena por punto
+        customdata=puntaje['MINUTOS_PONDERADOS'].tolist(),
+        hovertemplate="%{customdata:.0f} min ponderados<extra></extra>",
+    ))
+    tamano = 8 + 14 * np.sqrt(np.asarray(ventas) / np.max(ventas))
+    fig.add_trace(go.Scattermapbox(
+        lat=destinos['lat'].tolist(),
+        lon=destinos['lon'].tolist(),
+        mode='markers',
+        marker=dict(size=tamano.tolist(), color='#1a1a2e'),
+        name='Zonas',
+        hoverinfo='text',
+        hovertext=[f"<b>{zona}</b><br>Venta 2025: ${venta/1000:,.0f}K" for zona, venta in zip(destinos.index, ventas)],
+    ))
+    fig.add_trace(go.Scattermapbox(
+        lat=[a['lat'] for a in almacenes.values()],
+        lon=[a['lon'] for a in almacenes.values()],
+        mode='markers+text',
+        marker=dict(size=18, color=[a['color'] for a in almacenes.values()]),
+        text=[a['nombre'] for a in almacenes.values()],
+        textposition='bottom right',
+        name='Almacenes',
+        hoverinfo='text',
+        hovertext=[f"<b>{a['nombre']}</b><br>{a['direccion']}" for a in almacenes.values()],
+    ))
+    fig.add_trace(go.Scattermapbox(
+        lat=sitios['lat'].tolist(),
+        lon=sitios['lon'].tolist(),
+        mode='markers+text',
+        marker=dict(size=22, color='#ffd93d'),
+        text=sitios.index.tolist(),
+        textposition='top right',
+        name='Sitios propuestos',
+        hoverinfo='text',
+        hovertext=[f"<b>{nombre}</b><br>{fila.MINUTOS_PONDERADOS:.0f} min ponderados<br>Venta atendida: ${fila.VENTA_ATENDIDA/1000:,.0f}K"
+                   for nombre, fila in sitios.iterrows()],
+    ))
+
+    lat, lon = centro
+    fig.update_layout(
+        mapbox=dict(style="carto-positron", center=dict(lat=lat, lon=lon), zoom=zoom),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=altura,
+        legend=dict(orientation="h", yanchor="bottom", y=-0.12, xanchor="center", x=0.5, font=dict(size=9)),
+        showlegend=True,
+    )
+    return fig
@@ -0,0 +1,163 @@
+"""
+Dataset compacto compartido entre sesiones y reporte de memoria.
+
+compactar deja el DataFrame limpio en su forma más liviana: dimensiones
+categóricas y todos los meses en una sola matriz float32 de solo lectura.
+El dashboard la guarda una vez por proceso y todas las sesiones leen el
+mismo bloque; cualquier escritura accidental falla en lugar de modificar
+los datos de las demás sesiones. Con INVENTARIO_MEMORIA_LIGERA=1 además se
+renuncia a las copias que solo aceleran consultas (el frame ordenado por
+artículo y parte de los modelos memoizados por filtro).
+
+Medidor cuenta bytes siguiendo cada arreglo hasta el buffer que lo
+contiene: un bloque compartido por varios objetos (el dataset dentro de los
+filtros, del índice de artículos y del pronóstico) se cuenta una sola vez.
+"""
+
+import os
+import sys
+from dataclasses import is_dataclass
+
+import numpy as np
+import pandas as pd
+
+from .ingesta import DIMENSIONES, detectar_meses
+
+MEMORIA_LIGERA = os.environ.get('INVENTARIO_MEMORIA_LIGERA', '0') not in ('', '0')
+
+# Modelos por combinación de filtros que se conservan en modo ligero
+MAX_MODELOS_LIGERO = 4
+
+_UNIDADES = ('B', 'KB', 'MB', 'GB')
+
+
+def _solo_lectura(matriz, filas, columnas):
+    matriz.flags.writeable = False
+    # DataFrame guarda el bloque como columnas × filas: se le entrega la traspuesta para no copiar
+    return pd.DataFrame(matriz.T, index=filas, columns=columnas, copy=False)
+
+
+def _columna_congelada(columna):
+    if not isinstance(columna.dtype, np.dtype):
+        return columna.array
+    valores = columna.to_numpy(copy=True)
+    valores.flags.writeable = False
+    return valores
+
+
+def congelar(tabla):
+    """Copia de un DataFrame o Series con cada columna en su propio arreglo de solo lectura.
+
+    Una escritura en el lugar (iloc, loc, at) falla con ValueError en vez de
+    modificar lo que leen las demás sesiones. Las columnas con tipos de
+    extensión (categóricas) se conservan como están.
+    """
+    if isinstance(tabla, pd.Series):
+        return pd.Series(_columna_congelada(tabla), index=tabla.index, name=tabla.name, copy=False)
+    # Con copy=False pandas no consolida las columnas en un bloque nuevo (que sería escribible)
+    congelada = pd.DataFrame({i: _columna_congelada(tabla.iloc[:, i]) for i in range(tabla.shape[1])},
+                             index=tabla.index, copy=False)
+    congelada.columns = tabla.columns
+    return congelada
+
+
+def compactar(df, meses=None):
+    """Copia de ``df`` con dimensiones categóricas y los meses en una matriz float32 de solo lectura.
+
+    Cada mes queda contiguo en memoria. Las demás columnas numéricas (los
+    totales) forman una segunda matriz, también de solo lectura.
+    """
+    meses = detectar_meses(df.columns) if meses is None else list(meses)
+    dimensiones = [col for col in df.columns if col in DIMENSIONES]
+    resto = [col for col in df.columns if col not in dimensiones and col not in meses]
+
+    categoricas = df[dimensiones].copy()
+    for col in dimensiones:
+        if not isinstance(categoricas[col].dtype, pd.CategoricalDtype):
+            categoricas[col] = categoricas[col].astype('category')
+
+    partes = [categoricas, _solo_lectura(np.ascontiguousarray(df[meses].to_numpy(dtype=np.float32).T),
+                                         df.index, meses)]
+    if resto:
+        partes.append(_solo_lectura(np.ascontiguousarray(df[resto].to_numpy().T), df.index, resto))
+    return pd.concat(partes, axis=1, copy=False)
+
+
+class Medidor:
+    """Suma bytes de objetos sin contar dos veces el mismo buffer u objeto."""
+
+    def __init__(self):
+        # Se guarda la referencia además del id para que ningún id se reutilice durante la medición
+        self._vistos = {}
+
+    def _nuevo(self, objeto):
+        if id(objeto) in self._vistos:
+            return False
+        self._vistos[id(objeto)] = objeto
+        return True
+
+    def _arreglo(self, arreglo):
+        raiz = arreglo
+        while isinstance(raiz.base, np.ndarray):
+            raiz = raiz.base
+        if not self._nuevo(raiz):
+            return 0
+        total = raiz.nbytes
+        if raiz.dtype == object:
+            total += sum(self.medir(valor) for valor in raiz.ravel())
+        return total
+
+    def medir(self, objeto):
+        """Bytes de ``objeto`` que no se contaron en una medición anterior de este medidor."""
+        if isinstance(objeto, np.ndarray):
+            return self._arreglo(objeto)
+        if isinstance(objeto, pd.DataFrame):
+            return self.medir(objeto.index) + sum(self.medir(objeto.iloc[:, i]) for i in range(objeto.shape[1]))
+        if isinstance(objeto, pd.Series):
+            if isinstance(objeto.dtype, pd.CategoricalDtype) or isinstance(objeto.array, pd.arrays.NumpyExtensionArray):
+                return self.medir(objeto.index) + self.medir(objeto.array)
+            return self.medir(objeto.index) + (objeto.memory_usage(deep=True, index=False) if self._nuevo(objeto) else 0)
+        if isinstance(objeto, pd.Categorical):
+            return self._arreglo(objeto.codes) + self.medir(objeto.categories)
+        if isinstance(objeto, pd.arrays.NumpyExtensionArray):
+            return self._arreglo(objeto.to_numpy())
+        if isinstance(objeto, pd.RangeIndex):
+            return sys.getsizeof(objeto) if self._nuevo(objeto) else 0
+        if isinstance(objeto, pd.MultiIndex):
+            return sum(self.medir(nivel) for nivel in objeto.levels) + sum(self._arreglo(c) for c in objeto.codes)
+        if isinstance(objeto, pd.CategoricalIndex):
+            return self.medir(objeto.array)
+        if isinstance(objeto, pd.Index):
+            return self._arreglo(objeto.to_numpy())
+
+        if not self._nuevo(objeto):
+            return 0
+        total = sys.getsizeof(objeto)
+        if isinstance(objeto, dict):
+            total += sum(self.medir(clave) + self.medir(valor) for clave, valor in objeto.items())
+        elif isinstance(objeto, (list, tuple, set, frozenset)):
+            total += sum(self.medir(valor) for valor in objeto)
+        elif is_dataclass(objeto) or type(objeto).__module__.startswith(__package__):
+            # Solo se recorren los objetos del paquete; del resto se cuenta el objeto mismo
+            total += self.medir(vars(objeto))
+        return total
+
+
+def reporte_memoria(objetos):
+    """Bytes por objeto; ``objetos`` es una lista de (ámbito, nombre, objeto).
+
+    Un buffer compartido se atribuye al primer objeto que lo contiene, así que
+    conviene listar primero lo que se comparte entre sesiones.
+    """
+    medidor = Medidor()
+    filas = [(ambito, nombre, medidor.medir(objeto)) for ambito, nombre, objeto in objetos]
+    return pd.DataFrame(filas, columns=['AMBITO', 'OBJETO', 'BYTES'])
+
+
+def formatear_bytes(cantidad):
+    """1536 -> '1.5 KB'."""
+    for unidad in _UNIDADES[:-1]:
+        if abs(cantidad) < 1024:
+            return f"{cantidad:,.0f} {unidad}" if unidad == 'B' else f"{cantidad:,.1f} {unidad}"
+        cantidad /= 1024
+    return f"{cantidad:,.1f} {_UNIDADES[-1]}"
@@ -0,0 +1,73 @@
+"""
+KPIs del dashboard como datos planos, para procesos por lotes.
+
+metricas_principales resume un ModeloMetricas en un dict serializable
+(números de Python y None en lugar de NaN). calcular_metricas parte de un
+CSV (a través de su caché columnar, leyéndolo por bloques o con un motor de
+inventario.consultas) y un Filtro, sin Streamlit ni plotly.
+tabla_metricas aplana las métricas de varias unidades de negocio en un
+DataFrame de una fila por unidad, listo para Parquet.
+"""
+
+import math
+from dataclasses import asdict
+
+import pandas as pd
+
+from .bloques import resumir_por_bloques
+from .cache import DIRECTORIO_CACHE, cargar_con_cache
+from .consultas import abrir_motor, resumen_consultas
+from .filtros import DIMENSIONES_FILTRO, SIN_FILTRO, ModelosFiltrados
+from .ingesta import ANIO_ANALISIS, RUTA_CSV, detectar_meses
+
+# Atributos de ModeloMetricas que se exportan tal cual
+INDICADORES = ['total_2025', 'promedio_mensual', 'skus_con_venta', 'skus_totales',
+               'venta_antes', 'venta_despues', 'promedio_antes', 'promedio_despues', 'variacion',
+               'participacion_minorista', 'venta_centro', 'pct_centro', 'part_lima', 'part_provincia']
+
+
+def _escalar(valor):
+    """Escalar de numpy a número de Python; NaN -> None (JSON no admite NaN)."""
+    valor = valor.item() if hasattr(valor, 'item') else valor
+    return None if isinstance(valor, float) and math.isnan(valor) else valor
+
+
+def metricas_principales(modelo):
+    """Indicadores principales de ``modelo`` (ModeloMetricas o ResumenIndicadores) y participación de cada canal (%)."""
+    metricas = {'huella': modelo.huella, 'desde': modelo.meses[0], 'hasta': modelo.meses[-1]}
+    metricas.update({nombre: _escalar(getattr(modelo, nombre)) for nombre in INDICADORES})
+    metricas['pct_activos'] = _escalar(modelo.skus_con_venta / modelo.skus_totales * 100) if modelo.skus_totales else None
+    canales = modelo.canal_analysis
+    metricas['participacion_canal'] = {str(canal): _escalar(pct) for canal, pct in
+                                       zip(canales['CANAL'], canales['PARTICIPACION'])}
+    return metricas
+
+
+def calcular_metricas(ruta=RUTA_CSV, filtro=SIN_FILTRO, directorio=DIRECTORIO_CACHE, filas_por_bloque=None,
+                      motor_consultas=None):
+    """Métricas de una unidad de negocio (un CSV) para ``filtro``; ValueError si el filtro no tiene filas.
+
+    Con ``filas_por_bloque`` el CSV se lee por bloques (memoria acotada, sin
+    caché ni meses anexados) y el resultado es el mismo. Con ``motor_consultas``
+    ('pandas', 'polars' o 'duckdb') los indicadores salen de consultas a ese
+    motor sobre la caché columnar.
+    """
+    filtro = filtro.normalizado()
+    if filas_por_bloque:
+        modelo = resumir_por_bloques(ruta, filtro, filas_por_bloque)
+    elif motor_consultas:
+        modelo = resumen_consultas(abrir_motor(motor_consultas, ruta, directorio), filtro)
+    else:
+        df, huella = cargar_con_cache(ruta, directorio)
+        modelo = ModelosFiltrados(df, detectar_meses(df.columns, ANIO_ANALISIS), huella).modelo(filtro)
+    seleccion = {dim: list(valores) for dim, valores in asdict(filtro).items()
+                 if dim in DIMENSIONES_FILTRO and valores}
+    return {'origen': str(ruta), 'filtro': seleccion, **metricas_principales(modelo)}
+
+
+def tabla_metricas(metricas):
+    """Una fila por unidad de negocio; los dicts anidados pasan a columnas 'participacion_canal.MINORISTA'."""
+    tabla = pd.json_normalize([{k: v for k, v in m.items() if k != 'filtro'} for m in metricas])
+    # El filtro se guarda como texto ('canal=MINORISTA;zona=LIMA') para no depender de columnas de listas
+    tabla.insert(1, 'filtro', [';'.join(f"{dim}={'+'.join(v)}" for dim, v in m['filtro'].items()) for m in metricas])
+    return tabla
@@ -0,0 +1,336 @@
+"""
+Modelo de métricas del dashboard.
+
+Reúne las agregaciones que antes se ejecutaban a nivel de módulo en cada
+rerun de Streamlit. calcular_modelo es pura: recibe el DataFrame limpio y
+devuelve un ModeloMetricas inmutable que la capa de presentación solo lee.
+Las ventas se leen del cubo de agregados; sobre las filas solo quedan los
+conteos de SKUs únicos, que no son aditivos y se calculan de una vez (en
+serie, con hilos o con procesos) con paralelo.contar_skus.
+"""
+
+import unicodedata
+from dataclasses import dataclass, fields
+
+import pandas as pd
+
+from .corte import COLUMNAS_COMPARATIVA, construir_comparativas
+from .cubo import Cubo, TablaHechos, construir_hechos
+from .ingesta import ANIO_ANALISIS, MES_CAMBIO, detectar_meses
+from .memoria import congelar
+from .paralelo import contar_skus
+
+# Clasificaciones activas (excluye Obsoleto y Gestión)
+SABCT_ACTIVOS = ['S', 'A', 'B', 'C', 'T', 'Nuevo']
+
+# Clases del portafolio en el orden en que se presentan
+SABCT_PORTAFOLIO = SABCT_ACTIVOS + ['Gestión', 'Obsoleto']
+
+CANALES = ['MINORISTA', 'INTEGRADOR', 'OPERADORES', 'RETAIL']
+
+# Zonas comerciales dibujadas en los mapas (las 4 primeras son el centro de Lima)
+ZONAS_MAPA = ['WILSON', 'PARURO', 'MALVINAS', 'AZANGARO', 'COMPUPALACE', 'MARSANO']
+
+ZONAS_LIMA = ['LIMA', 'WILSON', 'MALVINAS', 'PARURO', 'AZANGARO', 'COMPUPALACE', 'MARSANO', 'CALLAO', 'RIMAC']
+
+
+def _congelar_tablas(instancia):
+    # frozen solo impide reasignar atributos; el modelo se comparte entre
+    # sesiones, así que además sus tablas se guardan con arreglos de solo lectura
+    for campo in fields(instancia):
+        valor = getattr(instancia, campo.name)
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            object.__setattr__(instancia, campo.name, congelar(valor))
+
+
+@dataclass(frozen=True)
+class ModeloMetricas:
+    """Resultados agregados de un dataset. Los DataFrames y Series son de solo lectura."""
+
+    huella: str
+    meses: tuple
+
+    # Hechos en formato largo y cubo canal × zona × sabct × periodo
+    hechos: TablaHechos
+    cubo: Cubo
+
+    # Composición del portafolio por clase SABCT
+    composicion: pd.DataFrame
+
+    # Indicadores principales
+    total_2025: float
+    promedio_mensual: float
+    skus_con_venta: int
+    skus_totales: int
+    ventas_mensuales: pd.Series
+
+    # Antes / después del cambio de almacén (MES_CAMBIO); ``comparativas``
+    # responde para cualquier otro corte por total, canal, zona, sabct y sku
+    comparativas: dict
+    venta_antes: float
+    venta_despues: float
+    promedio_antes: float
+    promedio_despues: float
+    variacion: float
+
+    # Canal
+    canal_analysis: pd.DataFrame
+    participacion_minorista: float
+
+    # SABCT por canal
+    pivot_skus: pd.DataFrame
+    pivot_participacion: pd.DataFrame
+    df_treemap: pd.DataFrame
+
+    # Zona × canal
+    pivot_pedidos: pd.DataFrame
+    pivot_ventas: pd.DataFrame
+
+    # Zonas del mapa y resumen ejecutivo
+    metricas_zona: pd.DataFrame
+    metricas_mapa: pd.DataFrame
+    venta_centro: float
+    pct_centro: float
+    part_lima: float
+    part_provincia: float
+
+    def __post_init__(self):
+        _congelar_tablas(self)
+
+
+@dataclass(frozen=True)
+class ResumenIndicadores:
+    """Indicadores principales sin las tablas que requieren las filas (lectura por bloques, consultas).
+
+    Tiene los mismos nombres que ModeloMetricas para lo que comparten, así que
+    metricas_principales acepta uno u otro.
+    """
+
+    huella: str
+    meses: tuple
+    filas: int
+
+    cubo: Cubo
+    comparativas: dict
+
+    # SKUs únicos en total, con venta en el rango y por canal, zona y sabct
+    skus_totales: int
+    skus_con_venta: int
+    skus_por_dimension: dict
+
+    total_2025: float
+    promedio_mensual: float
+    ventas_mensuales: pd.Series
+    venta_antes: float
+    venta_despues: float
+    promedio_antes: float
+    promedio_despues: float
+    variacion: float
+    canal_analysis: pd.DataFrame
+    participacion_minorista: float
+    metricas_zona: pd.DataFrame
+    metricas_mapa: pd.DataFrame
+    venta_centro: float
+    pct_centro: float
+    part_lima: float
+    part_provincia: float
+
+    def __post_init__(self):
+        _congelar_tablas(self)
+
+
+def composicion_portafolio(df, ventas_sabct=None, skus_sabct=None):
+    """SKUs únicos (ARTICULO × SABCT), venta y % de venta por clase.
+
+    ``ventas_sabct`` (p. ej. una serie del cubo) evita sumar TOTAL_2025 sobre las filas
+    y ``skus_sabct`` (de ConteosSkus) contar SKUs sobre ellas.
+    """
+    if ventas_sabct is None:
+        ventas_sabct = df.groupby('SABCT', observed=True)['TOTAL_2025'].sum()
+    if skus_sabct is None:
+        skus_sabct = _skus_unicos(df, 'SABCT')
+    composicion = skus_sabct.to_frame('SKUS')
+    composicion['VENTA'] = ventas_sabct.reindex(composicion.index, fill_value=0).to_numpy()
+
+    # Las clases conocidas siempre aparecen (aunque tengan 0); las nuevas del ERP van al final
+    orden = SABCT_PORTAFOLIO + [c for c in composicion.index if c not in SABCT_PORTAFOLIO]
+    composicion = composicion.reindex(orden, fill_value=0)
+    total_venta = composicion['VENTA'].sum()
+    composicion['PCT_VENTA'] = (composicion['VENTA'] / total_venta * 100) if total_venta > 0 else 0.0
+    return composicion
+
+
+def _skus_unicos(df, columna):
+    """SKUs únicos por valor de ``columna`` (solo valores con filas), con el índice como texto."""
+    skus = df.groupby(columna, observed=True)['ARTICULO'].nunique()
+    skus.index = skus.index.astype(str)
+    return skus
+
+
+def _analisis_canal(skus, ventas_canal, n_meses):
+    canal_analysis = pd.DataFrame({
+        'CANAL': skus.index,
+        'VENTA_2025': ventas_canal.reindex(skus.index, fill_value=0).to_numpy(),
+        'SKUs': skus.to_numpy(),
+    })
+    canal_analysis['PROMEDIO_MENSUAL'] = canal_analysis['VENTA_2025'] / n_meses
+    canal_analysis['PARTICIPACION'] = (canal_analysis['VENTA_2025'] / canal_analysis['VENTA_2025'].sum()) * 100
+    return canal_analysis.sort_values('VENTA_2025', ascending=False)
+
+
+def _sabct_por_canal(conteos):
+    # Tabla 1: Recuento de SKUs por Canal y SABCT (canales con algún SKU de una clase activa)
+    pivot_skus = conteos.tabla('canal_sabct').reindex(columns=SABCT_ACTIVOS, fill_value=0)
+    pivot_skus = pivot_skus[pivot_skus.sum(axis=1) > 0]
+    pivot_skus.index.name = 'CANAL'
+    pivot_skus['Total'] = pivot_skus.sum(axis=1)
+
+    # Tabla 2: Participación de cada canal en cada clasificación SABCT
+    totales_sabct = conteos.serie('sabct').reindex(SABCT_ACTIVOS, fill_value=0)
+    participacion = pivot_skus[SABCT_ACTIVOS] / totales_sabct.where(totales_sabct > 0) * 100
+    pivot_participacion = participacion.round(0).fillna(0).astype(int).assign(Total=pivot_skus['Total'])
+
+    # Datos para el treemap
+    treemap_data = []
+    for canal in CANALES:
+        if canal in pivot_skus.index:
+            for sabct in SABCT_ACTIVOS:
+                if pivot_skus.loc[canal, sabct] > 0:
+                    treemap_data.append({
+                        'Canal': canal,
+                        'SABCT': sabct,
+                        'SKUs': pivot_skus.loc[canal, sabct],
+                        'Label': f"{sabct}"
+                    })
+
+    return pivot_skus, pivot_participacion, pd.DataFrame(treemap_data)
+
+
+def _zona_por_canal(conteos, ventas_zona_canal):
+    # Pedidos promedio (aproximación por SKUs únicos): zonas y canales con filas, en orden alfabético
+    pivot_pedidos = conteos.tabla('zona_canal')
+    pivot_pedidos = pivot_pedidos.loc[pivot_pedidos.sum(axis=1) > 0, pivot_pedidos.sum(axis=0) > 0].sort_index().sort_index(axis=1)
+    pivot_pedidos = pivot_pedidos.rename_axis(index='ZONA', columns='CANAL')
+
+    # Venta total, leída del cubo para las mismas zonas y canales
+    pivot_ventas = ventas_zona_canal.reindex(index=pivot_pedidos.index, columns=pivot_pedidos.columns, fill_value=0)
+
+    # Agregar totales
+    pivot_pedidos['Total'] = pivot_pedidos.sum(axis=1)
+    pivot_ventas['Total'] = pivot_ventas.sum(axis=1)
+
+    # Ordenar por venta total
+    pivot_ventas = pivot_ventas.sort_values('Total', ascending=False)
+    pivot_pedidos = pivot_pedidos.loc[pivot_ventas.index]
+    return pivot_pedidos, pivot_ventas
+
+
+def normalizar_zona(nombre):
+    """'Azángaro' -> 'AZANGARO', como aparece en ZONA_CONSOLIDADO."""
+    return unicodedata.normalize('NFKD', nombre).encode('ascii', 'ignore').decode().upper()
+
+
+def seleccionar_zonas(metricas, zonas):
+    """Restringe metricas_zonas a una lista de zonas y recalcula la participación."""
+    seleccion = metricas[['SKUS', 'VENTA']].reindex(list(zonas), fill_value=0)
+    total = seleccion['VENTA'].sum()
+    seleccion['PCT'] = (seleccion['VENTA'] / total * 100) if total > 0 else 0.0
+    return seleccion
+
+
+def metricas_zonas(df, zonas=None, ventas_zona=None):
+    """SKUs únicos, venta y participación por zona en una sola pasada groupby.
+
+    Con ``zonas`` el resultado sigue ese orden (zonas sin datos quedan en 0)
+    y la participación se calcula sobre el total de esas zonas.
+    ``ventas_zona`` (p. ej. una serie del cubo) evita sumar TOTAL_2025 sobre las filas.
+    """
+    if ventas_zona is not None:
+        return _zonas_con_venta(_skus_unicos(df, 'ZONA_CONSOLIDADO'), ventas_zona, zonas)
+    metricas = df.groupby('ZONA_CONSOLIDADO', observed=True).agg(
+        SKUS=('ARTICULO', 'nunique'),
+        VENTA=('TOTAL_2025', 'sum'),
+    )
+    metricas.index = metricas.index.astype(str)
+    return seleccionar_zonas(metricas, metricas.index if zonas is None else zonas)
+
+
+def _zonas_con_venta(skus_zona, ventas_zona, zonas=None):
+    metricas = skus_zona.to_frame('SKUS')
+    metricas['VENTA'] = ventas_zona.reindex(metricas.index, fill_value=0).to_numpy()
+    return seleccionar_zonas(metricas, metricas.index if zonas is None else zonas)
+
+
+def indicadores(cubo, comparativa_total, meses, skus_canal, skus_zona):
+    """Indicadores del resumen que salen del cubo y de los SKUs únicos por canal y por zona.
+
+    Los comparten calcular_modelo y la lectura por bloques (bloques.py), que
+    cuenta los SKUs sin conservar las filas.
+    """
+    ventas_mensuales = cubo.serie('periodo', periodo=meses)
+    ventas_mensuales.index.name = None
+    total_2025 = ventas_mensuales.sum()
+
+    # Con un rango de meses que no cruza el cambio de almacén no hay antes/después
+    cambio = (comparativa_total.grupo('TOTAL', MES_CAMBIO) if MES_CAMBIO in meses[1:]
+              else dict.fromkeys(COLUMNAS_COMPARATIVA, float('nan')))
+
+    canal_analysis = _analisis_canal(skus_canal, cubo.serie('canal', periodo=meses), len(meses))
+
+    metricas_zona = _zonas_con_venta(skus_zona, cubo.serie('zona', periodo=meses))
+    metricas_mapa = seleccionar_zonas(metricas_zona, ZONAS_MAPA)
+    es_lima = metricas_zona.index.isin(ZONAS_LIMA)
+
+    return {
+        'total_2025': total_2025,
+        'promedio_mensual': total_2025 / len(meses),
+        'ventas_mensuales': ventas_mensuales,
+        'venta_antes': cambio['VENTA_ANTES'],
+        'venta_despues': cambio['VENTA_DESPUES'],
+        'promedio_antes': cambio['PROMEDIO_ANTES'],
+        'promedio_despues': cambio['PROMEDIO_DESPUES'],
+        'variacion': cambio['VARIACION'],
+        'canal_analysis': canal_analysis,
+        'participacion_minorista': canal_analysis.loc[canal_analysis['CANAL'] == 'MINORISTA', 'PARTICIPACION'].sum(),
+        'metricas_zona': metricas_zona,
+        'metricas_mapa': metricas_mapa,
+        # Total de las 4 zonas críticas del centro
+        'venta_centro': metricas_mapa['VENTA'].iloc[:4].sum(),
+        'pct_centro': metricas_mapa['PCT'].iloc[:4].sum(),
+        'part_lima': metricas_zona.loc[es_lima, 'PCT'].sum(),
+        'part_provincia': metricas_zona.loc[~es_lima, 'PCT'].sum(),
+    }
+
+
+def calcular_modelo(df, meses=None, huella='', ejecutor=None, trabajadores=None):
+    """Calcula todas las métricas del dashboard a partir del DataFrame limpio.
+
+    Sin ``meses`` se usan los meses de ANIO_ANALISIS presentes en ``df``.
+    ``ejecutor`` y ``trabajadores`` son los de paralelo.contar_skus.
+    """
+    meses = detectar_meses(df.columns, ANIO_ANALISIS) if meses is None else list(meses)
+
+    hechos = construir_hechos(df)
+    cubo = Cubo.desde_hechos(hechos)
+    comparativas = construir_comparativas(cubo, hechos, meses)
+    conteos = contar_skus(df, ejecutor, trabajadores)
+
+    pivot_skus, pivot_participacion, df_treemap = _sabct_por_canal(conteos)
+    pivot_pedidos, pivot_ventas = _zona_por_canal(conteos, cubo.tabla('zona', 'canal', periodo=meses))
+
+    return ModeloMetricas(
+        huella=huella,
+        meses=tuple(meses),
+        hechos=hechos,
+        cubo=cubo,
+        composicion=composicion_portafolio(df, cubo.serie('sabct', periodo=meses), conteos.serie('sabct')),
+        skus_con_venta=conteos.con_venta,
+        skus_totales=conteos.totales,
+        comparativas=comparativas,
+        pivot_skus=pivot_skus,
+        pivot_participacion=pivot_participacion,
+        df_treemap=df_treemap,
+        pivot_pedidos=pivot_pedidos,
+        pivot_ventas=pivot_ventas,
+        **indicadores(cubo, comparativas['total'], meses, conteos.serie('canal'), conteos.serie('zona')),
+    )
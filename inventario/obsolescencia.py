@@ -0,0 +1,107 @@
+"""
+Análisis de inventario obsoleto y prioridad de liquidación.
+
+Cada fila SKU × canal × zona se evalúa sobre su serie mensual: último mes con
+venta, racha de meses sin venta al final del período y pendiente de la
+tendencia (mínimos cuadrados, relativa a la venta promedio). Con eso se
+clasifica como Sin venta, Muerto, En declive o Activo y se ordena para
+liquidar dentro de cada zona y canal. Todas las métricas son operaciones
+sobre la matriz filas × meses, sin apply por fila.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .ingesta import detectar_meses
+
+# Meses seguidos sin venta al final del período para considerar muerta una fila
+MESES_MUERTO = 6
+
+# Pendiente mensual relativa a la venta promedio por debajo de la cual la fila está en declive
+UMBRAL_DECLIVE = -0.05
+
+# Estados de mayor a menor prioridad de liquidación
+ESTADOS = ('Sin venta', 'Muerto', 'En declive', 'Activo')
+
+DIMENSIONES = ['ARTICULO', 'SABCT', 'CANAL', 'ZONA_CONSOLIDADO']
+
+COLUMNAS_OBSOLESCENCIA = DIMENSIONES + ['VENTA', 'ULTIMO_MES_VENTA', 'MESES_SIN_VENTA', 'PENDIENTE',
+                                       'PENDIENTE_RELATIVA', 'ESTADO']
+
+
+def _pendientes(matriz):
+    """Pendiente de mínimos cuadrados de cada fila contra el índice del mes."""
+    t = np.arange(matriz.shape[1], dtype=np.float64)
+    t -= t.mean()
+    return matriz @ t / (t @ t)
+
+
+def analizar_obsolescencia(df, meses=None, meses_muerto=MESES_MUERTO, umbral_declive=UMBRAL_DECLIVE):
+    """Métricas de obsolescencia por fila SKU × canal × zona.
+
+    Sin ``meses`` se usan todas las columnas de mes de ``df``.
+    """
+    meses = detectar_meses(df.columns) if meses is None else list(meses)
+    matriz = df[meses].to_numpy(dtype=np.float64)
+    n_meses = len(meses)
+
+    con_venta = matriz > 0
+    vendio = con_venta.any(axis=1)
+    # Posición del último mes con venta: primera venta al recorrer los meses al revés
+    ultimo = np.where(vendio, n_meses - 1 - con_venta[:, ::-1].argmax(axis=1), -1)
+    meses_sin_venta = n_meses - 1 - ultimo
+
+    venta = matriz.sum(axis=1)
+    pendiente = _pendientes(matriz) if n_meses > 1 else np.zeros(len(matriz))
+    promedio = venta / n_meses
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pendiente_relativa = np.where(promedio > 0, pendiente / promedio, 0.0)
+
+    estado = np.select(
+        [~vendio, meses_sin_venta >= meses_muerto, pendiente_relativa <= umbral_declive],
+        [0, 1, 2],
+        default=3,
+    )
+
+    analisis = df[DIMENSIONES].copy()
+    analisis['VENTA'] = venta
+    # El último mes se guarda como categórica (código -1 = nunca vendió)
+    analisis['ULTIMO_MES_VENTA'] = pd.Categorical.from_codes(ultimo, categories=meses, ordered=True)
+    analisis['MESES_SIN_VENTA'] = meses_sin_venta
+    analisis['PENDIENTE'] = pendiente
+    analisis['PENDIENTE_RELATIVA'] = pendiente_relativa
+    analisis['ESTADO'] = pd.Categorical.from_codes(estado, categories=list(ESTADOS), ordered=True)
+    return analisis
+
+
+def ranking_liquidacion(analisis, por=('ZONA_CONSOLIDADO', 'CANAL'), incluir=ESTADOS[:3]):
+    """Filas a liquidar ordenadas por prioridad dentro de cada grupo ``por``.
+
+    La prioridad es el estado (Sin venta antes que Muerto y En declive), luego
+    la racha sin venta más larga y la caída más pronunciada. Agrega RANKING
+    (1 = liquidar primero) por grupo.
+    """
+    candidatos = analisis[analisis['ESTADO'].isin(incluir)]
+    grupos = [pd.factorize(candidatos[columna], sort=True)[0] for columna in por]
+    # lexsort ordena por la última clave primero: grupo, estado, racha (desc) y pendiente
+    orden = np.lexsort([candidatos['PENDIENTE_RELATIVA'].to_numpy(), -candidatos['MESES_SIN_VENTA'].to_numpy(),
+                        candidatos['ESTADO'].cat.codes.to_numpy()] + grupos[::-1])
+    ordenado = candidatos.iloc[orden]
+
+    # Posición dentro del grupo: posición global menos la del inicio de su grupo
+    posicion = np.arange(len(ordenado))
+    nuevo = np.zeros(len(ordenado), dtype=bool)
+    nuevo[:1] = True
+    for codigos in grupos:
+        codigos = codigos[orden]
+        nuevo[1:] |= codigos[1:] != codigos[:-1]
+    inicio = np.maximum.accumulate(np.where(nuevo, posicion, 0))
+    return ordenado.assign(RANKING=posicion - inicio + 1)
+
+
+def resumen_estados(analisis, por='ZONA_CONSOLIDADO'):
+    """Filas SKU × canal × zona por ``por`` × estado."""
+    tabla = analisis.groupby([por, 'ESTADO'], observed=True).size().unstack(fill_value=0)
+    # Todos los estados como columnas de texto: un índice categórico no sobrevive la serialización a Arrow
+    tabla.columns = tabla.columns.astype(str)
+    return tabla.reindex(columns=list(ESTADOS), fill_value=0)
@@ -0,0 +1,170 @@
+"""
+Conteos de SKUs únicos repartidos entre núcleos.
+
+Con las ventas leídas del cubo, lo que queda de calcular_modelo sobre las
+filas son los nunique de ARTICULO por canal, zona, SABCT, canal × SABCT y
+zona × canal. Aquí se resuelven sobre códigos enteros: cada partición
+contiene las filas de los SKUs con ``código % particiones == p``, así que un
+SKU cae en una sola partición y los conteos parciales se suman sin contar dos
+veces un SKU. Dentro de una partición se ordenan los pares (grupo, SKU) y se
+cuentan los distintos por grupo.
+
+El ejecutor es 'serie' (una partición en el proceso actual), 'hilos' (el
+ordenamiento de NumPy libera el GIL) o 'procesos'. Con procesos la matriz de
+códigos se copia una vez a un bloque de multiprocessing.shared_memory y cada
+tarea recibe solo su nombre; los pools se crean una vez y se reutilizan
+(simulacion los comparte). El ejecutor por defecto sale de
+INVENTARIO_EJECUTOR ('serie' si no está).
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from math import prod
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .configuracion import EJECUTOR, EJECUTORES
+from .cubo import COLUMNAS_DIMENSION, _codigos
+
+# Columnas de la matriz de códigos
+_COLUMNAS = ('sku', 'canal', 'zona', 'sabct', 'con_venta')
+
+# Conteo -> columnas que definen el grupo; 'total' cuenta todos los SKUs
+AGRUPACIONES = {
+    'total': (),
+    'con_venta': ('con_venta',),
+    'canal': ('canal',),
+    'zona': ('zona',),
+    'sabct': ('sabct',),
+    'canal_sabct': ('canal', 'sabct'),
+    'zona_canal': ('zona', 'canal'),
+}
+
+_POOLS = {}
+_CANDADO_POOLS = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ConteosSkus:
+    """SKUs únicos por agrupación; ``conteos[nombre]`` es denso sobre las etiquetas de sus dimensiones."""
+
+    etiquetas: dict
+    conteos: dict
+
+    @property
+    def totales(self):
+        return int(self.conteos['total'])
+
+    @property
+    def con_venta(self):
+        return int(self.conteos['con_venta'][1])
+
+    def serie(self, dimension):
+        """SKUs únicos por valor de ``dimension``, solo valores con filas, como un groupby(...).nunique()."""
+        conteos = self.conteos[dimension]
+        presentes = conteos > 0
+        indice = pd.Index(np.asarray(self.etiquetas[dimension], dtype=object)[presentes],
+                          name=COLUMNAS_DIMENSION[dimension])
+        return pd.Series(conteos[presentes], index=indice, name='ARTICULO')
+
+    def tabla(self, nombre):
+        """Tabla densa de una agrupación de dos dimensiones, con todas sus etiquetas."""
+        filas, columnas = AGRUPACIONES[nombre]
+        return pd.DataFrame(self.conteos[nombre], index=pd.Index(self.etiquetas[filas]),
+                            columns=pd.Index(self.etiquetas[columnas]))
+
+
+def _contar(codigos, particion, particiones, tamanos):
+    """Conteos de una partición de ``codigos`` (filas × _COLUMNAS)."""
+    if particiones > 1:
+        codigos = codigos[codigos[:, 0] % particiones == particion]
+    sku = codigos[:, 0].astype(np.int64)
+    n_skus = tamanos['sku']
+    resultado = {}
+    for nombre, dimensiones in AGRUPACIONES.items():
+        forma = tuple(tamanos[dim] for dim in dimensiones)
+        grupo = (np.ravel_multi_index([codigos[:, _COLUMNAS.index(dim)] for dim in dimensiones], forma)
+                 if dimensiones else np.zeros(len(sku), dtype=np.int64))
+        pares = grupo * n_skus + sku
+        pares.sort()
+        distintos = pares[np.concatenate(([True], pares[1:] != pares[:-1]))] if len(pares) else pares
+        resultado[nombre] = np.bincount(distintos // n_skus, minlength=prod(forma)).reshape(forma)
+    return resultado
+
+
+def _contar_compartido(nombre, forma, particion, particiones, tamanos):
+    """_contar en un proceso del pool, sobre la matriz publicada en memoria compartida."""
+    # Con 'spawn' los procesos del pool comparten el resource_tracker del
+    # padre, que es quien libera el bloque con unlink
+    bloque = shared_memory.SharedMemory(name=nombre)
+    try:
+        return _contar(np.ndarray(forma, dtype=np.int32, buffer=bloque.buf), particion, particiones, tamanos)
+    finally:
+        bloque.close()
+
+
+def pool_ejecutor(ejecutor, trabajadores):
+    """Pool de hilos o procesos para ``ejecutor``, creado la primera vez y reutilizado."""
+    with _CANDADO_POOLS:
+        clave = (ejecutor, trabajadores)
+        if clave not in _POOLS:
+            if ejecutor == 'hilos':
+                _POOLS[clave] = ThreadPoolExecutor(max_workers=trabajadores)
+            else:
+                # 'spawn' por la misma razón que en pronostico: el dashboard llama desde hilos
+                _POOLS[clave] = ProcessPoolExecutor(max_workers=trabajadores,
+                                                    mp_context=multiprocessing.get_context('spawn'))
+        return _POOLS[clave]
+
+
+def matriz_codigos(df):
+    """(matriz filas × _COLUMNAS en int32, etiquetas por dimensión) de ``df`` limpio."""
+    etiquetas = {}
+    columnas = []
+    for dimension in _COLUMNAS[:-1]:
+        codigos, etiquetas[dimension] = _codigos(df[COLUMNAS_DIMENSION[dimension]])
+        columnas.append(codigos)
+    columnas.append(df['TOTAL_2025'].to_numpy() > 0)
+    etiquetas['con_venta'] = [False, True]
+    return np.column_stack(columnas).astype(np.int32), etiquetas
+
+
+def contar_skus(df, ejecutor=None, trabajadores=None):
+    """ConteosSkus de ``df`` con el ejecutor elegido (None = INVENTARIO_EJECUTOR).
+
+    ``trabajadores`` es la cantidad de hilos o procesos (None = tantos como CPUs).
+    """
+    ejecutor = EJECUTOR if ejecutor is None else ejecutor
+    if ejecutor not in EJECUTORES:
+        raise ValueError(f"Ejecutor desconocido: {ejecutor!r} (opciones: {', '.join(EJECUTORES)})")
+    trabajadores = trabajadores or os.cpu_count() or 1
+
+    codigos, etiquetas = matriz_codigos(df)
+    tamanos = {dimension: max(len(valores), 1) for dimension, valores in etiquetas.items()}
+
+    if ejecutor == 'serie' or trabajadores == 1:
+        partes = [_contar(codigos, 0, 1, tamanos)]
+    elif ejecutor == 'hilos':
+        pool = pool_ejecutor(ejecutor, trabajadores)
+        partes = list(pool.map(_contar, [codigos] * trabajadores, range(trabajadores),
+                               [trabajadores] * trabajadores, [tamanos] * trabajadores))
+    else:
+        pool = pool_ejecutor(ejecutor, trabajadores)
+        bloque = shared_memory.SharedMemory(create=True, size=max(codigos.nbytes, 1))
+        try:
+            np.ndarray(codigos.shape, dtype=np.int32, buffer=bloque.buf)[:] = codigos
+            n = trabajadores
+            partes = list(pool.map(_contar_compartido, [bloque.name] * n, [codigos.shape] * n, range(n),
+                                   [n] * n, [tamanos] * n))
+        finally:
+            bloque.close()
+            bloque.unlink()
+
+    # Cada SKU está en una sola partición: los conteos parciales se suman
+    conteos = {nombre: sum(parte[nombre] for parte in partes) for nombre in AGRUPACIONES}
+    return ConteosSkus(etiquetas=etiquetas, conteos=conteos)
@@ -0,0 +1,163 @@
+"""
+Pronóstico de ventas por serie ARTICULO × CANAL × ZONA con statsmodels.
+
+Cada serie mensual se ajusta con suavizamiento exponencial (simple o Holt
+amortiguado) o ARIMA. Las series se reparten en lotes entre un pool de
+procesos, las series sin ventas se descartan antes de ajustar y el
+resultado (parámetros y proyección) se guarda en disco por huella del
+dataset, de modo que cada dataset se ajusta una sola vez.
+"""
+
+import multiprocessing
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from .cache import DIRECTORIO_CACHE, escribir_atomico
+from .configuracion import HORIZONTE, METODOS
+from .ingesta import detectar_meses, meses_siguientes
+
+CLAVES_SERIE = ['ARTICULO', 'CANAL', 'ZONA_CONSOLIDADO']
+
+TAMANO_LOTE = 500
+
+# Probabilidad del intervalo de la proyección agregada
+NIVEL_INTERVALO = 0.8
+
+
+def _ajustar_modelo(y, metodo):
+    from statsmodels.tsa.arima.model import ARIMA
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing, SimpleExpSmoothing
+
+    if metodo == 'ses':
+        return SimpleExpSmoothing(y, initialization_method='estimated').fit()
+    if metodo == 'holt':
+        return ExponentialSmoothing(y, trend='add', damped_trend=True, initialization_method='estimated').fit()
+    return ARIMA(y, order=(1, 0, 0)).fit()
+
+
+def _ajustar_serie(y, metodo, horizonte):
+    resultado = _ajustar_modelo(y, metodo)
+
+    if metodo == 'arima':
+        parametros = dict(zip(resultado.model.param_names, np.asarray(resultado.params)))
+    else:
+        parametros = {k: float(v) for k, v in resultado.params.items() if v is not None and np.ndim(v) == 0}
+    return parametros, np.asarray(resultado.forecast(horizonte))
+
+
+def _ajustar_lote(matriz, metodo, horizonte):
+    """Ajusta un lote de series (filas de ``matriz``); se ejecuta en un proceso del pool."""
+    # statsmodels registra sus propios filtros de avisos al importarse:
+    # se importa antes de silenciarlos
+    import statsmodels.tsa.api  # noqa: F401
+
+    parametros = []
+    pronosticos = np.zeros((len(matriz), horizonte))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for i, y in enumerate(matriz):
+            try:
+                p, pronosticos[i] = _ajustar_serie(y, metodo, horizonte)
+            except (ValueError, np.linalg.LinAlgError):
+                # Serie degenerada para el modelo: se proyecta el promedio del último trimestre
+                p, pronosticos[i] = {}, y[-3:].mean()
+            parametros.append(p)
+    return parametros, np.maximum(pronosticos, 0)
+
+
+def pronosticar_series(df, metodo='ses', horizonte=HORIZONTE, procesos=None, tamano_lote=TAMANO_LOTE):
+    """Ajusta todas las series con ventas y devuelve claves, parámetros y proyección.
+
+    El resultado tiene una fila por serie con ventas: CLAVES_SERIE, una
+    columna ``param_<nombre>`` por parámetro ajustado y una columna por mes
+    proyectado. ``procesos=1`` ajusta en el proceso actual.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo!r} (opciones: {', '.join(METODOS)})")
+
+    periodos = detectar_meses(df.columns)
+    series = df.groupby(CLAVES_SERIE, observed=True, sort=False)[periodos].sum()
+    matriz = series.to_numpy(dtype=np.float64)
+
+    # Las series sin ninguna venta se proyectan en 0 sin ajustar modelo
+    con_ventas = matriz.any(axis=1)
+    series = series[con_ventas]
+    matriz = matriz[con_ventas]
+
+    lotes = [matriz[i:i + tamano_lote] for i in range(0, len(matriz), tamano_lote)]
+    if procesos == 1 or len(lotes) <= 1:
+        resultados = [_ajustar_lote(lote, metodo, horizonte) for lote in lotes]
+    else:
+        # 'spawn': el dashboard lanza el ajuste desde un hilo y fork desde un
+        # proceso con hilos puede dejar al hijo bloqueado en un lock heredado
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn')) as pool:
+            resultados = list(pool.map(_ajustar_lote, lotes, repeat(metodo), repeat(horizonte)))
+
+    parametros = [p for lote, _ in resultados for p in lote]
+    pronosticos = np.vstack([f for _, f in resultados]) if resultados else np.zeros((0, horizonte))
+
+    salida = series.index.to_frame(index=False).astype(str)
+    salida = pd.concat([salida, pd.DataFrame(parametros).add_prefix('param_')], axis=1)
+    for i, mes in enumerate(meses_siguientes(periodos[-1], horizonte)):
+        salida[mes] = pronosticos[:, i].astype(np.float32)
+    return salida
+
+
+def meses_pronostico(pronostico):
+    """Columnas de meses proyectados de un resultado de pronosticar_series."""
+    return detectar_meses(pronostico.columns)
+
+
+def ruta_pronostico(huella, metodo='ses', horizonte=HORIZONTE, directorio=DIRECTORIO_CACHE):
+    return Path(directorio) / f"pronostico-{huella[:16]}-{metodo}-{horizonte}.feather"
+
+
+def cargar_o_pronosticar(df, huella, metodo='ses', horizonte=HORIZONTE, directorio=DIRECTORIO_CACHE, procesos=None):
+    """Devuelve el pronóstico guardado para esta huella o lo calcula y lo guarda."""
+    from pyarrow import feather
+
+    destino = ruta_pronostico(huella, metodo, horizonte, directorio)
+    if destino.exists():
+        return feather.read_feather(destino)
+
+    pronostico = pronosticar_series(df, metodo, horizonte, procesos)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    escribir_atomico(destino, lambda tmp: feather.write_feather(pronostico, tmp))
+    return pronostico
+
+
+def pronosticar_total(serie, metodo='ses', horizonte=HORIZONTE):
+    """Proyección rápida de una sola serie agregada (p. ej. el total mensual)."""
+    _, pronostico = _ajustar_lote(np.asarray(serie, dtype=np.float64)[None, :], metodo, horizonte)
+    return pd.Series(pronostico[0], index=meses_siguientes(serie.index[-1], horizonte))
+
+
+def intervalo_total(serie, proyeccion, metodo='ses', nivel=NIVEL_INTERVALO):
+    """Límites INFERIOR y SUPERIOR de cada mes de ``proyeccion`` con probabilidad ``nivel``.
+
+    El desvío es el de los residuos a un paso del modelo ajustado a ``serie``
+    y crece con la raíz del horizonte, como en un paseo aleatorio. Es una
+    aproximación que no depende del método, así que vale tanto para la
+    proyección agregada como para la suma de las series.
+    """
+    # Como en _ajustar_lote: statsmodels se importa antes de silenciar sus avisos
+    import statsmodels.tsa.api  # noqa: F401
+
+    y = np.asarray(serie, dtype=np.float64)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            residuos = np.asarray(_ajustar_modelo(y, metodo).resid)
+        except (ValueError, np.linalg.LinAlgError):
+            residuos = np.diff(y)
+    desvio = np.std(residuos, ddof=1) if len(residuos) > 1 else 0.0
+    amplitud = NormalDist().inv_cdf(0.5 + nivel / 2) * desvio * np.sqrt(np.arange(1, len(proyeccion) + 1))
+    valores = np.asarray(proyeccion, dtype=np.float64)
+    return pd.DataFrame({'INFERIOR': np.maximum(valores - amplitud, 0), 'SUPERIOR': valores + amplitud},
+                        index=proyeccion.index)
@@ -0,0 +1,159 @@
+"""
+Simulación de ciclos de despacho desde cada centro de distribución.
+
+Un día simulado tiene una jornada de despacho y una flota de camiones. Los
+viajes pedidos a cada zona llegan como Poisson, con media derivada de la
+venta mensual de la zona. Cada viaje ocupa al primer camión libre durante
+carga, ida, descarga y vuelta, y el tiempo de ruta varía de forma lognormal
+alrededor del tiempo de la matriz de entrega. Los eventos de todos los días
+simulados avanzan juntos en arreglos NumPy (un paso por viaje, no por día).
+Para corridas grandes los días se reparten en lotes entre los pools de
+paralelo, según INVENTARIO_EJECUTOR como los conteos de SKUs. Cada lote tiene
+su propia semilla, así que el resultado no depende del ejecutor.
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .configuracion import EJECUTOR, EJECUTORES
+from .paralelo import pool_ejecutor
+
+DIAS_HABILES_MES = 22
+
+TAMANO_LOTE_DIAS = 2000
+
+
+@dataclass(frozen=True)
+class ParametrosFlota:
+    camiones: int = 4
+    jornada_min: float = 600.0
+    carga_min: float = 20.0
+    descarga_min: float = 15.0
+    # Desviación del logaritmo del tiempo de ruta (tráfico)
+    variabilidad: float = 0.25
+    # Venta promedio que se entrega en un viaje
+    venta_por_viaje: float = 2000.0
+
+
+@dataclass(frozen=True)
+class ResultadoSimulacion:
+    """Resultados por día simulado y por zona."""
+
+    zonas: list
+    solicitados: np.ndarray  # días × zonas
+    atendidos: np.ndarray  # días × zonas
+    ciclos_por_camion: np.ndarray  # días
+
+    def resumen(self):
+        solicitados = self.solicitados.sum(axis=1)
+        atendidos = self.atendidos.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            servicio = np.where(solicitados > 0, atendidos / solicitados, 1.0)
+        return {
+            'dias': len(solicitados),
+            'viajes_solicitados': float(solicitados.mean()),
+            'viajes_atendidos': float(atendidos.mean()),
+            'ciclos_por_camion': float(self.ciclos_por_camion.mean()),
+            'ciclos_p10': float(np.percentile(self.ciclos_por_camion, 10)),
+            'ciclos_p90': float(np.percentile(self.ciclos_por_camion, 90)),
+            'nivel_servicio': float(atendidos.sum() / max(solicitados.sum(), 1)),
+            'dias_completos': float((servicio >= 1).mean()),
+        }
+
+    def servicio_por_zona(self):
+        solicitados = self.solicitados.sum(axis=0)
+        atendidos = self.atendidos.sum(axis=0)
+        return pd.Series(np.where(solicitados > 0, atendidos / np.maximum(solicitados, 1), 1.0),
+                         index=pd.Index(self.zonas, name='zona'), name='NIVEL_SERVICIO')
+
+
+def viajes_diarios(venta_mensual, parametros=ParametrosFlota()):
+    """Viajes promedio por día hábil a cada zona a partir de su venta mensual."""
+    return np.asarray(venta_mensual, dtype=np.float64) / DIAS_HABILES_MES / parametros.venta_por_viaje
+
+
+def _simular_lote(minutos_ida, viajes, parametros, dias, semilla):
+    rng = np.random.default_rng(semilla)
+    n_zonas = len(minutos_ida)
+
+    # Pedidos del día en orden aleatorio; los días con menos viajes se rellenan con -1
+    solicitados = rng.poisson(viajes, size=(dias, n_zonas))
+    maximo = int(solicitados.sum(axis=1).max(initial=0))
+    conteos = solicitados.ravel()
+    dia = np.repeat(np.repeat(np.arange(dias), n_zonas), conteos)
+    zona = np.repeat(np.tile(np.arange(n_zonas), dias), conteos)
+    orden = np.lexsort((rng.random(len(zona)), dia))
+    dia, zona = dia[orden], zona[orden]
+    pedidos = np.full((dias, maximo), -1)
+    pedidos[dia, np.arange(len(dia)) - np.searchsorted(dia, dia)] = zona
+
+    libre = np.zeros((dias, parametros.camiones))
+    atendidos = np.zeros((dias, n_zonas), dtype=np.int64)
+    ciclos = np.zeros(dias)
+    filas = np.arange(dias)
+    for j in range(maximo):
+        zona = pedidos[:, j]
+        activo = zona >= 0
+        zona = np.where(activo, zona, 0)
+
+        # El pedido lo toma el primer camión libre de cada día
+        camion = libre.argmin(axis=1)
+        salida = libre[filas, camion] + parametros.carga_min
+        ida = minutos_ida[zona] * rng.lognormal(0, parametros.variabilidad, dias)
+        vuelta = minutos_ida[zona] * rng.lognormal(0, parametros.variabilidad, dias)
+        regreso = salida + ida + parametros.descarga_min + vuelta
+
+        # Se atiende si el camión vuelve dentro de la jornada
+        atiende = activo & (regreso <= parametros.jornada_min)
+        libre[filas[atiende], camion[atiende]] = regreso[atiende]
+        np.add.at(atendidos, (filas[atiende], zona[atiende]), 1)
+        ciclos += atiende
+
+    return solicitados, atendidos, ciclos / parametros.camiones
+
+
+def simular_despacho(minutos_ida, venta_mensual, parametros=ParametrosFlota(), dias=2000, semilla=0,
+                     ejecutor=None, trabajadores=None, zonas=None):
+    """Simula ``dias`` días de despacho a zonas con ``minutos_ida`` y ``venta_mensual``.
+
+    Los días se simulan en lotes de TAMANO_LOTE_DIAS. Con ``ejecutor`` 'hilos'
+    o 'procesos' (None = INVENTARIO_EJECUTOR) los lotes se reparten entre
+    ``trabajadores`` (None = tantos como CPUs).
+    """
+    ejecutor = EJECUTOR if ejecutor is None else ejecutor
+    if ejecutor not in EJECUTORES:
+        raise ValueError(f"Ejecutor desconocido: {ejecutor!r} (opciones: {', '.join(EJECUTORES)})")
+    trabajadores = trabajadores or os.cpu_count() or 1
+    minutos_ida = np.asarray(minutos_ida, dtype=np.float64)
+    viajes = viajes_diarios(venta_mensual, parametros)
+    lotes = [min(TAMANO_LOTE_DIAS, dias - inicio) for inicio in range(0, dias, TAMANO_LOTE_DIAS)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(lotes))
+
+    if ejecutor == 'serie' or trabajadores == 1 or len(lotes) == 1:
+        resultados = [_simular_lote(minutos_ida, viajes, parametros, n, s) for n, s in zip(lotes, semillas)]
+    else:
+        pool = pool_ejecutor(ejecutor, trabajadores)
+        resultados = list(pool.map(_simular_lote, [minutos_ida] * len(lotes), [viajes] * len(lotes),
+                                   [parametros] * len(lotes), lotes, semillas))
+
+    solicitados, atendidos, ciclos = (np.concatenate(partes) for partes in zip(*resultados))
+    zonas = list(zonas) if zonas is not None else list(range(len(minutos_ida)))
+    return ResultadoSimulacion(zonas, solicitados, atendidos, ciclos)
+
+
+def ciclos_maximos(minutos_ida, parametros=ParametrosFlota(), dias=2000, semilla=0):
+    """Ciclos por camión y día con demanda ilimitada hacia zonas elegidas al azar entre ``minutos_ida``."""
+    rng = np.random.default_rng(semilla)
+    minutos_ida = np.asarray(minutos_ida, dtype=np.float64)
+    fijo = parametros.carga_min + parametros.descarga_min
+    # Cota de ciclos por jornada: cada ciclo dura al menos la carga y descarga
+    tope = int(parametros.jornada_min // max(fijo, 1.0)) + 1
+
+    zona = rng.integers(len(minutos_ida), size=(dias, parametros.camiones, tope))
+    ruta = minutos_ida[zona] * (rng.lognormal(0, parametros.variabilidad, zona.shape)
+                                + rng.lognormal(0, parametros.variabilidad, zona.shape))
+    fin = np.cumsum(fijo + ruta, axis=2)
+    return (fin <= parametros.jornada_min).sum(axis=2).ravel()
@@ -0,0 +1,115 @@
+"""
+Evaluación de ubicaciones candidatas para el almacén.
+
+Cada sitio se puntúa con el tiempo de entrega ponderado por la venta de las
+zonas que atiende. La grilla de candidatos se evalúa con una sola matriz
+candidatos × zonas, y para k sitios (cross-docking o puntos intermedios) se
+resuelve un k-medianas: KMeans ponderado de scikit-learn como punto de
+partida y refinamiento de Weiszfeld sobre la distancia haversine.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .geografia import ZONAS
+from .logistica import calibrar_modelo, haversine_km, matriz_entrega
+
+
+def destinos_con_venta(ventas_zona, zonas=None):
+    """Coordenadas (DataFrame lat/lon) y venta de las zonas con ubicación y venta > 0.
+
+    ``ventas_zona`` es una Serie indexada por ZONA_CONSOLIDADO (p. ej. la
+    columna VENTA de modelo.metricas_zona); ``zonas`` restringe a un subconjunto.
+    """
+    nombres = [z for z in (zonas if zonas is not None else ventas_zona.index)
+               if z in ZONAS and ventas_zona.get(z, 0) > 0]
+    destinos = pd.DataFrame({'lat': [ZONAS[z]['lat'] for z in nombres],
+                             'lon': [ZONAS[z]['lon'] for z in nombres]}, index=pd.Index(nombres, name='zona'))
+    return destinos, ventas_zona.reindex(nombres).astype(np.float64)
+
+
+def grilla_candidatos(puntos, resolucion=60, margen=0.05):
+    """``resolucion`` × ``resolucion`` candidatos sobre el rectángulo que cubre ``puntos`` (lat/lon)."""
+    lat = np.linspace(puntos['lat'].min() - margen, puntos['lat'].max() + margen, resolucion)
+    lon = np.linspace(puntos['lon'].min() - margen, puntos['lon'].max() + margen, resolucion)
+    malla_lat, malla_lon = np.meshgrid(lat, lon, indexing='ij')
+    return pd.DataFrame({'lat': malla_lat.ravel(), 'lon': malla_lon.ravel()},
+                        index=pd.Index([f"G{i:05d}" for i in range(resolucion * resolucion)], name='sitio'))
+
+
+def puntuar_sitios(candidatos, destinos, ventas, modelo=None):
+    """Tiempo y distancia ponderados por venta de cada candidato atendiendo a todos los destinos.
+
+    Devuelve los candidatos ordenados del mejor al peor puntaje.
+    """
+    matriz = matriz_entrega(candidatos, destinos, modelo)
+    pesos = np.asarray(ventas, dtype=np.float64)
+    pesos = pesos / pesos.sum()
+
+    puntaje = pd.DataFrame({
+        'lat': np.asarray(candidatos['lat'], dtype=np.float64),
+        'lon': np.asarray(candidatos['lon'], dtype=np.float64),
+        'MINUTOS_PONDERADOS': matriz.minutos @ pesos,
+        'KM_PONDERADOS': matriz.km @ pesos,
+        'MINUTOS_MAX': matriz.minutos.max(axis=1),
+    }, index=pd.Index(matriz.origenes, name='sitio'))
+    return puntaje.sort_values('MINUTOS_PONDERADOS', kind='stable')
+
+
+def _weiszfeld(lat, lon, pesos, inicio, iteraciones=50, tolerancia=1e-7):
+    """Mediana geométrica ponderada (minimiza la suma de distancias haversine ponderadas)."""
+    actual = np.asarray(inicio, dtype=np.float64)
+    for _ in range(iteraciones):
+        distancia = np.maximum(haversine_km(actual[0], actual[1], lat, lon), 1e-9)
+        w = pesos / distancia
+        siguiente = np.array([w @ lat, w @ lon]) / w.sum()
+        if np.abs(siguiente - actual).max() < tolerancia:
+            return siguiente
+        actual = siguiente
+    return actual
+
+
+def ubicar_sitios(destinos, ventas, k=1, modelo=None, semilla=0):
+    """k sitios que minimizan el tiempo ponderado cuando cada zona se atiende desde el más rápido.
+
+    Devuelve (sitios, asignacion): los sitios con su puntaje sobre las zonas
+    que atienden y la Serie zona -> sitio asignado.
+    """
+    from sklearn.cluster import KMeans
+
+    lat = destinos['lat'].to_numpy(np.float64)
+    lon = destinos['lon'].to_numpy(np.float64)
+    pesos = np.asarray(ventas, dtype=np.float64)
+    k = min(k, len(destinos))
+
+    # KMeans en coordenadas planas aproximadas (lon escalada por cos(lat)) como semilla
+    escala = np.cos(np.radians(lat.mean()))
+    plano = np.column_stack([lat, lon * escala])
+    kmeans = KMeans(n_clusters=k, n_init=10, random_state=semilla).fit(plano, sample_weight=pesos)
+    etiquetas = kmeans.labels_
+    centros = np.column_stack([kmeans.cluster_centers_[:, 0], kmeans.cluster_centers_[:, 1] / escala])
+
+    # Alternar asignación por tiempo y mediana de Weiszfeld de cada grupo
+    modelo = modelo or calibrar_modelo()
+    for _ in range(10):
+        centros = np.array([
+            _weiszfeld(lat[etiquetas == j], lon[etiquetas == j], pesos[etiquetas == j], centros[j])
+            if (etiquetas == j).any() else centros[j]
+            for j in range(k)
+        ])
+        nombres = [f"Sitio {j + 1}" for j in range(k)]
+        sitios = pd.DataFrame({'lat': centros[:, 0], 'lon': centros[:, 1]}, index=pd.Index(nombres, name='sitio'))
+        minutos = matriz_entrega(sitios, destinos, modelo).minutos
+        nuevas = minutos.argmin(axis=0)
+        if np.array_equal(nuevas, etiquetas):
+            break
+        etiquetas = nuevas
+
+    asignacion = pd.Series(np.asarray(nombres)[etiquetas], index=destinos.index, name='sitio')
+    minutos_zona = minutos[etiquetas, np.arange(len(destinos))]
+    sitios['MINUTOS_PONDERADOS'] = [
+        np.average(minutos_zona[etiquetas == j], weights=pesos[etiquetas == j]) if (etiquetas == j).any() else np.nan
+        for j in range(k)
+    ]
+    sitios['VENTA_ATENDIDA'] = np.bincount(etiquetas, weights=pesos, minlength=k)
+    return sitios, asignacion
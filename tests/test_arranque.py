@@ -0,0 +1,50 @@
+"""
+Arranque del motor sin Streamlit: el paquete y la ayuda de la CLI no cargan módulos pesados.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from inventario.filtros import Filtro
+from inventario.ingesta import RUTA_CSV
+from inventario.metricas import calcular_metricas
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+PESADOS = ('pandas', 'numpy', 'plotly', 'streamlit')
+
+_SONDA = """
+import json, sys
+{codigo}
+print(json.dumps(sorted(m for m in {pesados!r} if m in sys.modules)))
+"""
+
+
+def cargados(codigo):
+    """Módulos de PESADOS que quedan cargados tras ejecutar ``codigo`` en un intérprete nuevo."""
+    salida = subprocess.run([sys.executable, '-c', _SONDA.format(codigo=codigo, pesados=PESADOS)],
+                            cwd=RAIZ, capture_output=True, text=True, check=True).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize('codigo', [
+    'import inventario',
+    "from inventario.__main__ import main\ntry:\n    main(['--help'])\nexcept SystemExit:\n    pass",
+], ids=['import', 'ayuda'])
+def test_no_carga_modulos_pesados(codigo):
+    assert cargados(codigo) == []
+
+
+def test_metricas_sin_plotly_ni_streamlit():
+    assert not {'plotly', 'streamlit'} & set(cargados('from inventario.metricas import calcular_metricas'))
+
+
+def test_cli_metricas(tmp_path):
+    salida = subprocess.run([sys.executable, '-m', 'inventario', 'metricas', '--directorio', str(tmp_path)],
+                            cwd=RAIZ, capture_output=True, text=True, check=True).stdout
+    esperado = calcular_metricas(RUTA_CSV, Filtro(), tmp_path)
+    assert json.loads(salida) == [json.loads(json.dumps(esperado))]
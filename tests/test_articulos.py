@@ -0,0 +1,54 @@
+"""
+Índice por artículo: mismas filas y prefijos que la búsqueda directa sobre el DataFrame.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventario.articulos import IndiceArticulos
+from inventario.ingesta import RUTA_CSV, preparar_datos
+
+
+@pytest.fixture(scope='module')
+def df():
+    return preparar_datos(RUTA_CSV)
+
+
+@pytest.fixture(scope='module')
+def articulos(df):
+    return df['ARTICULO'].astype(str)
+
+
+@pytest.fixture(scope='module', params=[True, False], ids=['copia', 'sin_copia'])
+def indice(request, df):
+    return IndiceArticulos(df, copia=request.param)
+
+
+def test_indice_tiene_todos_los_codigos(indice, articulos):
+    assert indice.codigos.tolist() == sorted(articulos.unique(), key=str.upper)
+
+
+def test_filas_iguales_a_la_mascara(indice, df, articulos):
+    for codigo in np.random.default_rng(0).choice(indice.codigos, size=200):
+        esperado = df[articulos == codigo]
+        obtenido = indice.filas(codigo)
+        pd.testing.assert_frame_equal(obtenido.sort_values(['TOTAL_2025', 'CANAL', 'ZONA_CONSOLIDADO']).reset_index(drop=True),
+                                      esperado.sort_values(['TOTAL_2025', 'CANAL', 'ZONA_CONSOLIDADO']).reset_index(drop=True),
+                                      obj=str(codigo))
+
+
+@pytest.mark.parametrize('prefijo', ['', 'ip', 'HA', ' sg ', 'ZZZ-NO-EXISTE'])
+def test_buscar_prefijo_igual_a_startswith(indice, articulos, prefijo):
+    referencia = sorted(articulos[articulos.str.upper().str.startswith(prefijo.strip().upper())].unique(),
+                        key=str.upper)
+    codigos, total = indice.buscar(prefijo, limite=len(referencia) + 1)
+    assert codigos == referencia
+    assert total == len(referencia)
+    assert indice.buscar(prefijo, limite=3)[0] == referencia[:3]
+
+
+def test_codigo_inexistente(indice):
+    assert 'NO-EXISTE' not in indice
+    with pytest.raises(KeyError):
+        indice.filas('NO-EXISTE')
@@ -0,0 +1,78 @@
+"""
+Paridad de la lectura por bloques con el modelo calculado sobre el archivo completo.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from inventario.__main__ import main
+from inventario.bloques import resumir_por_bloques
+from inventario.filtros import Filtro, ModelosFiltrados
+from inventario.ingesta import ANIO_ANALISIS, RUTA_CSV, detectar_meses, leer_csv_por_bloques, preparar_datos
+from inventario.metricas import calcular_metricas, metricas_principales
+
+# Filas del CSV de muestra que se copian: con bloques de una fila el recorrido es lento
+FILAS_MUESTRA = 400
+
+FILTROS = [
+    Filtro(),
+    Filtro(canal=('OPERADORES', 'INTEGRADOR'), desde='Mar-25'),
+    Filtro(sabct=('A',), hasta='Set-25'),
+    Filtro(zona=('LIMA', 'WILSON'), sabct=('A', 'Obsoleto'), desde='Ene-25', hasta='Jun-25'),
+]
+
+
+@pytest.fixture(scope='module')
+def ruta_csv(tmp_path_factory):
+    with open(RUTA_CSV, encoding='utf-8-sig') as f:
+        lineas = f.read().splitlines()[:FILAS_MUESTRA + 1]
+    ruta = tmp_path_factory.mktemp('bloques') / 'ventas.csv'
+    ruta.write_text('\n'.join(lineas) + '\n', encoding='utf-8-sig')
+    return ruta
+
+
+@pytest.fixture(scope='module')
+def filtrados(ruta_csv):
+    df = preparar_datos(ruta_csv)
+    return ModelosFiltrados(df, detectar_meses(df.columns, ANIO_ANALISIS))
+
+
+def _bloque_que_corta_un_sku(ruta):
+    """Tamaño de bloque (mayor que 1) cuyo primer corte cae entre dos filas del mismo SKU."""
+    articulos = preparar_datos(ruta)['ARTICULO'].astype(str).to_numpy()
+    repetidos = np.flatnonzero(articulos[1:] == articulos[:-1])
+    return int(repetidos[repetidos > 0][0]) + 1
+
+
+def _tamanos(ruta):
+    return [1, _bloque_que_corta_un_sku(ruta), 37, FILAS_MUESTRA * 10]
+
+
+def test_el_bloque_elegido_corta_un_sku(ruta_csv):
+    n = _bloque_que_corta_un_sku(ruta_csv)
+    primero, segundo = (bloque for bloque, _ in zip(leer_csv_por_bloques(ruta_csv, n), range(2)))
+    assert primero['ARTICULO'].iloc[-1] == segundo['ARTICULO'].iloc[0]
+
+
+@pytest.mark.parametrize('filtro', FILTROS, ids=str)
+def test_resumen_por_bloques_igual_al_modelo_completo(ruta_csv, filtrados, filtro):
+    modelo = filtrados.modelo(filtro)
+    # La huella del archivo completo depende de la caché; se compara el resto
+    esperado = dict(metricas_principales(modelo), huella=None)
+    for n in _tamanos(ruta_csv):
+        resumen = resumir_por_bloques(ruta_csv, filtro, n)
+        assert dict(metricas_principales(resumen), huella=None) == esperado, n
+        np.testing.assert_array_equal(resumen.cubo.valores, modelo.cubo.valores)
+        for nombre in ('canal_analysis', 'metricas_zona', 'ventas_mensuales'):
+            assert getattr(resumen, nombre).equals(getattr(modelo, nombre)), (nombre, n)
+
+
+@pytest.mark.parametrize('bloques', [1, 5, FILAS_MUESTRA * 10])
+def test_cli_metricas_por_bloques(ruta_csv, tmp_path, capsys, bloques):
+    main(['metricas', '--csv', str(ruta_csv), '--directorio', str(tmp_path), '--canal', 'OPERADORES',
+          '--bloques', str(bloques)])
+    obtenido = json.loads(capsys.readouterr().out)
+    esperado = calcular_metricas(ruta_csv, Filtro(canal=('OPERADORES',)), tmp_path)
+    assert [dict(m, huella=None) for m in obtenido] == [json.loads(json.dumps(dict(esperado, huella=None)))]
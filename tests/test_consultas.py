@@ -0,0 +1,83 @@
+"""
+Paridad de los motores de consultas con pandas y con el modelo del dashboard.
+
+Polars y DuckDB son opcionales: sin la dependencia, sus casos se omiten.
+"""
+
+import pandas as pd
+import pytest
+
+from inventario.configuracion import MOTORES_CONSULTA
+from inventario.consultas import Consulta, abrir_motor, resumen_consultas
+from inventario.filtros import Filtro
+from inventario.ingesta import RUTA_CSV
+from inventario.metricas import calcular_metricas, metricas_principales
+
+FILTROS = [
+    Filtro(),
+    Filtro(canal=('MINORISTA',), desde='Feb-25'),
+    Filtro(zona=('LIMA', 'WILSON'), desde='Mar-25'),
+    Filtro(sabct=('A', 'Obsoleto'), canal=('RETAIL', 'INTEGRADOR'), desde='Ene-25', hasta='Jun-25'),
+]
+
+CONSULTAS = {
+    'totales': Consulta(medidas=('venta', 'skus', 'skus_con_venta', 'filas')),
+    'canal × zona': Consulta(por=('canal', 'zona'), medidas=('venta', 'skus', 'skus_con_venta', 'filas')),
+    'cubo': Consulta(por=('canal', 'zona', 'sabct'), medidas=('meses',)),
+    'sabct filtrado': Consulta(por=('sabct',), medidas=('venta', 'skus'),
+                               filtro=Filtro(canal=('MINORISTA', 'RETAIL'), desde='Mar-25', hasta='Set-25')),
+    'por sku': Consulta(por=('sku',), medidas=('venta', 'filas')),
+    'sin filas': Consulta(medidas=('venta', 'skus', 'filas'), filtro=Filtro(zona=('NO EXISTE',))),
+}
+
+
+@pytest.fixture(scope='module')
+def directorio(tmp_path_factory):
+    return tmp_path_factory.mktemp('cache')
+
+
+@pytest.fixture(scope='module')
+def referencia(directorio):
+    return abrir_motor('pandas', RUTA_CSV, directorio)
+
+
+@pytest.fixture(scope='module', params=MOTORES_CONSULTA)
+def motor(request, directorio):
+    # Cada motor se llama como su dependencia
+    pytest.importorskip(request.param)
+    return abrir_motor(request.param, RUTA_CSV, directorio)
+
+
+@pytest.mark.parametrize('nombre', CONSULTAS)
+def test_consulta_igual_a_pandas(motor, referencia, nombre):
+    # Las ventas son enteras: el orden de la suma no cambia el resultado, así que se exige igualdad exacta
+    pd.testing.assert_frame_equal(motor.consultar(CONSULTAS[nombre]), referencia.consultar(CONSULTAS[nombre]),
+                                  check_exact=True)
+
+
+@pytest.mark.parametrize('filtro', FILTROS, ids=str)
+def test_resumen_igual_al_modelo(motor, directorio, filtro):
+    esperado = calcular_metricas(RUTA_CSV, filtro, directorio)
+    esperado = {k: v for k, v in esperado.items() if k not in ('origen', 'filtro')}
+    assert metricas_principales(resumen_consultas(motor, filtro)) == esperado
+
+
+def test_resumen_sin_filas(motor):
+    with pytest.raises(ValueError):
+        resumen_consultas(motor, Filtro(zona=('NO EXISTE',)))
+
+
+def test_pandas_reutiliza_el_frame_cargado(referencia, directorio):
+    motor = abrir_motor('pandas', RUTA_CSV, directorio, df=referencia.df)
+    assert motor.df is referencia.df
+    assert motor.huella == referencia.huella
+
+
+def test_motor_desconocido():
+    with pytest.raises(ValueError):
+        abrir_motor('spark')
+
+
+def test_consulta_con_dimension_desconocida():
+    with pytest.raises(ValueError):
+        Consulta(por=('bodega',))
@@ -0,0 +1,83 @@
+"""
+Filtros cruzados con bitmaps: misma selección que isin por columna y modelos memoizados.
+"""
+
+import numpy as np
+import pytest
+
+from inventario.cubo import COLUMNAS_DIMENSION
+from inventario.filtros import DIMENSIONES_FILTRO, Filtro, IndiceFiltros, ModelosFiltrados
+from inventario.ingesta import ANIO_ANALISIS, RUTA_CSV, detectar_meses, preparar_datos
+from inventario.metricas import metricas_principales
+from inventario.modelo import calcular_modelo
+
+COMBINACIONES = [
+    Filtro(),
+    Filtro(canal=('MINORISTA',)),
+    Filtro(canal=('MINORISTA',), zona=('PROVINCIA SUR',), sabct=('S',)),
+    Filtro(canal=('INTEGRADOR', 'OPERADORES'), sabct=('S', 'A', 'B')),
+    Filtro(zona=('WILSON', 'PARURO', 'MALVINAS', 'AZANGARO')),
+    Filtro(zona=('NO EXISTE',)),
+]
+
+
+def mascara_isin(df, filtro):
+    """Referencia: una pasada isin por cada columna filtrada."""
+    mascara = np.ones(len(df), dtype=bool)
+    for dimension in DIMENSIONES_FILTRO:
+        valores = getattr(filtro, dimension)
+        if valores:
+            mascara &= df[COLUMNAS_DIMENSION[dimension]].isin(valores).to_numpy()
+    return mascara
+
+
+@pytest.fixture(scope='module')
+def df():
+    return preparar_datos(RUTA_CSV)
+
+
+@pytest.fixture(scope='module')
+def meses(df):
+    return detectar_meses(df.columns, ANIO_ANALISIS)
+
+
+@pytest.fixture(scope='module')
+def indice(df):
+    return IndiceFiltros(df)
+
+
+@pytest.mark.parametrize('filtro', COMBINACIONES, ids=str)
+def test_mascara_igual_a_isin(df, indice, filtro):
+    esperado = mascara_isin(df, filtro)
+    np.testing.assert_array_equal(indice.mascara(filtro), esperado)
+    assert indice.contar(filtro) == int(esperado.sum())
+
+
+@pytest.mark.parametrize('filtro', COMBINACIONES[1:4], ids=str)
+def test_modelo_filtrado_igual_al_recalculado(df, meses, filtro):
+    modelos = ModelosFiltrados(df, meses)
+    esperado = calcular_modelo(df[mascara_isin(df, filtro)], meses)
+    assert metricas_principales(modelos.modelo(filtro)) == metricas_principales(esperado)
+
+
+def test_modelo_memoizado_sin_importar_el_orden(df, meses):
+    modelos = ModelosFiltrados(df, meses)
+    primero = modelos.modelo(Filtro(canal=('OPERADORES', 'INTEGRADOR')))
+    assert modelos.modelo(Filtro(canal=('INTEGRADOR', 'OPERADORES'))) is primero
+
+
+def test_lru_desaloja_el_menos_usado(df, meses):
+    modelos = ModelosFiltrados(df, meses, max_modelos=2)
+    a, b, c = (Filtro(canal=(canal,)) for canal in ('MINORISTA', 'RETAIL', 'INTEGRADOR'))
+    modelo_a = modelos.modelo(a)
+    modelo_b = modelos.modelo(b)
+    modelos.modelo(a)
+    modelo_c = modelos.modelo(c)
+    # b es el menos usado: sale al entrar c
+    assert [id(m) for m in modelos.en_cache()] == [id(modelo_a), id(modelo_c)]
+    assert modelos.modelo(b) is not modelo_b
+
+
+def test_combinacion_sin_filas(df, meses):
+    with pytest.raises(ValueError):
+        ModelosFiltrados(df, meses).modelo(Filtro(zona=('NO EXISTE',)))
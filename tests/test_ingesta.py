@@ -0,0 +1,60 @@
+"""
+Paridad de la lectura tipada (miles interpretados al leer) con la limpieza original por mes.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventario.configuracion import MOTORES
+from inventario.ingesta import DIMENSIONES, RUTA_CSV, preparar_datos
+
+MESES = ['Ene-25', 'Feb-25', 'Mar-25', 'Abr-25', 'May-25', 'Jun-25',
+         'Jul-25', 'Ago-25', 'Set-25', 'Oct-25', 'Nov-25', 'Dic-25']
+
+
+def cargar_datos_original(ruta):
+    """Limpieza original de dashboard_ventas.cargar_datos (referencia)."""
+    df = pd.read_csv(ruta, sep=';', encoding='utf-8-sig')
+    for mes in MESES:
+        df[mes] = df[mes].astype(str).str.replace(',', '').astype(float)
+    df['TOTAL_2025'] = df[MESES].sum(axis=1)
+    df['VENTA_ANTES_CAMBIO'] = df[MESES[:7]].sum(axis=1)
+    df['VENTA_DESPUES_CAMBIO'] = df[MESES[7:]].sum(axis=1)
+    return df
+
+
+@pytest.fixture(scope='module')
+def referencia():
+    return cargar_datos_original(RUTA_CSV)
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_lectura_tipada_igual_a_la_limpieza_original(referencia, motor):
+    if motor == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    nuevo = preparar_datos(RUTA_CSV, motor=motor)
+
+    assert len(nuevo) == len(referencia)
+    for col in DIMENSIONES:
+        assert isinstance(nuevo[col].dtype, pd.CategoricalDtype), col
+        np.testing.assert_array_equal(nuevo[col].astype(str).to_numpy(), referencia[col].astype(str).to_numpy(),
+                                      err_msg=col)
+    for col in MESES:
+        assert nuevo[col].dtype == np.float32, col
+        np.testing.assert_array_equal(nuevo[col].to_numpy(), referencia[col].to_numpy(np.float32), err_msg=col)
+    for col in ('TOTAL_2025', 'VENTA_ANTES_CAMBIO', 'VENTA_DESPUES_CAMBIO'):
+        np.testing.assert_allclose(nuevo[col].to_numpy(), referencia[col].to_numpy(), rtol=1e-9, err_msg=col)
+
+
+def test_miles_interpretados_al_leer(tmp_path):
+    ruta = tmp_path / 'ventas.csv'
+    ruta.write_text('ARTICULO;SABCT;CANAL;ZONA_CONSOLIDADO;Ene-25;Feb-25\n'
+                    'X1;A;RETAIL;LIMA;1,005,000;-42\n', encoding='utf-8-sig')
+    df = preparar_datos(ruta)
+    assert df[['Ene-25', 'Feb-25']].iloc[0].tolist() == [1005000.0, -42.0]
+
+
+def test_motor_desconocido():
+    with pytest.raises(ValueError):
+        preparar_datos(RUTA_CSV, motor='polars')
@@ -0,0 +1,48 @@
+"""
+Tiempos de entrega: los pares medidos usan la medición y el modelo cubre el resto.
+"""
+
+import numpy as np
+import pytest
+
+from inventario.geografia import ALMACEN_ACTUAL, ALMACEN_ANTERIOR, ALMACENES, TIEMPOS_REFERENCIA, ZONAS
+from inventario.logistica import calibrar_modelo, cargar_o_calcular_matriz, matriz_entrega
+from inventario.modelo import ZONAS_MAPA
+
+
+@pytest.fixture(scope='module')
+def matriz(tmp_path_factory):
+    return cargar_o_calcular_matriz(ALMACENES, ZONAS, ruta_grafo=None, directorio=tmp_path_factory.mktemp('cache'))
+
+
+@pytest.mark.parametrize('medida, posicion', [('minutos', 0), ('km', 1)])
+def test_tarjetas_usan_los_tiempos_medidos(matriz, medida, posicion):
+    tabla = matriz.tabla(medida)
+    for zona in ZONAS_MAPA:
+        for almacen, medicion in TIEMPOS_REFERENCIA[zona].items():
+            assert tabla.loc[almacen, zona] == medicion[posicion], (zona, almacen)
+
+
+def test_incremento_promedio_sale_de_las_mediciones(matriz):
+    promedio = matriz.promedio(ZONAS_MAPA)
+    antes = np.mean([TIEMPOS_REFERENCIA[z][ALMACEN_ANTERIOR][0] for z in ZONAS_MAPA])
+    ahora = np.mean([TIEMPOS_REFERENCIA[z][ALMACEN_ACTUAL][0] for z in ZONAS_MAPA])
+    assert promedio[ALMACEN_ANTERIOR] == pytest.approx(antes)
+    assert promedio[ALMACEN_ACTUAL] == pytest.approx(ahora)
+
+
+def test_pares_sin_medicion_usan_el_modelo(matriz):
+    sin_medir = [z for z in ZONAS if z not in TIEMPOS_REFERENCIA]
+    modelada = matriz_entrega(ALMACENES, {z: ZONAS[z] for z in sin_medir}, calibrar_modelo(), referencias={})
+    np.testing.assert_array_equal(matriz.tabla('minutos')[sin_medir].to_numpy(), modelada.minutos)
+
+
+def test_la_cache_distingue_las_mediciones(tmp_path):
+    medidas = cargar_o_calcular_matriz(ALMACENES, ZONAS, ruta_grafo=None, directorio=tmp_path)
+    otras = {zona: {ALMACEN_ANTERIOR: (1, 1)} for zona in TIEMPOS_REFERENCIA}
+    # calibrar_modelo necesita más de un punto: se agrega el almacén actual sin cambios
+    for zona in otras:
+        otras[zona][ALMACEN_ACTUAL] = TIEMPOS_REFERENCIA[zona][ALMACEN_ACTUAL]
+    cambiadas = cargar_o_calcular_matriz(ALMACENES, ZONAS, ruta_grafo=None, directorio=tmp_path, referencias=otras)
+    assert (cambiadas.tabla('minutos').loc[ALMACEN_ANTERIOR, ZONAS_MAPA] == 1).all()
+    assert not np.array_equal(medidas.minutos, cambiadas.minutos)
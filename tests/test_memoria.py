@@ -0,0 +1,74 @@
+"""
+Dataset compacto de solo lectura, conteo de bytes compartidos e índice ligero de artículos.
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventario.articulos import IndiceArticulos
+from inventario.filtros import Filtro, ModelosFiltrados
+from inventario.ingesta import ANIO_ANALISIS, RUTA_CSV, detectar_meses, preparar_datos
+from inventario.memoria import MAX_MODELOS_LIGERO, Medidor, compactar, congelar, formatear_bytes
+
+
+@pytest.fixture(scope='module')
+def df():
+    return preparar_datos(RUTA_CSV)
+
+
+@pytest.fixture(scope='module')
+def meses(df):
+    return detectar_meses(df.columns, ANIO_ANALISIS)
+
+
+@pytest.fixture(scope='module')
+def compacto(df):
+    return compactar(df, detectar_meses(df.columns))
+
+
+def test_compacto_igual_al_dataset(df, compacto):
+    pd.testing.assert_frame_equal(compacto, df)
+
+
+def test_compacto_no_admite_escrituras(compacto, meses):
+    with pytest.raises(ValueError):
+        compacto.iloc[0, compacto.columns.get_loc(meses[0])] = 1.0
+
+
+def test_congelar_no_admite_escrituras(df):
+    congelada = congelar(df[['CANAL', 'TOTAL_2025']])
+    pd.testing.assert_frame_equal(congelada, df[['CANAL', 'TOTAL_2025']])
+    with pytest.raises(ValueError):
+        congelada.iloc[0, 1] = 1.0
+
+
+def test_medidor_cuenta_una_vez_lo_compartido(compacto, meses):
+    modelos = ModelosFiltrados(compacto, meses, max_modelos=MAX_MODELOS_LIGERO)
+    modelos.modelo(Filtro(canal=('MINORISTA',)))
+    dataset = Medidor().medir(compacto)
+
+    medidor = Medidor()
+    assert medidor.medir(compacto) == dataset
+    assert medidor.medir(compacto) == 0
+    # Los filtros guardan el mismo frame: después del dataset solo suman sus propias estructuras
+    assert Medidor().medir(modelos) - medidor.medir(modelos) == dataset
+    # Una copia deserializada no comparte buffers
+    assert medidor.medir(pickle.loads(pickle.dumps(compacto))) > 0
+
+
+def test_indice_ligero_igual_al_ordenado(compacto):
+    ordenado = IndiceArticulos(compacto)
+    ligero = IndiceArticulos(compacto, copia=False)
+    assert ligero.df is compacto
+    for codigo in np.random.default_rng(0).choice(ordenado.codigos, size=50):
+        pd.testing.assert_frame_equal(ligero.filas(codigo).reset_index(drop=True),
+                                      ordenado.filas(codigo).reset_index(drop=True))
+
+
+@pytest.mark.parametrize('cantidad, texto', [(512, '512 B'), (1536, '1.5 KB'), (5 * 1024 ** 2, '5.0 MB'),
+                                             (3 * 1024 ** 4, '3,072.0 GB')])
+def test_formatear_bytes(cantidad, texto):
+    assert formatear_bytes(cantidad) == texto
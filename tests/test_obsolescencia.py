@@ -0,0 +1,75 @@
+"""
+Obsolescencia vectorizada: mismas métricas y estados que el cálculo fila por fila.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventario.ingesta import ANIO_ANALISIS, RUTA_CSV, detectar_meses, preparar_datos
+from inventario.obsolescencia import (ESTADOS, MESES_MUERTO, UMBRAL_DECLIVE, analizar_obsolescencia,
+                                      ranking_liquidacion)
+
+POR = ['ZONA_CONSOLIDADO', 'CANAL']
+
+
+def metricas_fila(fila, meses):
+    """Referencia: métricas de una fila con un bucle por mes y np.polyfit."""
+    valores = fila[meses].to_numpy(dtype=np.float64)
+    ultimo = -1
+    for i, valor in enumerate(valores):
+        if valor > 0:
+            ultimo = i
+    meses_sin_venta = len(meses) - 1 - ultimo
+    pendiente = np.polyfit(np.arange(len(meses)), valores, 1)[0]
+    promedio = valores.mean()
+    relativa = pendiente / promedio if promedio > 0 else 0.0
+    if ultimo < 0:
+        estado = ESTADOS[0]
+    elif meses_sin_venta >= MESES_MUERTO:
+        estado = ESTADOS[1]
+    elif relativa <= UMBRAL_DECLIVE:
+        estado = ESTADOS[2]
+    else:
+        estado = ESTADOS[3]
+    return pd.Series({'MESES_SIN_VENTA': meses_sin_venta, 'PENDIENTE': pendiente,
+                      'PENDIENTE_RELATIVA': relativa, 'ESTADO': estado})
+
+
+@pytest.fixture(scope='module')
+def df():
+    return preparar_datos(RUTA_CSV)
+
+
+@pytest.fixture(scope='module')
+def meses(df):
+    return detectar_meses(df.columns, ANIO_ANALISIS)
+
+
+@pytest.fixture(scope='module')
+def analisis(df, meses):
+    return analizar_obsolescencia(df, meses)
+
+
+def test_metricas_iguales_a_la_referencia(df, meses, analisis):
+    muestra = df.sample(1000, random_state=0)
+    esperado = muestra.apply(metricas_fila, axis=1, meses=meses)
+    obtenido = analisis.loc[muestra.index]
+    for columna in ('MESES_SIN_VENTA', 'PENDIENTE', 'PENDIENTE_RELATIVA'):
+        np.testing.assert_allclose(obtenido[columna].to_numpy(), esperado[columna].to_numpy(dtype=np.float64),
+                                   atol=1e-6, err_msg=columna)
+    np.testing.assert_array_equal(obtenido['ESTADO'].astype(str).to_numpy(), esperado['ESTADO'].to_numpy())
+
+
+def test_todos_los_estados_presentes(analisis):
+    assert set(analisis['ESTADO'].astype(str)) == set(ESTADOS)
+
+
+def test_ranking_igual_a_sort_values(analisis):
+    ranking = ranking_liquidacion(analisis)
+    candidatos = analisis[analisis['ESTADO'].isin(ESTADOS[:3])]
+    esperado = (candidatos.assign(RACHA=-candidatos['MESES_SIN_VENTA'])
+                .sort_values(POR + ['ESTADO', 'RACHA', 'PENDIENTE_RELATIVA'], kind='stable'))
+    np.testing.assert_array_equal(ranking.index.to_numpy(), esperado.index.to_numpy())
+    esperado_ranking = esperado.groupby(POR, observed=True).cumcount().to_numpy() + 1
+    np.testing.assert_array_equal(ranking['RANKING'].to_numpy(), esperado_ranking)
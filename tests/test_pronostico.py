@@ -0,0 +1,32 @@
+"""
+Intervalo de la proyección agregada.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventario.pronostico import intervalo_total, pronosticar_total
+
+pytest.importorskip('statsmodels')
+
+MESES = ['Ene-25', 'Feb-25', 'Mar-25', 'Abr-25', 'May-25', 'Jun-25', 'Jul-25', 'Ago-25']
+
+
+@pytest.mark.parametrize('metodo', ['ses', 'holt', 'arima'])
+def test_intervalo_contiene_la_proyeccion_y_se_abre_con_el_horizonte(metodo):
+    serie = pd.Series(np.random.default_rng(0).normal(1000, 100, len(MESES)), index=MESES)
+    proyeccion = pronosticar_total(serie, metodo)
+    intervalo = intervalo_total(serie, proyeccion, metodo)
+
+    assert list(intervalo.index) == list(proyeccion.index) == ['Set-25', 'Oct-25', 'Nov-25']
+    assert (intervalo['INFERIOR'] <= proyeccion).all() and (proyeccion <= intervalo['SUPERIOR']).all()
+    assert np.all(np.diff(intervalo['SUPERIOR'] - intervalo['INFERIOR']) > 0)
+    assert (intervalo['INFERIOR'] >= 0).all()
+
+
+def test_serie_constante_sin_amplitud():
+    serie = pd.Series(500.0, index=MESES)
+    proyeccion = pronosticar_total(serie)
+    intervalo = intervalo_total(serie, proyeccion)
+    np.testing.assert_allclose(intervalo['SUPERIOR'], proyeccion, atol=1e-6)
@@ -0,0 +1,32 @@
+"""
+La simulación de despacho da el mismo resultado con cualquier ejecutor.
+"""
+
+import numpy as np
+import pytest
+
+from inventario.configuracion import EJECUTORES
+from inventario.simulacion import TAMANO_LOTE_DIAS, simular_despacho
+
+MINUTOS = [20, 18, 25, 18, 15, 12]
+VENTA_MENSUAL = [300000, 250000, 400000, 200000, 150000, 100000]
+# Tres lotes, el último incompleto
+DIAS = TAMANO_LOTE_DIAS * 2 + 500
+
+
+@pytest.fixture(scope='module')
+def referencia():
+    return simular_despacho(MINUTOS, VENTA_MENSUAL, dias=DIAS, ejecutor='serie')
+
+
+@pytest.mark.parametrize('ejecutor', EJECUTORES)
+def test_resultado_no_depende_del_ejecutor(referencia, ejecutor):
+    resultado = simular_despacho(MINUTOS, VENTA_MENSUAL, dias=DIAS, ejecutor=ejecutor, trabajadores=2)
+    assert resultado.solicitados.shape == (DIAS, len(MINUTOS))
+    for campo in ('solicitados', 'atendidos', 'ciclos_por_camion'):
+        np.testing.assert_array_equal(getattr(resultado, campo), getattr(referencia, campo), err_msg=campo)
+
+
+def test_ejecutor_desconocido():
+    with pytest.raises(ValueError):
+        simular_despacho(MINUTOS, VENTA_MENSUAL, ejecutor='gpu')